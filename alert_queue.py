@@ -0,0 +1,215 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from config import (
+    ALERT_OUTBOX_PATH, ALERT_WORKERS, ALERT_MAX_RETRIES, ALERT_RETRY_BACKOFF, ALERT_CLAIM_TIMEOUT
+)
+from email_sender import SMTPSender, format_email
+from metrics import metrics
+
+class AlertDispatcher:
+    """Durable outbox of alert emails delivered by background worker threads.
+
+    Callers only enqueue; workers claim pending rows, send them over a pooled
+    SMTP connection and retry failures with exponential backoff. Rows survive
+    a restart because the outbox lives in SQLite; a claim is a lease, so a row
+    whose worker died mid-send is picked up again once claim_timeout passes.
+    """
+
+    def __init__(self, db_path=ALERT_OUTBOX_PATH, workers=ALERT_WORKERS,
+                 max_retries=ALERT_MAX_RETRIES, backoff=ALERT_RETRY_BACKOFF,
+                 claim_timeout=ALERT_CLAIM_TIMEOUT, sender_factory=SMTPSender):
+        self.db_path = db_path
+        self.workers = workers
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.claim_timeout = claim_timeout
+        self.sender_factory = sender_factory
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads = []
+
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        with self._lock, self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS outbox (
+                    id INTEGER PRIMARY KEY,
+                    recipients TEXT NOT NULL,
+                    subject TEXT NOT NULL,
+                    message TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    enqueued_ts REAL NOT NULL,
+                    next_attempt_ts REAL NOT NULL,
+                    claimed_ts REAL,
+                    sent_ts REAL,
+                    last_error TEXT
+                )
+            """)
+            columns = [row[1] for row in self.conn.execute("PRAGMA table_info(outbox)")]
+            if 'claimed_ts' not in columns:
+                self.conn.execute("ALTER TABLE outbox ADD COLUMN claimed_ts REAL")
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_outbox_due ON outbox (status, next_attempt_ts)"
+            )
+
+    def start(self):
+        """Start the worker threads (idempotent)"""
+        with self._lock:
+            if self._threads:
+                return
+            self._stop.clear()
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._worker, name=f"alert-dispatch-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def stop(self, timeout=5):
+        """Stop the worker threads; undelivered rows stay in the outbox"""
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def enqueue(self, recipients, subject, message):
+        """Add an email to the outbox and return its id without waiting for delivery"""
+        now = time.time()
+        with self._lock, self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO outbox (recipients, subject, message, enqueued_ts, next_attempt_ts) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (json.dumps(list(recipients)), subject, message, now, now)
+            )
+        self._wake.set()
+        return cursor.lastrowid
+
+    def _claim(self):
+        """Atomically mark the oldest due row as sending, stamping its lease, and return it.
+
+        Rows whose lease expired (their worker died or hung mid-send) count as
+        a failed attempt first, so a message that keeps killing workers still
+        ends up 'failed' after max_retries.
+        """
+        now = time.time()
+        with self._lock, self.conn:
+            self.conn.execute(
+                "UPDATE outbox SET attempts = attempts + 1, next_attempt_ts = ?, last_error = 'claim lease expired', "
+                "status = CASE WHEN attempts + 1 >= ? THEN 'failed' ELSE 'pending' END "
+                "WHERE status = 'sending' AND (claimed_ts IS NULL OR claimed_ts < ?)",
+                (now, self.max_retries, now - self.claim_timeout)
+            )
+            row = self.conn.execute(
+                "SELECT id, recipients, subject, message, attempts FROM outbox "
+                "WHERE status = 'pending' AND next_attempt_ts <= ? ORDER BY id LIMIT 1",
+                (now,)
+            ).fetchone()
+            if row is None:
+                return None
+            claimed = self.conn.execute(
+                "UPDATE outbox SET status = 'sending', claimed_ts = ? WHERE id = ? AND status = 'pending'",
+                (now, row[0])
+            ).rowcount
+        return row if claimed else None
+
+    def _mark_sent(self, row_id):
+        with self._lock, self.conn:
+            self.conn.execute(
+                "UPDATE outbox SET status = 'sent', sent_ts = ?, last_error = NULL WHERE id = ?",
+                (time.time(), row_id)
+            )
+
+    def _mark_failed(self, row_id, attempts, error):
+        """Schedule a retry with exponential backoff, or give up after max_retries"""
+        attempts += 1
+        if attempts >= self.max_retries:
+            status, next_attempt = 'failed', time.time()
+        else:
+            status, next_attempt = 'pending', time.time() + self.backoff * (2 ** (attempts - 1))
+        with self._lock, self.conn:
+            self.conn.execute(
+                "UPDATE outbox SET status = ?, attempts = ?, next_attempt_ts = ?, last_error = ? WHERE id = ?",
+                (status, attempts, next_attempt, str(error), row_id)
+            )
+
+    def _worker(self):
+        sender = self.sender_factory()
+        with sender:  # keep the connection pooled while the queue is busy
+            while not self._stop.is_set():
+                row = self._claim()
+                if row is None:
+                    sender.close()
+                    self._wake.wait(timeout=1.0)
+                    self._wake.clear()
+                    continue
+
+                row_id, recipients, subject, message, attempts = row
+                recipients = json.loads(recipients)
+                try:
+                    with metrics.timed('alert_send_seconds'):
+                        sender.send(recipients, format_email(sender.user, recipients, subject, message))
+                    self._mark_sent(row_id)
+                    metrics.inc('alert_sent_total')
+                except Exception as e:
+                    sender.close()
+                    self._mark_failed(row_id, attempts, e)
+                    metrics.inc('alert_send_failures_total')
+
+    def get_metrics(self, window=3600):
+        """Queue depth by status and delivery latency over the last window seconds"""
+        with self._lock:
+            counts = dict(self.conn.execute(
+                "SELECT status, COUNT(*) FROM outbox GROUP BY status"
+            ).fetchall())
+            latencies = [row[0] for row in self.conn.execute(
+                "SELECT sent_ts - enqueued_ts FROM outbox WHERE status = 'sent' AND sent_ts >= ? "
+                "ORDER BY sent_ts - enqueued_ts",
+                (time.time() - window,)
+            )]
+            oldest = self.conn.execute(
+                "SELECT MIN(enqueued_ts) FROM outbox WHERE status IN ('pending', 'sending')"
+            ).fetchone()[0]
+
+        return {
+            'queue_depth': counts.get('pending', 0),
+            'in_flight': counts.get('sending', 0),
+            'sent': counts.get('sent', 0),
+            'failed': counts.get('failed', 0),
+            'oldest_pending_age': time.time() - oldest if oldest else 0.0,
+            'latency_avg': sum(latencies) / len(latencies) if latencies else 0.0,
+            'latency_p95': latencies[int(len(latencies) * 0.95)] if latencies else 0.0
+        }
+
+    def purge_sent(self, days=7):
+        """Delete delivered rows older than the given number of days"""
+        cutoff = time.time() - days * 86400
+        with self._lock, self.conn:
+            return self.conn.execute(
+                "DELETE FROM outbox WHERE status = 'sent' AND sent_ts < ?", (cutoff,)
+            ).rowcount
+
+def _collect_queue_metrics(registry):
+    queue_metrics = _dispatcher.get_metrics()
+    registry.set_gauge('alert_queue_depth', queue_metrics['queue_depth'])
+    registry.set_gauge('alert_queue_in_flight', queue_metrics['in_flight'])
+    registry.set_gauge('alert_queue_failed', queue_metrics['failed'])
+    registry.set_gauge('alert_delivery_latency_avg_seconds', queue_metrics['latency_avg'])
+    registry.set_gauge('alert_delivery_latency_p95_seconds', queue_metrics['latency_p95'])
+
+_dispatcher = None
+_dispatcher_lock = threading.Lock()
+
+def get_dispatcher():
+    """Get the process-wide dispatcher, starting its workers on first use"""
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            _dispatcher = AlertDispatcher()
+            _dispatcher.start()
+            metrics.register_collector(_collect_queue_metrics)
+        return _dispatcher
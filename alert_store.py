@@ -0,0 +1,137 @@
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from config import ALERT_DB_PATH
+
+class AlertStore:
+    """SQLite (WAL) backed alert history indexed by (symbol, date, signal type)"""
+
+    def __init__(self, db_path=ALERT_DB_PATH):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+        self._import_json_log()
+
+    def _create_schema(self):
+        """Create alert table and indexes"""
+        with self._lock, self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS alerts (
+                    id INTEGER PRIMARY KEY,
+                    symbol TEXT NOT NULL,
+                    date TEXT NOT NULL,
+                    signal_type TEXT NOT NULL,
+                    ts REAL NOT NULL,
+                    timestamp TEXT NOT NULL,
+                    price REAL,
+                    message TEXT,
+                    strength TEXT
+                )
+            """)
+            self.conn.execute(
+                "CREATE UNIQUE INDEX IF NOT EXISTS idx_alerts_key ON alerts (symbol, date, signal_type)"
+            )
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_alerts_ts ON alerts (ts)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_alerts_date ON alerts (date)")
+
+    def _import_json_log(self):
+        """One-time import of the legacy alert_log.json"""
+        legacy_path = os.path.join(os.path.dirname(self.db_path), "alert_log.json")
+        if not os.path.exists(legacy_path):
+            return
+
+        from utils import load_alert_log
+        for symbol, alerts in load_alert_log().items():
+            for alert in alerts:
+                try:
+                    when = datetime.fromisoformat(alert['timestamp'])
+                except (KeyError, ValueError):
+                    continue
+                self.record_alert(symbol, alert.get('signals', []), alert.get('price'), when)
+
+        try:
+            os.replace(legacy_path, f"{legacy_path}.migrated")
+        except FileNotFoundError:
+            pass  # Another process finished the migration first
+
+    def has_alert(self, symbol, date, signal_type=None):
+        """Check whether an alert was recorded for symbol on date (optionally for one signal type)"""
+        if signal_type is None:
+            query = "SELECT 1 FROM alerts WHERE symbol = ? AND date = ? LIMIT 1"
+            params = (symbol, date)
+        else:
+            query = "SELECT 1 FROM alerts WHERE symbol = ? AND date = ? AND signal_type = ? LIMIT 1"
+            params = (symbol, date, signal_type)
+
+        with self._lock:
+            return self.conn.execute(query, params).fetchone() is not None
+
+    def record_alert(self, symbol, signals, price, when=None):
+        """Append one row per signal; duplicates for the same day are ignored"""
+        when = when or datetime.now()
+        date = when.strftime('%Y-%m-%d')
+        rows = [
+            (symbol, date, signal['type'], when.timestamp(), when.isoformat(),
+             price, signal.get('message'), signal.get('strength'))
+            for signal in signals
+        ]
+
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO alerts "
+                "(symbol, date, signal_type, ts, timestamp, price, message, strength) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+
+    def get_summary(self, date=None):
+        """Get total alerts, alerts for date and distinct symbols alerted"""
+        date = date or datetime.now().strftime('%Y-%m-%d')
+
+        with self._lock:
+            total, symbols = self.conn.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT symbol) FROM alerts"
+            ).fetchone()
+            today = self.conn.execute(
+                "SELECT COUNT(*) FROM alerts WHERE date = ?", (date,)
+            ).fetchone()[0]
+
+        return {
+            'total_alerts': total,
+            'today_alerts': today,
+            'symbols_with_alerts': symbols
+        }
+
+    def get_alerts(self, symbol=None, since=None):
+        """Get recorded alerts, newest first"""
+        query = "SELECT symbol, date, signal_type, timestamp, price, message, strength FROM alerts WHERE ts >= ?"
+        params = [since.timestamp() if since else 0]
+        if symbol:
+            query += " AND symbol = ?"
+            params.append(symbol)
+        query += " ORDER BY ts DESC"
+
+        with self._lock:
+            rows = self.conn.execute(query, params).fetchall()
+
+        columns = ['symbol', 'date', 'type', 'timestamp', 'price', 'message', 'strength']
+        return [dict(zip(columns, row)) for row in rows]
+
+    def purge_older_than(self, days):
+        """Delete alerts older than the given number of days, returns rows removed"""
+        cutoff = (datetime.now() - timedelta(days=days)).timestamp()
+
+        with self._lock, self.conn:
+            cursor = self.conn.execute("DELETE FROM alerts WHERE ts < ?", (cutoff,))
+
+        return cursor.rowcount
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self.conn.close()
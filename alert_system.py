@@ -1,35 +1,33 @@
-import smtplib
 import pandas as pd
 from datetime import datetime
 import streamlit as st
-from config import EMAIL_HOST, EMAIL_PORT, EMAIL_USER, EMAIL_PASSWORD, EMAIL_RECIPIENTS
-from utils import load_alert_log, save_alert_log
-from indicators import detect_crossover_signals, get_latest_signals
+from config import EMAIL_RECIPIENTS, ALERT_DIGEST
+from alert_store import AlertStore
+from email_sender import SMTPSender, format_email
+from alert_queue import get_dispatcher
+from subscriptions import SubscriptionRegistry
+from indicators import detect_bar_signals
 
 class AlertSystem:
-    def __init__(self):
-        self.alert_log = load_alert_log()
+    def __init__(self, sender=None, recipients=None, dispatcher=None):
+        self.store = AlertStore()
+        self.sender = sender or SMTPSender()
+        self.recipients = recipients if recipients is not None else EMAIL_RECIPIENTS
+        self.dispatcher = dispatcher or get_dispatcher()
+        self.subscriptions = SubscriptionRegistry()
         
     def send_email_alert(self, subject, message):
         """Send email alert"""
         try:
-            if not EMAIL_USER or not EMAIL_PASSWORD:
+            if not self.sender.user or not self.sender.password:
                 st.warning("Email credentials not configured")
                 return False
             
-            if not EMAIL_RECIPIENTS:
+            if not self.recipients:
                 st.warning("No email recipients configured")
                 return False
             
-            # Simple email format without MIME
-            email_message = f"Subject: {subject}\nFrom: {EMAIL_USER}\nTo: {', '.join(EMAIL_RECIPIENTS)}\nContent-Type: text/html\n\n{message}"
-            
-            server = smtplib.SMTP(EMAIL_HOST, EMAIL_PORT)
-            server.starttls()
-            server.login(EMAIL_USER, EMAIL_PASSWORD)
-            
-            server.sendmail(EMAIL_USER, EMAIL_RECIPIENTS, email_message)
-            server.quit()
+            self.sender.send(self.recipients, format_email(self.sender.user, self.recipients, subject, message))
             
             return True
             
@@ -37,13 +35,34 @@ class AlertSystem:
             st.error(f"Failed to send email: {str(e)}")
             return False
     
+    def queue_email_alert(self, subject, message, recipients=None):
+        """Queue email alert for background delivery"""
+        recipients = recipients or self.recipients
+        
+        if not self.sender.user or not self.sender.password:
+            st.warning("Email credentials not configured")
+            return False
+        
+        if not recipients:
+            st.warning("No email recipients configured")
+            return False
+        
+        self.dispatcher.enqueue(recipients, subject, message)
+        return True
+    
+    def get_queue_metrics(self):
+        """Get delivery queue depth and latency"""
+        return self.dispatcher.get_metrics()
+    
     def create_alert_message(self, symbol, signals, stock_data):
         """Create formatted alert message"""
         if stock_data.empty:
             return None
         
-        latest = stock_data.iloc[-1]
-        
+        return self.create_bar_alert_message(symbol, signals, stock_data.iloc[-1])
+    
+    def create_bar_alert_message(self, symbol, signals, latest):
+        """Create formatted alert message from the latest bar"""
         message = f"""
         <html>
         <body>
@@ -93,87 +112,131 @@ class AlertSystem:
         
         return message
     
-    def check_and_send_alerts(self, symbol, stock_data):
-        """Check for signals and send alerts if needed"""
+    def pending_signals(self, symbol, stock_data):
+        """Get signals for symbol that still need an alert today"""
         if stock_data.empty:
-            return False
+            return []
         
-        signals = detect_crossover_signals(stock_data)
+        return self.pending_bar_signals(symbol, stock_data.iloc[-1])
+    
+    def pending_bar_signals(self, symbol, latest):
+        """Get signals from the latest bar that still need an alert today (deduplicated per signal type)"""
+        signals = detect_bar_signals(latest)
         
         if not signals:
-            return False
+            return []
         
-        # Check if we've already sent an alert for this symbol today
+        # Drop signal types already alerted for this symbol today; other types still go out
         today = datetime.now().strftime('%Y-%m-%d')
-        symbol_alerts = self.alert_log.get(symbol, [])
-        
-        # Check if any alert was sent today
-        today_alerts = [alert for alert in symbol_alerts if alert.get('date', '') == today]
+        return [signal for signal in signals if not self.store.has_alert(symbol, today, signal['type'])]
+    
+    def check_and_send_alerts(self, symbol, stock_data):
+        """Check for signals and send alerts if needed"""
+        signals = self.pending_signals(symbol, stock_data)
         
-        if today_alerts:
-            return False  # Already sent alert today
+        if not signals:
+            return False
         
         # Create and send alert
         subject = f"Stock Alert: {symbol.replace('.NS', '')} - {len(signals)} Signal(s)"
         message = self.create_alert_message(symbol, signals, stock_data)
         
-        if self.send_email_alert(subject, message):
+        if self.queue_email_alert(subject, message):
             # Log the alert
-            alert_entry = {
-                'date': today,
-                'timestamp': datetime.now().isoformat(),
-                'signals': signals,
-                'price': float(stock_data.iloc[-1]['Close'])
-            }
-            
-            if symbol not in self.alert_log:
-                self.alert_log[symbol] = []
-            
-            self.alert_log[symbol].append(alert_entry)
-            save_alert_log(self.alert_log)
+            self.store.record_alert(symbol, signals, float(stock_data.iloc[-1]['Close']))
             
             return True
         
         return False
     
-    def get_alert_summary(self):
-        """Get summary of recent alerts"""
-        summary = {
-            'total_alerts': 0,
-            'today_alerts': 0,
-            'symbols_with_alerts': set()
-        }
-        
-        today = datetime.now().strftime('%Y-%m-%d')
+    def create_digest_message(self, pending):
+        """Create one formatted message covering several symbols' signals"""
+        rows = ""
+        for symbol, signals, latest in pending:
+            signal_list = "<br>".join(
+                f"<strong>{signal['type']}:</strong> {signal['message']} ({signal['strength']})"
+                for signal in signals
+            )
+            rows += f"""
+        <tr>
+            <td><strong>{symbol.replace('.NS', '')}</strong></td>
+            <td>₹{latest['Close']:.2f}</td>
+            <td>{signal_list}</td>
+            <td>{latest.get('RSI', 50):.2f}</td>
+            <td>{latest.get('MFI', 50):.2f}</td>
+            <td>{latest.get('Volume_Ratio', 1):.2f}x</td>
+        </tr>"""
+        
+        return f"""
+        <html>
+        <body>
+        <h2>🚨 Stock Alert Digest: {len(pending)} Stock(s)</h2>
+        <p><strong>Timestamp:</strong> {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
         
-        for symbol, alerts in self.alert_log.items():
-            summary['total_alerts'] += len(alerts)
-            summary['symbols_with_alerts'].add(symbol)
-            
-            today_alerts = [alert for alert in alerts if alert.get('date', '') == today]
-            summary['today_alerts'] += len(today_alerts)
+        <table border="1" style="border-collapse: collapse;">
+        <tr>
+            <th>Stock</th><th>Price</th><th>Signals</th><th>RSI</th><th>MFI</th><th>Volume Ratio</th>
+        </tr>{rows}
+        </table>
         
-        summary['symbols_with_alerts'] = len(summary['symbols_with_alerts'])
+        <p><em>This is an automated alert from your Nifty 100 Stock Analysis Dashboard.</em></p>
+        </body>
+        </html>
+        """
+    
+    def check_and_send_batch(self, stock_data_by_symbol, digest=ALERT_DIGEST):
+        """Check many symbols' frames and queue their alerts for delivery"""
+        latest_by_symbol = {
+            symbol: stock_data.iloc[-1]
+            for symbol, stock_data in stock_data_by_symbol.items()
+            if not stock_data.empty
+        }
+        return self.send_bar_alerts(latest_by_symbol, digest)
+    
+    def send_bar_alerts(self, latest_by_symbol, digest=ALERT_DIGEST):
+        """Evaluate each symbol's latest bar and queue alerts for delivery.
         
-        return summary
+        With digest=True all symbols' signals go out as a single message.
+        Returns the list of symbols that were alerted.
+        """
+        pending = []
+        for symbol, latest in latest_by_symbol.items():
+            signals = self.pending_bar_signals(symbol, latest)
+            if signals:
+                pending.append((symbol, signals, latest))
+        
+        if not pending:
+            return []
+        
+        alerted = []
+        if self.recipients:
+            if digest:
+                subject = f"Stock Alert Digest: {len(pending)} Stock(s)"
+                if self.queue_email_alert(subject, self.create_digest_message(pending)):
+                    alerted = pending
+            else:
+                for symbol, signals, latest in pending:
+                    subject = f"Stock Alert: {symbol.replace('.NS', '')} - {len(signals)} Signal(s)"
+                    if self.queue_email_alert(subject, self.create_bar_alert_message(symbol, signals, latest)):
+                        alerted.append((symbol, signals, latest))
+        
+        # Watchlist subscribers get one batched message each with only their matches
+        for email, matches in self.subscriptions.route(pending).items():
+            subject = f"Watchlist Alert: {len(matches)} Stock(s)"
+            if self.queue_email_alert(subject, self.create_digest_message(matches), [email]):
+                alerted.extend(matches)
+        
+        alerted_symbols = {symbol for symbol, _, _ in alerted}
+        for symbol, signals, latest in pending:
+            if symbol in alerted_symbols:
+                self.store.record_alert(symbol, signals, float(latest['Close']))
+        
+        return sorted(alerted_symbols)
+    
+    def get_alert_summary(self):
+        """Get summary of recent alerts"""
+        return self.store.get_summary()
     
     def clear_old_alerts(self, days=30):
         """Clear alerts older than specified days"""
-        cutoff_date = datetime.now() - pd.Timedelta(days=days)
-        
-        for symbol in list(self.alert_log.keys()):
-            filtered_alerts = []
-            for alert in self.alert_log[symbol]:
-                try:
-                    alert_date = datetime.fromisoformat(alert['timestamp'])
-                    if alert_date >= cutoff_date:
-                        filtered_alerts.append(alert)
-                except:
-                    continue
-            
-            if filtered_alerts:
-                self.alert_log[symbol] = filtered_alerts
-            else:
-                del self.alert_log[symbol]
-        
-        save_alert_log(self.alert_log)
\ No newline at end of file
+        return self.store.purge_older_than(days)
@@ -0,0 +1,273 @@
+"""Cross-sectional analytics: rolling pairwise correlations and relative strength.
+
+Log returns of every symbol are aligned on the shared 4h bar timestamps.
+The correlation matrix comes from running sums and cross-products over the
+last CORRELATION_WINDOW bars, so each new bar is one O(N²) outer-product
+update instead of an O(N²·T) recompute. Relative strength is the
+RS_LOOKBACK-bar return against NIFTYBEES and each symbol's sector ETF,
+ranked across the universe.
+
+As in live_bars, the newest bar may still be forming: it is applied
+provisionally on top of the committed state and only committed once a
+later bar exists.
+"""
+import os
+import threading
+from collections import deque
+import numpy as np
+import pandas as pd
+from config import (
+    CORRELATION_WINDOW, RS_LOOKBACK, RS_BENCHMARK, SECTOR_BENCHMARKS, DEFAULT_SECTOR,
+    MARKET_TIMEZONE, PANEL_PATH
+)
+from utils import load_stock_data
+from change_feed import get_change_feed
+from metrics import metrics
+
+class RollingMoments:
+    """Sums and cross-products of the last `window` return vectors"""
+
+    def __init__(self, size, window, cross=True):
+        self.window = window
+        self.rows = deque()
+        self.sums = np.zeros(size)
+        self.cross = np.zeros((size, size)) if cross else None
+        self.pushes = 0
+
+    def push(self, row):
+        if len(self.rows) == self.window:
+            old = self.rows.popleft()
+            self.sums -= old
+            if self.cross is not None:
+                self.cross -= np.outer(old, old)
+        self.rows.append(row)
+        self.sums += row
+        if self.cross is not None:
+            self.cross += np.outer(row, row)
+
+        # Re-sum the window now and then so add/subtract rounding can't accumulate (amortized O(N²))
+        self.pushes += 1
+        if self.pushes % self.window == 0:
+            rows = np.array(self.rows)
+            self.sums = rows.sum(axis=0)
+            if self.cross is not None:
+                self.cross = rows.T @ rows
+
+    def peek(self, row=None):
+        """Get (count, sums, cross) with row added as the provisional newest vector"""
+        if row is None:
+            return len(self.rows), self.sums, self.cross
+        count, sums = len(self.rows) + 1, self.sums + row
+        cross = self.cross + np.outer(row, row) if self.cross is not None else None
+        if len(self.rows) == self.window:
+            old = self.rows[0]
+            count -= 1
+            sums = sums - old
+            if cross is not None:
+                cross -= np.outer(old, old)
+        return count, sums, cross
+
+def _as_market_time(index):
+    index = pd.DatetimeIndex(index)
+    return index.tz_localize(MARKET_TIMEZONE) if index.tz is None else index.tz_convert(MARKET_TIMEZONE)
+
+def load_closes(symbols):
+    """Close prices as a timestamps x symbols frame, read from the Arrow panel where it is current"""
+    columns = {}
+    stale = set(symbols)
+    if os.path.exists(PANEL_PATH):
+        from panel_export import panel_index, load_panel
+        feed_seq, index = panel_index()
+        changed, _ = get_change_feed().changed_symbols(feed_seq or 0)
+        if changed is not None:
+            in_panel = [s for s in symbols if s in index and s not in changed]
+            if in_panel:
+                closes = load_panel(in_panel, ['Close'])['Close'].unstack(0)
+                columns.update({symbol: closes[symbol] for symbol in closes.columns})
+            # Symbols missing from a panel replaced since the index was read fall back to CSV
+            stale -= set(columns)
+
+    for symbol in stale:
+        df = load_stock_data(symbol)
+        if not df.empty and 'Close' in df.columns:
+            columns[symbol] = df['Close'].set_axis(_as_market_time(df.index))
+
+    if not columns:
+        return pd.DataFrame()
+    return pd.DataFrame(columns).sort_index()
+
+class CrossSectionAnalytics:
+    """Incrementally maintained correlation matrix and relative-strength ranks for the universe"""
+
+    def __init__(self, window=CORRELATION_WINDOW, lookback=RS_LOOKBACK):
+        self.window = window
+        self.lookback = lookback
+        self.feed_seq = None
+        self.requested = None
+        self._lock = threading.Lock()
+        self._reset([])
+
+    def _reset(self, symbols):
+        self.symbols = list(symbols)
+        self.returns = RollingMoments(len(self.symbols), self.window)
+        self.momentum = RollingMoments(len(self.symbols), self.lookback, cross=False)
+        self.last_timestamp = None
+        self.last_close = None
+        self.pending = None  # (timestamp, return row) of the newest, possibly forming, bar
+        self._results = {}
+
+    def _log_returns(self, closes):
+        previous = self.last_close
+        for timestamp, close in zip(closes.index, closes.to_numpy(dtype=np.float64)):
+            with np.errstate(divide='ignore', invalid='ignore'):
+                row = np.log(close / previous)
+            # Bars a symbol has no price for yet count as a zero return
+            yield timestamp, close, np.where(np.isfinite(row), row, 0.0)
+            previous = close
+
+    def _commit(self, closes):
+        for timestamp, close, row in self._log_returns(closes):
+            self.returns.push(row)
+            self.momentum.push(row)
+            self.last_timestamp, self.last_close = timestamp, close
+
+    def _rebuild(self, closes):
+        self._reset(closes.columns)
+        tail = closes.iloc[-(max(self.window, self.lookback) + 2):]
+        self.last_timestamp, self.last_close = tail.index[0], tail.iloc[0].to_numpy(dtype=np.float64)
+        self._commit(tail.iloc[1:-1])
+        return len(tail) - 2
+
+    def update(self, closes):
+        """Fold a close-price matrix (timestamps x symbols) into the rolling state.
+
+        Only bars after the last committed one are processed. The state is
+        rebuilt from the window if the symbol set changed or the last
+        committed bar was revised. Returns the number of bars committed.
+        """
+        closes = closes.sort_index().ffill()
+        self._results = {}
+        if len(closes) < 2:
+            self._reset(closes.columns)
+            return 0
+
+        committed = 0
+        revised = (
+            list(closes.columns) != self.symbols or self.last_timestamp not in closes.index
+            or not np.allclose(closes.loc[self.last_timestamp].to_numpy(dtype=np.float64),
+                               self.last_close, rtol=1e-12, atol=0, equal_nan=True)
+        )
+        if revised:
+            committed = self._rebuild(closes)
+        else:
+            new = closes[closes.index > self.last_timestamp]
+            if len(new) > 1:
+                self._commit(new.iloc[:-1])
+                committed = len(new) - 1
+
+        newest = closes.iloc[-1:]
+        self.pending = None
+        if newest.index[0] > self.last_timestamp:
+            self.pending = next((timestamp, row) for timestamp, _, row in self._log_returns(newest))
+        return committed
+
+    def refresh(self, symbols=None):
+        """Bring the state up to date with stored data; a no-op while the change feed hasn't moved"""
+        if symbols is None:
+            from universe import get_universe
+            symbols = get_universe().symbols()
+        benchmarks = [RS_BENCHMARK] + list(SECTOR_BENCHMARKS.values())
+        symbols = list(dict.fromkeys(list(symbols) + benchmarks))
+
+        seq = get_change_feed().latest_seq()
+        with self._lock:
+            if seq == self.feed_seq and symbols == self.requested:
+                return False
+            with metrics.timed('analytics_refresh_seconds'):
+                closes = load_closes(symbols)
+                committed = self.update(closes.reindex(columns=[s for s in symbols if s in closes.columns]))
+            metrics.inc('analytics_bars_committed', committed)
+            self.feed_seq, self.requested = seq, symbols
+        return True
+
+    def as_of(self):
+        """Timestamp of the newest bar included in the results"""
+        return self.pending[0] if self.pending else self.last_timestamp
+
+    def correlation(self):
+        """Pairwise correlation of log returns over the rolling window (symbols x symbols)"""
+        with self._lock:
+            if 'correlation' not in self._results:
+                count, sums, cross = self.returns.peek(self.pending[1] if self.pending else None)
+                if count < 2:
+                    matrix = np.full((len(self.symbols), len(self.symbols)), np.nan)
+                else:
+                    mean = sums / count
+                    covariance = cross / count - np.outer(mean, mean)
+                    std = np.sqrt(np.clip(np.diag(covariance), 0, None))
+                    std[std < 1e-12] = np.nan  # flat series have no defined correlation
+                    matrix = np.clip(covariance / np.outer(std, std), -1, 1)
+                    np.fill_diagonal(matrix, np.where(np.isnan(std), np.nan, 1.0))
+                self._results['correlation'] = pd.DataFrame(matrix, index=self.symbols, columns=self.symbols)
+            return self._results['correlation']
+
+    def relative_strength(self):
+        """Lookback return, relative strength vs the market and sector benchmarks, and their ranks"""
+        correlation = self.correlation()
+        with self._lock:
+            if 'relative_strength' not in self._results:
+                self._results['relative_strength'] = self._rank_table(correlation)
+            return self._results['relative_strength']
+
+    def _rank_table(self, correlation):
+        from universe import get_universe
+        columns = ['Sector', 'Benchmark', 'Return_Pct', 'RS_Market', 'RS_Market_Rank',
+                   'RS_Sector', 'RS_Sector_Rank', 'Avg_Correlation']
+        if not self.symbols or self.as_of() is None:
+            return pd.DataFrame(columns=columns)
+
+        _, sums, _ = self.momentum.peek(self.pending[1] if self.pending else None)
+        position = {symbol: i for i, symbol in enumerate(self.symbols)}
+        metadata = get_universe().get_metadata(self.symbols)
+        sectors = [metadata.get(symbol, {}).get('sector') or DEFAULT_SECTOR for symbol in self.symbols]
+        benchmarks = [
+            SECTOR_BENCHMARKS[sector] if SECTOR_BENCHMARKS.get(sector) in position else RS_BENCHMARK
+            for sector in sectors
+        ]
+
+        market = sums[position[RS_BENCHMARK]] if RS_BENCHMARK in position else np.nan
+        sector_sums = np.array([sums[position[b]] if b in position else np.nan for b in benchmarks])
+        table = pd.DataFrame({
+            'Sector': sectors,
+            'Benchmark': benchmarks,
+            'Return_Pct': np.expm1(sums) * 100,
+            'RS_Market': np.expm1(sums - market) * 100,
+            'RS_Sector': np.expm1(sums - sector_sums) * 100
+        }, index=pd.Index(self.symbols, name='symbol'))
+        table['RS_Market_Rank'] = table['RS_Market'].rank(pct=True) * 100
+        table['RS_Sector_Rank'] = table.groupby('Sector')['RS_Sector'].rank(pct=True) * 100
+
+        off_diagonal = correlation.to_numpy(copy=True)
+        np.fill_diagonal(off_diagonal, np.nan)
+        counts = (~np.isnan(off_diagonal)).sum(axis=1)
+        with np.errstate(invalid='ignore'):
+            table['Avg_Correlation'] = np.nansum(off_diagonal, axis=1) / np.where(counts, counts, np.nan)
+        return table[columns]
+
+    def top_correlated(self, symbol, n=10):
+        """Get the n symbols most correlated with symbol over the window, strongest first"""
+        correlation = self.correlation()
+        if symbol not in correlation.index:
+            return pd.Series(dtype='float64')
+        return correlation[symbol].drop(symbol).dropna().sort_values(ascending=False).head(n)
+
+_analytics = None
+_analytics_lock = threading.Lock()
+
+def get_analytics():
+    """Get the process-wide analytics state"""
+    global _analytics
+    with _analytics_lock:
+        if _analytics is None:
+            _analytics = CrossSectionAnalytics()
+        return _analytics
@@ -0,0 +1,261 @@
+"""Read-only HTTP/JSON API over the stored data (http.server, no web framework).
+
+    python api_server.py --port 8765
+
+    GET /health
+    GET /symbols                                  universe registry metadata
+    GET /snapshot                                 latest values for every symbol
+    GET /signals                                  symbols with active signals on their latest bar
+    GET /alerts?symbol=INFY.NS&since=2025-06-01   recorded alert events, newest first
+    GET /history/INFY.NS?start=2025-05-01&end=2025-06-01&columns=Close,RSI&tail=100
+
+Every response carries an ETag (and X-Data-Version where the data has one);
+send it back in If-None-Match to get 304 Not Modified. Snapshot and signal
+tags follow the snapshot table itself, so rebuilds that don't go through the
+change feed still invalidate them. History responses
+longer than API_STREAM_ROWS rows are streamed with chunked encoding.
+"""
+import argparse
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs, unquote
+import pandas as pd
+from config import API_HOST, API_PORT, API_STREAM_ROWS, API_FRAME_CACHE
+from storage import get_file_path, get_data_version
+from snapshot import load_snapshot, snapshot_version
+from change_feed import get_change_feed
+from alert_store import AlertStore
+
+class FrameCache:
+    """Parsed history frames keyed by symbol, reused until the stored file's version changes"""
+
+    def __init__(self, max_entries=API_FRAME_CACHE):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, symbol):
+        """Get (frame, version) for symbol, or (None, None) if it has no stored data"""
+        version = get_data_version(symbol)
+        if version is None:
+            return None, None
+        with self._lock:
+            cached = self.entries.get(symbol)
+            if cached and cached[0] == version:
+                self.entries.move_to_end(symbol)
+                return cached[1], version
+
+        # Read the file directly: utils.load_stock_data reports errors through Streamlit
+        try:
+            df = pd.read_csv(get_file_path(symbol), index_col=0, parse_dates=True)
+        except FileNotFoundError:
+            return None, None
+        with self._lock:
+            self.entries[symbol] = (version, df)
+            self.entries.move_to_end(symbol)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return df, version
+
+def _records(df):
+    """JSON text of a frame's rows (timestamp included), without the enclosing brackets"""
+    return df.reset_index(names='timestamp').to_json(orient='records', date_format='iso')[1:-1]
+
+def _as_index_time(value, index):
+    timestamp = pd.Timestamp(value)
+    if index.tz is not None and timestamp.tz is None:
+        return timestamp.tz_localize(index.tz)
+    return timestamp
+
+class ApiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "StockDataAPI/1.0"
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        parts = [unquote(part) for part in url.path.strip('/').split('/') if part]
+
+        routes = {
+            'health': self.get_health,
+            'symbols': self.get_symbols,
+            'snapshot': self.get_snapshot,
+            'signals': self.get_signals,
+            'alerts': self.get_alerts,
+            'history': self.get_history
+        }
+        route = routes.get(parts[0]) if parts else None
+        if route is None:
+            self.send_json({'error': f"Unknown endpoint: {url.path}"}, status=404)
+            return
+
+        try:
+            route(parts[1:], params)
+        except ValueError as e:
+            self.send_json({'error': str(e)}, status=400)
+        except Exception as e:
+            self.send_json({'error': f"Internal error: {str(e)}"}, status=500)
+
+    def not_modified(self, etag):
+        """Send 304 if the client already has this version"""
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return True
+        return False
+
+    def send_json(self, payload, status=200, etag=None, version=None):
+        body = (payload if isinstance(payload, str) else json.dumps(payload, default=str)).encode()
+        etag = etag or f'"{hashlib.md5(body).hexdigest()}"'
+        if status == 200 and self.not_modified(etag):
+            return
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        if version is not None:
+            self.send_header('X-Data-Version', str(version))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_chunked(self, chunks, etag, version):
+        """Stream an iterable of text chunks with chunked transfer encoding"""
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.send_header('ETag', etag)
+        self.send_header('X-Data-Version', str(version))
+        self.end_headers()
+        for chunk in chunks:
+            data = chunk.encode()
+            if data:
+                self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def get_health(self, parts, params):
+        self.send_json({'status': 'ok', 'feed_seq': self.server.feed.latest_seq()})
+
+    def get_symbols(self, parts, params):
+        from universe import get_universe
+        self.send_json(list(get_universe().get_metadata().values()))
+
+    def _snapshot_body(self):
+        """Snapshot JSON, rebuilt only when the snapshot table has changed"""
+        version = snapshot_version()
+        with self.server.lock:
+            if self.server.snapshot_cache and self.server.snapshot_cache[0] == version:
+                return version, self.server.snapshot_cache[1]
+        snapshot = load_snapshot().reset_index()
+        body = snapshot.to_json(orient='records')
+        with self.server.lock:
+            self.server.snapshot_cache = (version, body)
+        return version, body
+
+    def get_snapshot(self, parts, params):
+        etag = f'"snapshot-{snapshot_version()}"'
+        if self.not_modified(etag):
+            return
+        version, body = self._snapshot_body()
+        self.send_json(body, etag=f'"snapshot-{version}"', version=version)
+
+    def get_signals(self, parts, params):
+        etag = f'"signals-{snapshot_version()}"'
+        if self.not_modified(etag):
+            return
+        version, body = self._snapshot_body()
+        signals = [
+            {'symbol': row['symbol'], 'timestamp': row['timestamp'], 'signals': row['signals'].split(", ")}
+            for row in json.loads(body) if row.get('signals')
+        ]
+        self.send_json(signals, etag=f'"signals-{version}"', version=version)
+
+    def get_alerts(self, parts, params):
+        since = pd.Timestamp(params['since']).to_pydatetime() if 'since' in params else None
+        self.send_json(self.server.alerts.get_alerts(symbol=params.get('symbol'), since=since))
+
+    def get_history(self, parts, params):
+        if len(parts) != 1:
+            raise ValueError("Use /history/<symbol>")
+        symbol = parts[0]
+
+        df, version = self.server.frames.get(symbol)
+        if df is None or df.empty:
+            self.send_json({'error': f"No data for {symbol}"}, status=404)
+            return
+
+        query = "&".join(f"{key}={params[key]}" for key in sorted(params))
+        data_version = f"{version[0]}-{version[1]}"
+        etag = f'"{data_version}-{hashlib.md5(query.encode()).hexdigest()[:12]}"'
+        if self.not_modified(etag):
+            return
+
+        if 'start' in params:
+            df = df[df.index >= _as_index_time(params['start'], df.index)]
+        if 'end' in params:
+            df = df[df.index < _as_index_time(params['end'], df.index)]
+        if 'tail' in params:
+            df = df.tail(int(params['tail']))
+        if 'columns' in params:
+            columns = [column for column in params['columns'].split(',') if column]
+            unknown = sorted(set(columns) - set(df.columns))
+            if unknown:
+                raise ValueError(f"Unknown columns: {', '.join(unknown)}")
+            df = df[columns]
+
+        header = json.dumps({'symbol': symbol, 'version': data_version, 'rows': len(df)})[:-1]
+        if len(df) <= API_STREAM_ROWS:
+            self.send_json(f'{header}, "data": [{_records(df)}]}}', etag=etag, version=data_version)
+            return
+
+        def chunks():
+            yield f'{header}, "data": ['
+            for start in range(0, len(df), API_STREAM_ROWS):
+                yield ("," if start else "") + _records(df.iloc[start:start + API_STREAM_ROWS])
+            yield ']}'
+        self.send_chunked(chunks(), etag, data_version)
+
+class ApiServer(ThreadingHTTPServer):
+    """Threaded server holding the shared frame cache, snapshot cache, change feed and alert store"""
+
+    daemon_threads = True
+
+    def __init__(self, address, verbose=False):
+        super().__init__(address, ApiHandler)
+        self.verbose = verbose
+        self.frames = FrameCache()
+        self.feed = get_change_feed()
+        self.snapshot_cache = None
+        self.alerts = AlertStore()  # one connection for every request; the store serializes access
+        self.lock = threading.Lock()
+
+    def server_close(self):
+        super().server_close()
+        self.alerts.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default=API_HOST)
+    parser.add_argument("--port", type=int, default=API_PORT)
+    parser.add_argument("--verbose", action="store_true", help="log every request")
+    args = parser.parse_args()
+
+    server = ApiServer((args.host, args.port), verbose=args.verbose)
+    print(f"Serving on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
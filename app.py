@@ -1,17 +1,31 @@
 import streamlit as st
 import pandas as pd
-import plotly.graph_objects as go
-import plotly.subplots as sp
 from datetime import datetime, timedelta
-import time
 import threading
-from config import NIFTY_100_SYMBOLS, REFRESH_INTERVAL, MAX_CHARTS_PER_PAGE
+from config import (
+    REFRESH_INTERVAL, MAX_CHARTS_PER_PAGE, CHART_MAX_POINTS, TIMEFRAME, HISTORY_MAX_BARS, HOT_RETENTION_DAYS,
+    CORRELATION_WINDOW, RS_LOOKBACK, RS_BENCHMARK
+)
+from charts import (
+    build_stock_chart, build_sparkline, build_universe_heatmap, build_correlation_heatmap, apply_dashboard_theme
+)
+from snapshot import load_snapshot, rebuild_snapshot, snapshot_version
+from change_feed import get_change_feed
+from scanner import get_scanner
+from metrics import metrics, export_metrics
+from profiling import profiled, set_profiling, recent_profiles
+from figure_cache import get_figure_cache
+from memory import deep_sizeof, report_session, memory_report, INDICATOR_WARMUP_BARS
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 from data_manager import DataManager
+from universe import get_universe
+from analytics import get_analytics
+from reports import build_summary_cards, generate_reports
 from alert_system import AlertSystem
-from indicators import get_latest_signals, get_indicator_summary
+from indicators import get_indicator_summary, SIGNAL_TYPES
 from utils import (
     load_stock_data, format_number, format_percentage, get_color_for_value,
-    validate_email_config, get_stock_status_summary, clean_old_alerts
+    validate_email_config, get_stock_status_summary, clean_old_alerts, get_data_version
 )
 
 # Page configuration
@@ -295,237 +309,228 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Initialize session state
-if 'data_manager' not in st.session_state:
-    st.session_state.data_manager = DataManager()
-
 if 'alert_system' not in st.session_state:
     st.session_state.alert_system = AlertSystem()
 
+if 'data_manager' not in st.session_state:
+    st.session_state.data_manager = DataManager(alert_system=st.session_state.alert_system)
+
 if 'auto_refresh' not in st.session_state:
     st.session_state.auto_refresh = False
 
 if 'last_scan_time' not in st.session_state:
     st.session_state.last_scan_time = None
 
-def create_stock_chart(symbol, df):
+# Active symbols from the registry (deduplicated, delisted symbols excluded)
+UNIVERSE_SYMBOLS = get_universe().symbols()
+
+# Profiling toggle applies to this script run only (zero cost when off)
+set_profiling(st.session_state.get('profiling', False))
+
+def create_stock_chart(symbol, df, x_range=None, version=None):
     """Create comprehensive stock chart with all indicators"""
+    def build():
+        chart = build_stock_chart(symbol, df, CHART_MAX_POINTS, x_range)
+        # Update chart theme for modern look
+        return apply_dashboard_theme(chart) if chart else chart
+    
+    if version is None:
+        return build()
+    return get_figure_cache().get_or_build((symbol, TIMEFRAME, version, 'chart', x_range), build)
+
+def display_stock_summary(symbol, df, version=None):
+    """Display stock summary metrics with modern cards"""
     if df.empty:
-        return None
+        return
     
-    # Create subplots
-    fig = sp.make_subplots(
-        rows=4, cols=1,
-        shared_xaxes=True,
-        vertical_spacing=0.05,
-        row_heights=[0.4, 0.2, 0.2, 0.2],
-        subplot_titles=(
-            f'{symbol.replace(".NS", "")} - Price & Volume',
-            'MACD',
-            'RSI',
-            'MFI'
+    if version is None:
+        cards = build_summary_cards(symbol, df)
+    else:
+        cards = get_figure_cache().get_or_build(
+            (symbol, TIMEFRAME, version, 'summary'),
+            lambda: build_summary_cards(symbol, df)
         )
-    )
     
-    # Price and Volume
-    fig.add_trace(
-        go.Candlestick(
-            x=df.index,
-            open=df['Open'],
-            high=df['High'],
-            low=df['Low'],
-            close=df['Close'],
-            name='Price'
-        ),
-        row=1, col=1
+    # Display metrics with custom cards
+    for col, card in zip(st.columns(4), cards):
+        with col:
+            st.markdown(card, unsafe_allow_html=True)
+
+def get_sparkline(symbol):
+    """Get a cached sparkline for symbol, or None if no data is stored"""
+    version = get_data_version(symbol)
+    if version is None:
+        return None
+    return get_figure_cache().get_or_build(
+        (symbol, TIMEFRAME, version, 'sparkline'),
+        lambda: build_sparkline(symbol, load_stock_data(symbol))
     )
+
+def prefetch_sparklines(symbols):
+    """Build sparklines for symbols in the background so the next page renders instantly"""
+    for symbol in symbols:
+        version = get_data_version(symbol)
+        if version is not None:
+            get_figure_cache().prefetch(
+                (symbol, TIMEFRAME, version, 'sparkline'),
+                lambda symbol=symbol: build_sparkline(symbol, load_stock_data(symbol))
+            )
+
+def display_chart_grid():
+    """Display a paginated grid of sparklines, rendering only the visible page"""
+    total_pages = max(1, -(-len(UNIVERSE_SYMBOLS) // MAX_CHARTS_PER_PAGE))
+    page = st.number_input("Page", min_value=1, max_value=total_pages, value=1, step=1)
+    st.caption(f"Page {page} of {total_pages}")
+    
+    start = (page - 1) * MAX_CHARTS_PER_PAGE
+    page_symbols = UNIVERSE_SYMBOLS[start:start + MAX_CHARTS_PER_PAGE]
+    
+    cols = st.columns(3)
+    for i, symbol in enumerate(page_symbols):
+        with cols[i % 3]:
+            sparkline = get_sparkline(symbol)
+            if sparkline is None:
+                st.markdown(f"**{symbol.replace('.NS', '')}** — no data")
+                continue
+            st.markdown(f"**{symbol.replace('.NS', '')}**")
+            st.plotly_chart(
+                sparkline, use_container_width=True,
+                config={'staticPlot': True}, key=f"sparkline-{symbol}"
+            )
     
-    # Volume bars
-    colors = ['red' if df['Close'].iloc[i] < df['Open'].iloc[i] else 'green' 
-              for i in range(len(df))]
-    
-    fig.add_trace(
-        go.Bar(
-            x=df.index,
-            y=df['Volume'],
-            name='Volume',
-            marker_color=colors,
-            opacity=0.7,
-            yaxis='y2'
-        ),
-        row=1, col=1
-    )
+    # Warm the cache for the next page while the user looks at this one
+    prefetch_sparklines(UNIVERSE_SYMBOLS[start + MAX_CHARTS_PER_PAGE:start + 2 * MAX_CHARTS_PER_PAGE])
+
+def display_market_overview():
+    """Display a screener table and heatmap of the latest values for the whole universe"""
+    st.markdown("""
+    <div class="main-header">
+        <h2>🌐 Market Overview</h2>
+        <p>Latest indicator values across the universe</p>
+    </div>
+    """, unsafe_allow_html=True)
     
-    # MACD
-    if 'MACD' in df.columns:
-        fig.add_trace(
-            go.Scatter(
-                x=df.index,
-                y=df['MACD'],
-                name='MACD',
-                line=dict(color='blue')
-            ),
-            row=2, col=1
-        )
-        
-        fig.add_trace(
-            go.Scatter(
-                x=df.index,
-                y=df['MACD_Signal'],
-                name='Signal',
-                line=dict(color='red')
-            ),
-            row=2, col=1
-        )
-        
-        fig.add_trace(
-            go.Bar(
-                x=df.index,
-                y=df['MACD_Histogram'],
-                name='Histogram',
-                marker_color='gray',
-                opacity=0.7
-            ),
-            row=2, col=1
-        )
+    # One bulk read of latest values; no per-symbol history loads
+    snapshot = load_snapshot(UNIVERSE_SYMBOLS)
+    if snapshot.empty:
+        st.info("No snapshot yet. Click 'Download All Data' or rebuild it from stored files.")
+        if st.button("Rebuild snapshot from stored data"):
+            with st.spinner("Rebuilding snapshot..."):
+                rebuild_snapshot(UNIVERSE_SYMBOLS)
+            st.rerun()
+        return
     
-    # RSI
-    if 'RSI' in df.columns:
-        fig.add_trace(
-            go.Scatter(
-                x=df.index,
-                y=df['RSI'],
-                name='RSI',
-                line=dict(color='purple')
-            ),
-            row=3, col=1
-        )
-        
-        # RSI levels
-        fig.add_hline(y=70, line_dash="dash", line_color="red")
-        fig.add_hline(y=30, line_dash="dash", line_color="green")
-    
-    # MFI
-    if 'MFI' in df.columns:
-        fig.add_trace(
-            go.Scatter(
-                x=df.index,
-                y=df['MFI'],
-                name='MFI',
-                line=dict(color='orange')
-            ),
-            row=4, col=1
-        )
-        
-        # MFI levels
-        fig.add_hline(y=80, line_dash="dash", line_color="red")
-        fig.add_hline(y=20, line_dash="dash", line_color="green")
-    
-    # Update layout
-    fig.update_layout(
-        height=800,
-        showlegend=True,
-        xaxis_rangeslider_visible=False
+    screener = snapshot[['Close', 'Change_Pct', 'RSI', 'MFI', 'Volume_Ratio', 'MACD_Histogram', 'signals', 'timestamp']].copy()
+    metadata = get_universe().get_metadata(screener.index)
+    screener.insert(0, 'Sector', [metadata.get(symbol, {}).get('sector') for symbol in screener.index])
+    screener.insert(1, 'Kind', [metadata.get(symbol, {}).get('kind') for symbol in screener.index])
+    screener.index = screener.index.str.replace('.NS', '', regex=False)
+    screener.index.name = 'Stock'
+    
+    # Filters
+    col1, col2, col3, col4, col5 = st.columns(5)
+    with col1:
+        search = st.text_input("Search", placeholder="e.g. INFY")
+    with col2:
+        sector = st.selectbox("Sector", ["All"] + get_universe().sectors())
+    with col3:
+        rsi_range = st.slider("RSI", 0.0, 100.0, (0.0, 100.0))
+    with col4:
+        min_volume_ratio = st.number_input("Min volume ratio", min_value=0.0, value=0.0, step=0.5)
+    with col5:
+        signals_only = st.checkbox("Active signals only")
+    
+    mask = screener['RSI'].between(*rsi_range) | screener['RSI'].isna()
+    if sector != "All":
+        mask &= screener['Sector'] == sector
+    mask &= screener['Volume_Ratio'].fillna(0) >= min_volume_ratio
+    if search:
+        mask &= screener.index.str.contains(search.upper(), regex=False)
+    if signals_only:
+        mask &= screener['signals'].fillna('') != ''
+    screener = screener[mask]
+    matches = list(snapshot.index[mask.to_numpy()])
+    
+    st.caption(f"{len(screener)} of {len(snapshot)} stocks")
+    st.dataframe(
+        screener,
+        use_container_width=True,
+        column_config={
+            'Close': st.column_config.NumberColumn("Price (₹)", format="%.2f"),
+            'Change_Pct': st.column_config.NumberColumn("Change %", format="%+.2f"),
+            'RSI': st.column_config.NumberColumn(format="%.1f"),
+            'MFI': st.column_config.NumberColumn(format="%.1f"),
+            'Volume_Ratio': st.column_config.NumberColumn("Volume Ratio", format="%.2fx"),
+            'MACD_Histogram': st.column_config.NumberColumn("MACD Hist", format="%.4f"),
+            'signals': "Signals",
+            'timestamp': "Bar"
+        }
     )
     
-    # Update y-axes
-    fig.update_yaxes(title_text="Price (₹)", row=1, col=1)
-    fig.update_yaxes(title_text="MACD", row=2, col=1)
-    fig.update_yaxes(title_text="RSI", row=3, col=1, range=[0, 100])
-    fig.update_yaxes(title_text="MFI", row=4, col=1, range=[0, 100])
+    if st.button(f"📄 Generate reports for {len(matches)} stocks", disabled=not matches):
+        with st.spinner("Rendering reports..."):
+            result = generate_reports(matches)
+        st.success(
+            f"{result['rendered']} rendered, {result['reused']} unchanged · index: {result['index']}"
+        )
+        for symbol, error in result['failed'].items():
+            st.warning(f"Report for {symbol} failed: {error}")
     
-    return fig
+    # Heatmap
+    metric = st.selectbox("Heatmap metric", ['Change_Pct', 'RSI', 'MFI', 'Volume_Ratio'])
+    if not screener.empty:
+        st.plotly_chart(build_universe_heatmap(screener[metric]), use_container_width=True)
 
-def display_stock_summary(symbol, df):
-    """Display stock summary metrics with modern cards"""
-    if df.empty:
+    display_cross_section(set(screener.index))
+
+def display_cross_section(visible):
+    """Display relative-strength ranks and rolling correlations for the screened stocks"""
+    st.markdown("### 📈 Relative Strength & Correlation")
+    analytics = get_analytics()
+    analytics.refresh(UNIVERSE_SYMBOLS)
+    strength = analytics.relative_strength()
+    if strength.empty:
+        st.info("Not enough stored history for cross-sectional analytics yet.")
         return
-    
-    latest = df.iloc[-1]
-    previous = df.iloc[-2] if len(df) > 1 else latest
-    
-    # Price metrics
-    price_change = latest['Close'] - previous['Close']
-    price_change_pct = (price_change / previous['Close']) * 100 if previous['Close'] != 0 else 0
-    
-    # Display metrics with custom cards
-    col1, col2, col3, col4 = st.columns(4)
-    
+
+    strength = strength.copy()
+    strength.index = strength.index.str.replace('.NS', '', regex=False)
+    strength = strength[strength.index.isin(visible)].sort_values('RS_Market', ascending=False)
+    st.caption(
+        f"{RS_LOOKBACK}-bar returns vs {RS_BENCHMARK.replace('.NS', '')} and sector ETFs; "
+        f"correlations over {CORRELATION_WINDOW} bars, as of {analytics.as_of()}"
+    )
+    st.dataframe(
+        strength,
+        use_container_width=True,
+        column_config={
+            'Benchmark': "Sector Benchmark",
+            'Return_Pct': st.column_config.NumberColumn("Return %", format="%+.2f"),
+            'RS_Market': st.column_config.NumberColumn("RS vs Market %", format="%+.2f"),
+            'RS_Market_Rank': st.column_config.ProgressColumn("Market Percentile", format="%.0f", min_value=0, max_value=100),
+            'RS_Sector': st.column_config.NumberColumn("RS vs Sector %", format="%+.2f"),
+            'RS_Sector_Rank': st.column_config.ProgressColumn("Sector Percentile", format="%.0f", min_value=0, max_value=100),
+            'Avg_Correlation': st.column_config.NumberColumn("Avg Correlation", format="%.2f")
+        }
+    )
+
+    col1, col2 = st.columns([1, 2])
     with col1:
-        delta_class = "positive" if price_change >= 0 else "negative"
-        delta_icon = "📈" if price_change >= 0 else "📉"
-        st.markdown(f"""
-        <div class="metric-card">
-            <h3>{symbol.replace('.NS', '')} Price</h3>
-            <div class="metric-value">₹{latest['Close']:.2f}</div>
-            <div class="metric-delta {delta_class}">
-                {delta_icon} {price_change:+.2f} ({price_change_pct:+.2f}%)
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
-    
+        symbol = st.selectbox("Most correlated with", sorted(strength.index))
+        if symbol:
+            peers = analytics.top_correlated(f"{symbol}.NS")
+            peers.index = peers.index.str.replace('.NS', '', regex=False)
+            st.dataframe(peers.rename("Correlation").to_frame(), use_container_width=True)
     with col2:
-        volume_ratio = latest.get('Volume_Ratio', 1)
-        volume_icon = "🔊" if volume_ratio > 1.5 else "🔉"
-        st.markdown(f"""
-        <div class="metric-card">
-            <h3>Volume</h3>
-            <div class="metric-value">{format_number(latest['Volume'])}</div>
-            <div class="metric-delta">
-                {volume_icon} {volume_ratio:.2f}x average
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col3:
-        rsi_value = latest.get('RSI', 50)
-        if rsi_value > 70:
-            rsi_status = "Overbought"
-            rsi_class = "danger"
-            rsi_icon = "⚠️"
-        elif rsi_value < 30:
-            rsi_status = "Oversold" 
-            rsi_class = "success"
-            rsi_icon = "✅"
-        else:
-            rsi_status = "Neutral"
-            rsi_class = "info"
-            rsi_icon = "ℹ️"
-        
-        st.markdown(f"""
-        <div class="metric-card">
-            <h3>RSI</h3>
-            <div class="metric-value">{rsi_value:.1f}</div>
-            <div class="metric-delta">
-                <span class="status-badge {rsi_class}">{rsi_icon} {rsi_status}</span>
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col4:
-        mfi_value = latest.get('MFI', 50)
-        if mfi_value > 80:
-            mfi_status = "Overbought"
-            mfi_class = "danger"
-            mfi_icon = "⚠️"
-        elif mfi_value < 20:
-            mfi_status = "Oversold"
-            mfi_class = "success"
-            mfi_icon = "✅"
-        else:
-            mfi_status = "Neutral"
-            mfi_class = "info"
-            mfi_icon = "ℹ️"
-            
-        st.markdown(f"""
-        <div class="metric-card">
-            <h3>MFI</h3>
-            <div class="metric-value">{mfi_value:.1f}</div>
-            <div class="metric-delta">
-                <span class="status-badge {mfi_class}">{mfi_icon} {mfi_status}</span>
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
+        correlation = analytics.correlation()
+        labels = correlation.index.str.replace('.NS', '', regex=False)
+        shown = correlation.index[labels.isin(visible)]
+        if len(shown) > 60:
+            st.info(f"Narrow the screener to 60 stocks or fewer (currently {len(shown)}) to see the correlation heatmap.")
+        elif len(shown) > 1:
+            st.plotly_chart(build_correlation_heatmap(correlation.loc[shown, shown]), use_container_width=True)
 
+@profiled("run_signal_scanner")
 def run_signal_scanner():
     """Run signal scanner for all symbols with modern UI"""
     st.markdown("""
@@ -536,14 +541,8 @@ def run_signal_scanner():
     """, unsafe_allow_html=True)
     
     with st.spinner("Scanning for signals..."):
-        signals_found = []
-        
-        for symbol in NIFTY_100_SYMBOLS:
-            df = load_stock_data(symbol)
-            if not df.empty:
-                signals = get_latest_signals(symbol, df)
-                if signals['signals']:
-                    signals_found.append(signals)
+        # Only symbols updated since the previous scan are re-read
+        signals_found = get_scanner().scan(UNIVERSE_SYMBOLS)
         
         st.session_state.last_scan_time = datetime.now()
     
@@ -592,136 +591,28 @@ def run_signal_scanner():
         </div>
         """, unsafe_allow_html=True)
 
-# Main Application
-def main():
-    # Modern header
-    st.markdown("""
-    <div class="main-header">
-        <h1>📈 Nifty 100 Stock Analysis Dashboard</h1>
-        <p>Advanced technical analysis for Nifty 100 stocks with automated alerts</p>
-    </div>
-    """, unsafe_allow_html=True)
-    
-    # Sidebar with modern styling
-    st.sidebar.markdown("""
-    <div class="sidebar-section">
-        <h2 style="margin-top: 0;">⚡ Dashboard Controls</h2>
-    </div>
-    """, unsafe_allow_html=True)
-    
-    # Data management section
-    st.sidebar.markdown("""
-    <div class="sidebar-section">
-        <h3>📊 Data Management</h3>
-    </div>
-    """, unsafe_allow_html=True)
-    
-    if st.sidebar.button("📥 Download All Data", help="Download latest data for all Nifty 100 stocks"):
-        with st.spinner("Downloading data for all Nifty 100 stocks..."):
-            progress_bar = st.progress(0)
-            status_text = st.empty()
-            
-            result = st.session_state.data_manager.download_batch_data(
-                NIFTY_100_SYMBOLS, 
-                progress_bar, 
-                status_text
-            )
-            
-            if result['successful'] > 0:
-                st.markdown(f"""
-                <div class="alert-success">
-                    <strong>Success!</strong> Downloaded {result['successful']}/{result['total']} stocks successfully
-                </div>
-                """, unsafe_allow_html=True)
-            
-            if result['failed']:
-                st.markdown(f"""
-                <div class="alert-warning">
-                    <strong>Partial Success:</strong> Failed to download: {', '.join(result['failed'][:5])}
-                    {f"... and {len(result['failed'])-5} more" if len(result['failed']) > 5 else ""}
-                </div>
-                """, unsafe_allow_html=True)
-    
-    # Stock selection
-    st.sidebar.markdown("""
-    <div class="sidebar-section">
-        <h3>🎯 Stock Analysis</h3>
-    </div>
-    """, unsafe_allow_html=True)
-    
-    selected_stock = st.sidebar.selectbox(
-        "Select a stock to analyze:",
-        NIFTY_100_SYMBOLS,
-        format_func=lambda x: x.replace('.NS', ''),
-        help="Choose from Nifty 100 stocks for detailed analysis"
-    )
-    
-    # Analysis options with modern styling
-    st.sidebar.markdown("**Display Options:**")
-    show_chart = st.sidebar.checkbox("📊 Technical Chart", value=True)
-    show_summary = st.sidebar.checkbox("📋 Summary Cards", value=True)
-    
-    # Alert system
-    st.sidebar.markdown("""
-    <div class="sidebar-section">
-        <h3>🔔 Alert System</h3>
-    </div>
-    """, unsafe_allow_html=True)
-    
-    email_configured = validate_email_config()
-    
-    if email_configured:
-        st.sidebar.markdown("""
-        <div style="background: #d4edda; padding: 0.75rem; border-radius: 6px; border: 1px solid #c3e6cb; color: #155724; margin-bottom: 1rem;">
-            <strong>✅ Email Configured</strong><br>
-            <small>Ready to send alerts</small>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        if st.sidebar.button("🔔 Send Test Alert", help="Test your email configuration"):
-            if st.session_state.alert_system.send_email_alert(
-                "Test Alert", 
-                "This is a test alert from your Nifty 100 Dashboard"
-            ):
-                st.sidebar.markdown("""
-                <div style="background: #d4edda; padding: 0.5rem; border-radius: 4px; color: #155724;">
-                    Test alert sent successfully!
-                </div>
-                """, unsafe_allow_html=True)
-    else:
-        st.sidebar.markdown("""
-        <div style="background: #fff3cd; padding: 0.75rem; border-radius: 6px; border: 1px solid #ffeaa7; color: #856404; margin-bottom: 1rem;">
-            <strong>⚠️ Email Not Configured</strong><br>
-            <small>Set EMAIL_USER, EMAIL_PASSWORD, and EMAIL_RECIPIENTS environment variables</small>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    # Scanner section
-    st.sidebar.markdown("""
-    <div class="sidebar-section">
-        <h3>📡 Signal Scanner</h3>
-    </div>
-    """, unsafe_allow_html=True)
-    
-    if st.sidebar.button("🔍 Run Signal Scan", help="Scan all Nifty 100 stocks for trading signals"):
-        run_signal_scanner()
-    
-    if st.session_state.last_scan_time:
-        st.sidebar.markdown(f"""
-        <div style="background: #f8f9fa; padding: 0.5rem; border-radius: 4px; border-left: 3px solid #007bff; margin: 0.5rem 0;">
-            <small><strong>Last scan:</strong> {st.session_state.last_scan_time.strftime('%H:%M:%S')}</small>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    # Auto-refresh with modern toggle
-    st.sidebar.markdown("**Settings:**")
-    auto_refresh = st.sidebar.checkbox("🔄 Auto-refresh (60s)", value=st.session_state.auto_refresh)
-    st.session_state.auto_refresh = auto_refresh
-    
-    # Main content area
-    if selected_stock:
-        # Load stock data
-        df = st.session_state.data_manager.get_stock_data(selected_stock)
+def get_session_frame(symbol):
+    """Get symbol's frame, re-reading it only when its stored data version changed"""
+    version = get_data_version(symbol)
+    cached = st.session_state.get('frame_cache')
+    if version is not None and cached and cached[:2] == (symbol, version):
+        return cached[2], version
+    
+    # Keep the version read before the load: a save in between leaves an older
+    # version cached, so the next call re-reads instead of pinning stale data
+    df = st.session_state.data_manager.get_stock_data(symbol)
+    st.session_state.frame_cache = (symbol, version, df)
+    return df, version
+
+def render_main_content(view_mode, selected_stock, show_chart, show_summary):
+    """Render the data-bound main area (runs as a fragment, re-rendered when data changes)"""
+    if view_mode == "Chart Grid":
+        display_chart_grid()
+    elif view_mode == "Market Overview":
+        display_market_overview()
+    elif selected_stock:
+        # Load stock data (skipped when the stored version is unchanged)
+        df, data_version = get_session_frame(selected_stock)
         
         if df.empty:
             st.warning(f"No data available for {selected_stock}")
@@ -729,7 +620,7 @@ def main():
         else:
             # Display summary
             if show_summary:
-                display_stock_summary(selected_stock, df)
+                display_stock_summary(selected_stock, df, data_version)
                 st.markdown("---")
             
             # Display chart
@@ -740,15 +631,19 @@ def main():
                 </div>
                 """, unsafe_allow_html=True)
                 
-                chart = create_stock_chart(selected_stock, df)
-                if chart:
-                    # Update chart theme for modern look
-                    chart.update_layout(
-                        plot_bgcolor='rgba(0,0,0,0)',
-                        paper_bgcolor='rgba(0,0,0,0)',
-                        font=dict(family="Arial, sans-serif", size=12),
-                        margin=dict(l=20, r=20, t=40, b=20)
+                # Zooming re-aggregates the selected range server-side at full pixel budget
+                x_range = None
+                if len(df) > CHART_MAX_POINTS:
+                    x_range = st.slider(
+                        "Chart range",
+                        min_value=df.index[0].to_pydatetime(),
+                        max_value=df.index[-1].to_pydatetime(),
+                        value=(df.index[0].to_pydatetime(), df.index[-1].to_pydatetime()),
+                        format="YYYY-MM-DD"
                     )
+                
+                chart = create_stock_chart(selected_stock, df, x_range, data_version)
+                if chart:
                     st.plotly_chart(chart, use_container_width=True)
                 
                 # Display indicator summary with modern cards
@@ -847,21 +742,30 @@ def main():
                             </div>
                         </div>
                         """, unsafe_allow_html=True)
-    
-    # Data status with modern styling
-    st.sidebar.markdown("""
+
+def watch_data_changes():
+    """Rerun the page only when stored data changed since this session last rendered it (runs as a polling fragment)"""
+    token = (get_change_feed().latest_seq(), snapshot_version())
+    seen = st.session_state.get('seen_data_token')
+    st.session_state.seen_data_token = token
+    if seen is not None and token != seen:
+        st.rerun()
+
+def render_data_status():
+    """Render the sidebar data status (runs as a fragment, re-rendered when data changes)"""
+    st.markdown("""
     <div class="sidebar-section">
         <h3>📊 Data Status</h3>
     </div>
     """, unsafe_allow_html=True)
     
-    status = get_stock_status_summary(NIFTY_100_SYMBOLS)
+    status = get_stock_status_summary(UNIVERSE_SYMBOLS)
     
     # Create status indicators
-    total_stocks = len(NIFTY_100_SYMBOLS)
+    total_stocks = len(UNIVERSE_SYMBOLS)
     loaded_pct = (status['loaded'] / total_stocks * 100) if total_stocks > 0 else 0
     
-    st.sidebar.markdown(f"""
+    st.markdown(f"""
     <div style="background: #f8f9fa; padding: 1rem; border-radius: 8px; margin-bottom: 1rem;">
         <div style="display: flex; justify-content: space-between; margin-bottom: 0.5rem;">
             <span>✅ Loaded:</span>
@@ -881,11 +785,309 @@ def main():
         <small style="color: #6c757d;">Data Coverage: {loaded_pct:.1f}%</small>
     </div>
     """, unsafe_allow_html=True)
+
+def report_session_memory():
+    """Report the bytes held in this session's state for the memory panel"""
+    ctx = get_script_run_ctx()
+    if ctx is not None:
+        report_session(ctx.session_id, sum(deep_sizeof(value) for value in st.session_state.to_dict().values()))
+
+def display_memory_usage():
+    """Display bytes held per symbol, per cache and per session"""
+    cached = st.session_state.get('frame_cache')
+    report = memory_report({cached[0]: cached[2]} if cached else None)
+    
+    rows = [{'holder': f"symbol {symbol}", 'bytes': size} for symbol, size in report['symbols'].items()]
+    rows += [{'holder': f"cache {name}", 'bytes': size} for name, size in report['caches'].items()]
+    rows += [{'holder': f"session {session_id[:8]}", 'bytes': size} for session_id, size in report['sessions'].items()]
+    st.dataframe(pd.DataFrame(rows).set_index('holder'), use_container_width=True)
+    
+    rss = report['process_rss']
+    st.caption(
+        (f"Process RSS: {format_number(rss)} · " if rss else "") +
+        (f"History bound: last {HISTORY_MAX_BARS} bars + {INDICATOR_WARMUP_BARS} warm-up"
+         if HISTORY_MAX_BARS else "History bound: off (set HISTORY_MAX_BARS)")
+    )
+
+def display_diagnostics():
+    """Display pipeline stage timings, slow symbols and cache rates"""
+    metrics.collect()
+    
+    stages = [
+        {
+            'name': row['metric'] + (f" [{row['stage']}]" if row.get('stage') else ""),
+            'count': row['count'],
+            'avg': row['avg'],
+            'max': row['max']
+        }
+        for row in metrics.get_summaries()
+        if row['metric'] != 'ingest_fetch_seconds'
+    ]
+    if stages:
+        st.dataframe(pd.DataFrame(stages).set_index('name').round(4), use_container_width=True)
+    else:
+        st.caption("No timings recorded yet in this process")
+    
+    report = st.session_state.data_manager.pipeline.last_report
+    if report:
+        st.markdown(f"**Last pipeline run** ({report['symbols']} stocks)")
+        st.dataframe(pd.DataFrame(report['stages']).T.round(3), use_container_width=True)
+        for symbol, (stage, error) in list(report['failed'].items())[:10]:
+            st.caption(f"{symbol} failed at {stage}: {error}")
+    
+    retention = st.session_state.data_manager.last_retention
+    if retention:
+        st.markdown(f"**Last compaction:** {sum(retention['moved'].values())} rows moved from {len(retention['moved'])} stocks")
+        for symbol, error in list(retention['failed'].items())[:10]:
+            st.caption(f"{symbol} compaction failed: {error}")
+
+    fetches = metrics.get_summaries('ingest_fetch_seconds')
+    if fetches:
+        st.markdown("**Slowest fetches**")
+        slowest = pd.DataFrame(fetches).sort_values('max', ascending=False).head(10)
+        st.dataframe(
+            slowest.set_index('symbol')[['count', 'avg', 'max']].round(3),
+            use_container_width=True
+        )
+    
+    gauges = {name: value for (name, labels), value in metrics.gauges.items() if not labels}
+    counters = {name: value for (name, labels), value in metrics.counters.items() if not labels}
+    st.caption(
+        f"Figure cache hit ratio: {gauges.get('figure_cache_hit_ratio', 0):.0%} · "
+        f"Bytes written: {format_number(counters.get('ingest_bytes_written_total', 0))} · "
+        f"Alert queue depth: {gauges.get('alert_queue_depth', 0)}"
+    )
+    
+    if st.button("Export metrics"):
+        path = export_metrics()
+        if path:
+            st.caption(f"Written to {path}")
+    
+    st.checkbox(
+        "Profile reruns, downloads and scans", key="profiling",
+        help="Writes cProfile output to stock_data/profiles/ (or set DASHBOARD_PROFILE=1)"
+    )
+    if recent_profiles:
+        latest = recent_profiles[0]
+        st.markdown(f"**Last profile:** {latest['name']} at {latest['timestamp'].strftime('%H:%M:%S')}")
+        st.dataframe(
+            pd.DataFrame(latest['top']).set_index('function').round(4),
+            use_container_width=True
+        )
+        st.caption(f"Saved to {latest['path']}")
+    
+    if st.checkbox("Show memory usage", help="Sizes frames, figures and session state (takes a moment)"):
+        display_memory_usage()
+
+def display_download_result(result):
+    """Display the outcome of a download or retry run"""
+    if result['successful'] > 0:
+        st.markdown(f"""
+        <div class="alert-success">
+            <strong>Success!</strong> Downloaded {result['successful']}/{result['total']} stocks successfully
+        </div>
+        """, unsafe_allow_html=True)
+    
+    if result['failed']:
+        st.markdown(f"""
+        <div class="alert-warning">
+            <strong>Partial Success:</strong> Failed to download: {', '.join(result['failed'][:5])}
+            {f"... and {len(result['failed'])-5} more" if len(result['failed']) > 5 else ""}
+        </div>
+        """, unsafe_allow_html=True)
+    
+    if result['alerted']:
+        st.markdown(f"""
+        <div class="alert-info">
+            <strong>Alerts queued:</strong> {', '.join(s.replace('.NS', '') for s in result['alerted'])}
+        </div>
+        """, unsafe_allow_html=True)
+
+# Main Application
+@profiled("rerun")
+def main():
+    # Modern header
+    st.markdown("""
+    <div class="main-header">
+        <h1>📈 Nifty 100 Stock Analysis Dashboard</h1>
+        <p>Advanced technical analysis for Nifty 100 stocks with automated alerts</p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    # Sidebar with modern styling
+    st.sidebar.markdown("""
+    <div class="sidebar-section">
+        <h2 style="margin-top: 0;">⚡ Dashboard Controls</h2>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    # Data management section
+    st.sidebar.markdown("""
+    <div class="sidebar-section">
+        <h3>📊 Data Management</h3>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    if st.sidebar.button("📥 Download All Data", help="Download latest data for all Nifty 100 stocks"):
+        with st.spinner("Downloading data for all Nifty 100 stocks..."):
+            progress_bar = st.progress(0)
+            status_text = st.empty()
+            
+            result = st.session_state.data_manager.download_batch_data(
+                UNIVERSE_SYMBOLS, 
+                progress_bar, 
+                status_text
+            )
+            
+            display_download_result(result)
+    
+    pipeline = st.session_state.data_manager.pipeline
+    if pipeline.failed and st.sidebar.button(
+        f"🔁 Retry Failed ({len(pipeline.failed)})",
+        help="Re-run failed stocks from the stage where each one failed; completed stages are not repeated"
+    ):
+        with st.spinner("Retrying failed stocks..."):
+            progress_bar = st.progress(0)
+            status_text = st.empty()
+            result = st.session_state.data_manager.retry_failed(progress_bar, status_text)
+            display_download_result(result)
+
+    if st.sidebar.button("🗜️ Compact History", help=f"Move rows older than {HOT_RETENTION_DAYS} days into compressed cold partitions"):
+        # Readers keep working during compaction: trimmed files replace the old ones atomically
+        threading.Thread(target=st.session_state.data_manager.cleanup_old_data, daemon=True).start()
+        st.sidebar.caption("Compaction running in the background")
+
+    # Stock selection
+    st.sidebar.markdown("""
+    <div class="sidebar-section">
+        <h3>🎯 Stock Analysis</h3>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    view_mode = st.sidebar.radio(
+        "View:", ["Single Stock", "Chart Grid", "Market Overview"], horizontal=True,
+        help="Chart Grid pages through every stock with compact sparklines; Market Overview screens the whole universe"
+    )
     
-    # Auto-refresh logic
+    selected_stock = st.sidebar.selectbox(
+        "Select a stock to analyze:",
+        UNIVERSE_SYMBOLS,
+        format_func=lambda x: x.replace('.NS', ''),
+        help="Choose from the active symbols in the universe registry"
+    )
+    
+    # Analysis options with modern styling
+    st.sidebar.markdown("**Display Options:**")
+    show_chart = st.sidebar.checkbox("📊 Technical Chart", value=True)
+    show_summary = st.sidebar.checkbox("📋 Summary Cards", value=True)
+    
+    # Alert system
+    st.sidebar.markdown("""
+    <div class="sidebar-section">
+        <h3>🔔 Alert System</h3>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    email_configured = validate_email_config()
+    
+    if email_configured:
+        st.sidebar.markdown("""
+        <div style="background: #d4edda; padding: 0.75rem; border-radius: 6px; border: 1px solid #c3e6cb; color: #155724; margin-bottom: 1rem;">
+            <strong>✅ Email Configured</strong><br>
+            <small>Ready to send alerts</small>
+        </div>
+        """, unsafe_allow_html=True)
+        
+        if st.sidebar.button("🔔 Send Test Alert", help="Test your email configuration"):
+            if st.session_state.alert_system.queue_email_alert(
+                "Test Alert", 
+                "This is a test alert from your Nifty 100 Dashboard"
+            ):
+                st.sidebar.markdown("""
+                <div style="background: #d4edda; padding: 0.5rem; border-radius: 4px; color: #155724;">
+                    Test alert queued for delivery!
+                </div>
+                """, unsafe_allow_html=True)
+        
+        queue_metrics = st.session_state.alert_system.get_queue_metrics()
+        st.sidebar.markdown(f"""
+        <div style="background: #f8f9fa; padding: 0.5rem; border-radius: 4px; border-left: 3px solid #007bff; margin: 0.5rem 0;">
+            <small><strong>Queue:</strong> {queue_metrics['queue_depth']} pending · {queue_metrics['in_flight']} sending · {queue_metrics['failed']} failed</small><br>
+            <small><strong>Delivery latency:</strong> {queue_metrics['latency_avg']:.1f}s avg · {queue_metrics['latency_p95']:.1f}s p95</small>
+        </div>
+        """, unsafe_allow_html=True)
+    else:
+        st.sidebar.markdown("""
+        <div style="background: #fff3cd; padding: 0.75rem; border-radius: 6px; border: 1px solid #ffeaa7; color: #856404; margin-bottom: 1rem;">
+            <strong>⚠️ Email Not Configured</strong><br>
+            <small>Set EMAIL_USER, EMAIL_PASSWORD, and EMAIL_RECIPIENTS environment variables</small>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    # Watchlist subscriptions
+    with st.sidebar.expander("📬 My Watchlist Alerts"):
+        subscriptions = st.session_state.alert_system.subscriptions
+        watch_email = st.text_input("Email", key="watch_email")
+        watch_symbols = st.multiselect(
+            "Stocks", UNIVERSE_SYMBOLS,
+            format_func=lambda x: x.replace('.NS', ''), key="watch_symbols"
+        )
+        watch_signals = st.multiselect(
+            "Signal types (empty = all)", SIGNAL_TYPES, key="watch_signals"
+        )
+        sub_col, unsub_col = st.columns(2)
+        if sub_col.button("Subscribe", disabled=not (watch_email and watch_symbols)):
+            subscriptions.subscribe(watch_email, watch_symbols, watch_signals)
+        if unsub_col.button("Unsubscribe", disabled=not watch_email):
+            subscriptions.unsubscribe(watch_email, watch_symbols or None)
+        if watch_email:
+            current = subscriptions.get_subscriptions(watch_email)
+            if current:
+                st.caption(", ".join(
+                    f"{symbol.replace('.NS', '')} ({'all' if '*' in types else ', '.join(types)})"
+                    for symbol, types in current.items()
+                ))
+        st.caption(f"{subscriptions.subscriber_count()} subscriber(s)")
+    
+    # Scanner section
+    st.sidebar.markdown("""
+    <div class="sidebar-section">
+        <h3>📡 Signal Scanner</h3>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    if st.sidebar.button("🔍 Run Signal Scan", help="Scan all Nifty 100 stocks for trading signals"):
+        run_signal_scanner()
+    
+    if st.session_state.last_scan_time:
+        st.sidebar.markdown(f"""
+        <div style="background: #f8f9fa; padding: 0.5rem; border-radius: 4px; border-left: 3px solid #007bff; margin: 0.5rem 0;">
+            <small><strong>Last scan:</strong> {st.session_state.last_scan_time.strftime('%H:%M:%S')}</small>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    report_session_memory()
+    with st.sidebar.expander("🩺 Diagnostics"):
+        display_diagnostics()
+    
+    # Auto-refresh with modern toggle
+    st.sidebar.markdown("**Settings:**")
+    auto_refresh = st.sidebar.checkbox("🔄 Auto-refresh (60s)", value=st.session_state.auto_refresh)
+    st.session_state.auto_refresh = auto_refresh
+    
+    # With auto-refresh on, a lightweight fragment polls the change feed every
+    # REFRESH_INTERVAL and re-renders only when the stored data actually moved
     if st.session_state.auto_refresh:
-        time.sleep(REFRESH_INTERVAL)
-        st.rerun()
+        st.fragment(watch_data_changes, run_every=REFRESH_INTERVAL)()
+    
+    # Main content area (a fragment, so widgets inside it rerun only this section)
+    st.fragment(render_main_content)(
+        view_mode, selected_stock, show_chart, show_summary
+    )
+    
+    # Data status with modern styling
+    with st.sidebar:
+        st.fragment(render_data_status)()
 
 if __name__ == "__main__":
     main()
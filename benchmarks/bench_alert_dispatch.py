@@ -0,0 +1,66 @@
+"""Time dispatching alerts for a universe of symbols against a local SMTP stand-in.
+
+Compares a fresh connection per alert (the old behaviour), one pooled
+connection per batch, and a single digest message.
+
+    python benchmarks/bench_alert_dispatch.py --symbols 150 --connect-latency 0.05
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from email_sender import SMTPSender
+from smtp_standin import LocalSMTPServer
+
+def build_messages(count):
+    """Build one small HTML alert per symbol"""
+    return [
+        f"Subject: Stock Alert: SYM{i}\nContent-Type: text/html\n\n<p>SYM{i}: RSI oversold</p>"
+        for i in range(count)
+    ]
+
+def run(symbols, connect_latency):
+    """Run all three dispatch modes and return timings in seconds"""
+    messages = build_messages(symbols)
+    recipients = ["alerts@example.com"]
+    results = {}
+
+    with LocalSMTPServer(connect_latency=connect_latency) as server:
+        def make_sender():
+            return SMTPSender("127.0.0.1", server.port, "bench", "bench", use_tls=False)
+
+        sender = make_sender()
+        start = time.perf_counter()
+        for message in messages:
+            sender.send(recipients, message)
+        results['per_alert_connection'] = time.perf_counter() - start
+
+        sender = make_sender()
+        start = time.perf_counter()
+        with sender:
+            for message in messages:
+                sender.send(recipients, message)
+        results['pooled_connection'] = time.perf_counter() - start
+
+        sender = make_sender()
+        start = time.perf_counter()
+        sender.send(recipients, "Subject: Digest\n\n" + "\n".join(messages))
+        results['digest'] = time.perf_counter() - start
+
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--symbols", type=int, default=150)
+    parser.add_argument("--connect-latency", type=float, default=0.05,
+                        help="simulated handshake cost per connection in seconds")
+    args = parser.parse_args()
+
+    for mode, seconds in run(args.symbols, args.connect_latency).items():
+        print(f"{mode:>22}: {seconds * 1000:9.1f} ms for {args.symbols} symbols")
+
+if __name__ == "__main__":
+    main()
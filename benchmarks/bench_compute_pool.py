@@ -0,0 +1,65 @@
+"""Full-universe indicator recompute: in-process vs the shared-memory compute pool.
+
+Pool startup (spawning workers and importing pandas) is timed separately,
+then each worker count recomputes the whole universe and is checked
+against the in-process result.
+
+    python benchmarks/bench_compute_pool.py --universe 2000 --workers 1 2 4 8
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pandas as pd
+from synthetic_market import generate_ohlcv, universe
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--universe", type=int, default=1000, help="number of synthetic symbols")
+    parser.add_argument("--days", type=int, default=126, help="trading days of 1h history per symbol")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4],
+                        help="worker process counts to try")
+    args = parser.parse_args()
+
+    from data_manager import resample_ohlcv
+    from indicators import calculate_all_indicators
+    from compute_pool import ComputePool, OHLCV_COLUMNS
+
+    frames = {
+        symbol: resample_ohlcv(generate_ohlcv(symbol, args.days))[OHLCV_COLUMNS]
+        for symbol in universe(args.universe)
+    }
+    rows = sum(len(df) for df in frames.values())
+    print(f"{args.universe} symbols, {rows} 4h bars, {os.cpu_count()} CPUs")
+
+    start = time.perf_counter()
+    expected = {symbol: calculate_all_indicators(df.copy()) for symbol, df in frames.items()}
+    baseline = time.perf_counter() - start
+    print(f"  {'in-process':>12}: {baseline:8.3f}s  {args.universe / baseline:9.1f} symbols/s")
+
+    for workers in args.workers:
+        pool = ComputePool(workers=workers, min_symbols=1)
+        try:
+            start = time.perf_counter()
+            pool._get_executor().submit(int).result()
+            startup = time.perf_counter() - start
+
+            start = time.perf_counter()
+            result = pool.compute_indicators(frames)
+            elapsed = time.perf_counter() - start
+        finally:
+            pool.shutdown()
+
+        for symbol, df in expected.items():
+            pd.testing.assert_frame_equal(result[symbol], df)
+        print(
+            f"  {f'{workers} workers':>12}: {elapsed:8.3f}s  {args.universe / elapsed:9.1f} symbols/s  "
+            f"{baseline / elapsed:5.2f}x  (startup {startup:.2f}s)"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""End-to-end pipeline benchmark on a synthetic market.
+
+Times every stage from the 1h download onward for one or more universe
+sizes and writes the results as JSON so runs can be compared across commits.
+
+    python benchmarks/bench_pipeline.py --universe 150 1000 --days 126
+    python benchmarks/bench_pipeline.py --compare old.json new.json
+"""
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from synthetic_market import generate_ohlcv, universe
+
+RESULTS_FOLDER = os.path.join(ROOT, "benchmarks", "results")
+
+class StageTimer:
+    """Accumulates wall time per stage"""
+
+    def __init__(self):
+        self.totals = {}
+        self.calls = {}
+
+    def time(self, stage, func, *args, **kwargs):
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        self.totals[stage] = self.totals.get(stage, 0.0) + time.perf_counter() - start
+        self.calls[stage] = self.calls.get(stage, 0) + 1
+        return result
+
+def run_universe(size, days):
+    """Run the whole pipeline for a synthetic universe inside a scratch data folder"""
+    # Imported here so module-level paths resolve against the scratch folder
+    from data_manager import DataManager, resample_ohlcv
+    from indicators import calculate_all_indicators, get_latest_signals
+    from utils import save_stock_data, load_stock_data, get_stock_status_summary, create_data_folder
+    from scanner import SignalScanner
+    from alert_system import AlertSystem
+    from alert_queue import AlertDispatcher
+    from email_sender import SMTPSender
+    from panel_export import export_panel, attach_panel
+
+    create_data_folder()
+    symbols = universe(size)
+    timer = StageTimer()
+    latest_bars = {}
+    rows = 0
+
+    # Per-symbol stages, as in the DataManager ingest pipeline
+    for symbol in symbols:
+        df = timer.time('generate', generate_ohlcv, symbol, days)
+        df_4h = timer.time('resample', resample_ohlcv, df)
+        df_4h = timer.time('indicators', calculate_all_indicators, df_4h)
+        timer.time('save_stock_data', save_stock_data, symbol, df_4h)
+        loaded = timer.time('load_stock_data', load_stock_data, symbol)
+        latest_bars[symbol] = loaded.iloc[-1]
+        rows += len(df_4h)
+
+    # Cross-sectional stages
+    def full_scan():
+        found = []
+        for symbol in symbols:
+            df = load_stock_data(symbol)
+            if not df.empty:
+                signals = get_latest_signals(symbol, df)
+                if signals['signals']:
+                    found.append(signals)
+        return found
+
+    timer.time('scanner_full_loop', full_scan)
+    scanner = SignalScanner()
+    timer.time('scanner_incremental_first', scanner.scan, symbols)
+    timer.time('scanner_incremental_unchanged', scanner.scan, symbols)
+
+    data_manager = DataManager()
+    timer.time('get_latest_prices', data_manager.get_latest_prices, symbols)
+    timer.time('get_stock_status_summary', get_stock_status_summary, symbols)
+
+    # Research access: whole-universe CSV loop vs the Arrow panel
+    timer.time('universe_read_csv', lambda: [load_stock_data(symbol) for symbol in symbols])
+    timer.time('panel_export_full', export_panel, symbols, True)
+    timer.time('panel_export_unchanged', export_panel, symbols)
+    timer.time('panel_attach', attach_panel)
+    timer.time('panel_to_pandas', lambda: attach_panel().to_pandas())
+
+    # Alert evaluation + enqueue (no delivery: workers are not started)
+    dispatcher = AlertDispatcher()
+    alert_system = AlertSystem(
+        sender=SMTPSender("127.0.0.1", 0, "bench", "bench", use_tls=False),
+        recipients=["bench@example.com"],
+        dispatcher=dispatcher
+    )
+    alerted = timer.time('alert_evaluation', alert_system.send_bar_alerts, latest_bars, False)
+
+    stages = {
+        stage: {
+            'total_seconds': round(total, 6),
+            'per_symbol_ms': round(total / size * 1000, 4),
+            'calls': timer.calls[stage]
+        }
+        for stage, total in timer.totals.items()
+    }
+    return {
+        'symbols': size,
+        'days': days,
+        'bars_4h': rows,
+        'alerted': len(alerted),
+        'stages': stages
+    }
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def compare(old_path, new_path):
+    """Print per-stage speedups between two result files"""
+    with open(old_path) as f:
+        old = {run['symbols']: run for run in json.load(f)['runs']}
+    with open(new_path) as f:
+        new = {run['symbols']: run for run in json.load(f)['runs']}
+
+    for size in sorted(old.keys() & new.keys()):
+        print(f"\n{size} symbols")
+        for stage, result in new[size]['stages'].items():
+            before = old[size]['stages'].get(stage)
+            if before:
+                ratio = before['total_seconds'] / result['total_seconds'] if result['total_seconds'] else float('inf')
+                print(f"  {stage:>30}: {before['total_seconds']:9.3f}s -> {result['total_seconds']:9.3f}s  ({ratio:.2f}x)")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--universe", type=int, nargs="+", default=[150],
+                        help="universe sizes to run, e.g. 150 1000 5000")
+    parser.add_argument("--days", type=int, default=126, help="trading days of 1h history per symbol")
+    parser.add_argument("--output", help="result JSON path (default benchmarks/results/<commit>-<time>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two result files")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    # Streamlit calls outside a running app only log warnings
+    logging.disable(logging.WARNING)
+    warnings.filterwarnings("ignore")
+
+    commit = git_commit()
+    runs = []
+    cwd = os.getcwd()
+    for size in args.universe:
+        with tempfile.TemporaryDirectory(prefix="bench-pipeline-") as scratch:
+            os.chdir(scratch)
+            try:
+                result = run_universe(size, args.days)
+            finally:
+                os.chdir(cwd)
+        runs.append(result)
+
+        print(f"\n{size} symbols x {args.days} days ({result['bars_4h']} 4h bars)")
+        for stage, timing in result['stages'].items():
+            print(f"  {stage:>30}: {timing['total_seconds']:9.3f}s  {timing['per_symbol_ms']:8.3f} ms/symbol")
+
+    output = args.output or os.path.join(
+        RESULTS_FOLDER, f"{commit}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({
+            'commit': commit,
+            'timestamp': datetime.now().isoformat(),
+            'python': sys.version.split()[0],
+            'runs': runs
+        }, f, indent=2)
+    print(f"\nResults written to {output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import time
+import numpy as np
+import pandas as pd
+from synthetic_market import symbol_seed
+
+# NSE cash session in minutes: 09:15 to 15:29 inclusive
+SESSION_MINUTES = pd.timedelta_range("09:15:00", "15:29:00", freq="1min")
+
+def minute_index(days, end=None):
+    """1-minute session timestamps for the last `days` business days"""
+    end = pd.Timestamp(end or "2025-06-27").normalize()
+    dates = pd.bdate_range(end=end, periods=days)
+    stamps = (dates.values[:, None] + SESSION_MINUTES.values[None, :]).ravel()
+    return pd.DatetimeIndex(stamps).tz_localize("Asia/Kolkata")
+
+def generate_minutes(symbol, days=20, end=None):
+    """Generate 1-minute OHLCV bars for a symbol (deterministic per symbol)"""
+    rng = np.random.default_rng(symbol_seed(symbol) + 1)
+    index = minute_index(days, end)
+    n = len(index)
+
+    start_price = rng.uniform(50, 5000)
+    volatility = rng.uniform(0.0004, 0.002)
+    close = start_price * np.exp(np.cumsum(rng.normal(0, volatility, n)))
+    open_ = np.r_[start_price, close[:-1]]
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, volatility / 2, n)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, volatility / 2, n)))
+    volume = rng.lognormal(np.log(rng.uniform(1e2, 1e4)), 0.7, n).round()
+
+    return pd.DataFrame({'Open': open_, 'High': high, 'Low': low, 'Close': close, 'Volume': volume}, index=index)
+
+class ReplayFeed:
+    """Local stand-in for a live 1-minute feed: replays generated bars across symbols in time order"""
+
+    def __init__(self, frames, speed=None):
+        """frames: {symbol: 1-minute OHLCV frame}; speed: replay seconds per feed second (None = flat out)"""
+        self.speed = speed
+        symbols, stamps, values = [], [], []
+        for position, (symbol, df) in enumerate(frames.items()):
+            symbols.append(np.full(len(df), position))
+            stamps.append(df.index.asi8)
+            values.append(df[['Open', 'High', 'Low', 'Close', 'Volume']].to_numpy())
+        self.names = list(frames)
+        order = np.argsort(np.concatenate(stamps), kind='stable')
+        self.symbol_ids = np.concatenate(symbols)[order]
+        self.stamps = np.concatenate(stamps)[order]
+        self.values = np.concatenate(values)[order]
+
+    def __len__(self):
+        return len(self.stamps)
+
+    def __iter__(self):
+        """Yield (symbol, ts_ns, open, high, low, close, volume)"""
+        names = self.names
+        started = time.monotonic()
+        first = self.stamps[0] if len(self.stamps) else 0
+        for symbol_id, stamp, (open_, high, low, close, volume) in zip(
+            self.symbol_ids.tolist(), self.stamps.tolist(), self.values.tolist()
+        ):
+            if self.speed:
+                delay = (stamp - first) / 1e9 * self.speed - (time.monotonic() - started)
+                if delay > 0:
+                    time.sleep(delay)
+            yield names[symbol_id], stamp, open_, high, low, close, volume
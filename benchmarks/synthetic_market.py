@@ -0,0 +1,53 @@
+import zlib
+import numpy as np
+import pandas as pd
+
+# NSE cash session: 09:15-15:30 IST, hourly bars stamped like yfinance's 1h data
+SESSION_HOURS = ["09:15", "10:15", "11:15", "12:15", "13:15", "14:15", "15:15"]
+
+def symbol_seed(symbol):
+    """Stable per-symbol seed so every run generates the same market"""
+    return zlib.crc32(symbol.encode())
+
+def trading_index(days, end=None):
+    """Hourly session timestamps for the last `days` business days"""
+    end = pd.Timestamp(end or "2025-06-27").normalize()
+    dates = pd.bdate_range(end=end, periods=days)
+    stamps = [
+        pd.Timestamp(f"{date.date()} {hour}") for date in dates for hour in SESSION_HOURS
+    ]
+    return pd.DatetimeIndex(stamps).tz_localize("Asia/Kolkata")
+
+def generate_ohlcv(symbol, days=126, end=None):
+    """Generate 1h OHLCV bars as returned by yf.Ticker(...).history(interval="1h")"""
+    rng = np.random.default_rng(symbol_seed(symbol))
+    index = trading_index(days, end)
+    n = len(index)
+
+    start_price = rng.uniform(50, 5000)
+    volatility = rng.uniform(0.003, 0.015)
+    returns = rng.normal(0, volatility, n)
+    close = start_price * np.exp(np.cumsum(returns))
+    open_ = np.r_[start_price, close[:-1]] * (1 + rng.normal(0, volatility / 4, n))
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, volatility / 2, n)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, volatility / 2, n)))
+
+    # Volume with occasional surges so Volume_Surge signals appear
+    base_volume = rng.uniform(1e4, 1e6)
+    volume = rng.lognormal(np.log(base_volume), 0.5, n)
+    surges = rng.random(n) < 0.02
+    volume[surges] *= rng.uniform(3, 6, surges.sum())
+
+    return pd.DataFrame({
+        'Open': open_,
+        'High': high,
+        'Low': low,
+        'Close': close,
+        'Volume': volume.round(),
+        'Dividends': 0.0,
+        'Stock Splits': 0.0
+    }, index=index)
+
+def universe(size):
+    """Synthetic symbol names for a universe of the given size"""
+    return [f"SYN{i:05d}.NS" for i in range(size)]
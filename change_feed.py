@@ -0,0 +1,94 @@
+import os
+import time
+import sqlite3
+import threading
+from config import CHANGE_FEED_PATH, CHANGE_FEED_RETENTION
+
+class ChangeFeed:
+    """Per-symbol update events shared in-process (callbacks) and across processes (SQLite log).
+
+    Publishers append an event with a monotonically increasing sequence
+    number. In-process subscribers are called immediately; other processes
+    keep a cursor and poll for events after it.
+    """
+
+    def __init__(self, db_path=CHANGE_FEED_PATH, retention=CHANGE_FEED_RETENTION):
+        self.retention = retention
+        self._lock = threading.Lock()
+        self._subscribers = []
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        with self._lock, self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS events (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    symbol TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    ts REAL NOT NULL
+                )
+            """)
+
+    def subscribe(self, callback):
+        """Call callback(event) for every event published from this process"""
+        with self._lock:
+            self._subscribers.append(callback)
+
+    def publish(self, symbol, kind='update'):
+        """Append an event and notify in-process subscribers"""
+        now = time.time()
+        with self._lock, self.conn:
+            seq = self.conn.execute(
+                "INSERT INTO events (symbol, kind, ts) VALUES (?, ?, ?)", (symbol, kind, now)
+            ).lastrowid
+            if seq % 1000 == 0:
+                self.conn.execute("DELETE FROM events WHERE seq <= ?", (seq - self.retention,))
+            subscribers = list(self._subscribers)
+
+        event = {'seq': seq, 'symbol': symbol, 'kind': kind, 'ts': now}
+        for callback in subscribers:
+            try:
+                callback(event)
+            except Exception as e:
+                print(f"Change feed subscriber failed: {str(e)}")
+        return seq
+
+    def latest_seq(self):
+        """Get the newest sequence number (0 if no events yet)"""
+        with self._lock:
+            return self.conn.execute("SELECT COALESCE(MAX(seq), 0) FROM events").fetchone()[0]
+
+    def poll(self, cursor=0):
+        """Get (events after cursor, new cursor).
+
+        Returns None instead of events if cursor is older than the retained
+        log, meaning the caller missed events and should fully resync.
+        """
+        with self._lock:
+            oldest = self.conn.execute("SELECT MIN(seq) FROM events").fetchone()[0]
+            rows = self.conn.execute(
+                "SELECT seq, symbol, kind, ts FROM events WHERE seq > ? ORDER BY seq", (cursor,)
+            ).fetchall()
+
+        new_cursor = rows[-1][0] if rows else cursor
+        if cursor and oldest and oldest > cursor + 1:
+            return None, new_cursor
+        return [dict(zip(('seq', 'symbol', 'kind', 'ts'), row)) for row in rows], new_cursor
+
+    def changed_symbols(self, cursor=0):
+        """Get (set of symbols updated after cursor or None if a resync is needed, new cursor)"""
+        events, new_cursor = self.poll(cursor)
+        if events is None:
+            return None, new_cursor
+        return {event['symbol'] for event in events}, new_cursor
+
+_feed = None
+_feed_lock = threading.Lock()
+
+def get_change_feed():
+    """Get the process-wide change feed"""
+    global _feed
+    with _feed_lock:
+        if _feed is None:
+            _feed = ChangeFeed()
+        return _feed
@@ -0,0 +1,269 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import plotly.subplots as sp
+from config import CHART_MAX_POINTS, WEBGL_THRESHOLD, SPARKLINE_POINTS
+
+def lttb_indices(x, y, threshold):
+    """Largest-Triangle-Three-Buckets: indices of the points that best preserve the line's shape"""
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    indices = np.empty(threshold, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+
+    # Bucket edges over the points between the fixed first and last points
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], max(edges[i + 1], edges[i] + 1)
+
+        # Average of the next bucket (or the last point for the final bucket)
+        if i + 2 < len(edges):
+            next_start, next_end = edges[i + 1], max(edges[i + 2], edges[i + 1] + 1)
+        else:
+            next_start, next_end = n - 1, n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        # Pick the point forming the largest triangle with the previous pick and that average
+        areas = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(areas))
+        indices[i + 1] = a
+
+    return indices
+
+def downsample_series(series, max_points=CHART_MAX_POINTS):
+    """Downsample a line series with LTTB, ignoring NaN warm-up values"""
+    series = series.dropna()
+    if len(series) <= max_points:
+        return series
+    idx = lttb_indices(series.index.asi8, series.to_numpy(), max_points)
+    return series.iloc[idx]
+
+def aggregate_ohlcv(df, max_points=CHART_MAX_POINTS):
+    """Re-aggregate OHLCV bars into at most max_points wider bars"""
+    if len(df) <= max_points:
+        return df
+
+    bucket_size = int(np.ceil(len(df) / max_points))
+    buckets = np.arange(len(df)) // bucket_size
+    grouped = df[['Open', 'High', 'Low', 'Close', 'Volume']].groupby(buckets)
+    aggregated = grouped.agg({
+        'Open': 'first',
+        'High': 'max',
+        'Low': 'min',
+        'Close': 'last',
+        'Volume': 'sum'
+    })
+    aggregated.index = df.index[::bucket_size]
+    return aggregated
+
+def slice_range(df, x_range=None):
+    """Slice df to a (start, end) timestamp range for server-side zoom"""
+    if not x_range:
+        return df
+    start, end = x_range
+    return df.loc[pd.Timestamp(start):pd.Timestamp(end)]
+
+def _line(series, name, color, max_points):
+    """Build a (WebGL for long series) line trace from a downsampled series"""
+    trace_type = go.Scattergl if len(series) > WEBGL_THRESHOLD else go.Scatter
+    series = downsample_series(series, max_points)
+    return trace_type(x=series.index, y=series.to_numpy(), name=name, line=dict(color=color))
+
+def build_stock_chart(symbol, df, max_points=CHART_MAX_POINTS, x_range=None):
+    """Create comprehensive stock chart with all indicators, sized to the pixel budget"""
+    df = slice_range(df, x_range)
+    if df.empty:
+        return None
+
+    bars = aggregate_ohlcv(df, max_points)
+
+    # Create subplots
+    fig = sp.make_subplots(
+        rows=4, cols=1,
+        shared_xaxes=True,
+        vertical_spacing=0.05,
+        row_heights=[0.4, 0.2, 0.2, 0.2],
+        subplot_titles=(
+            f'{symbol.replace(".NS", "")} - Price & Volume',
+            'MACD',
+            'RSI',
+            'MFI'
+        )
+    )
+
+    # Price and Volume
+    fig.add_trace(
+        go.Candlestick(
+            x=bars.index,
+            open=bars['Open'].to_numpy(),
+            high=bars['High'].to_numpy(),
+            low=bars['Low'].to_numpy(),
+            close=bars['Close'].to_numpy(),
+            name='Price'
+        ),
+        row=1, col=1
+    )
+
+    # Volume bars
+    colors = np.where(bars['Close'].to_numpy() < bars['Open'].to_numpy(), 'red', 'green')
+
+    fig.add_trace(
+        go.Bar(
+            x=bars.index,
+            y=bars['Volume'].to_numpy(),
+            name='Volume',
+            marker_color=colors,
+            opacity=0.7,
+            yaxis='y2'
+        ),
+        row=1, col=1
+    )
+
+    # MACD
+    if 'MACD' in df.columns:
+        fig.add_trace(_line(df['MACD'], 'MACD', 'blue', max_points), row=2, col=1)
+        fig.add_trace(_line(df['MACD_Signal'], 'Signal', 'red', max_points), row=2, col=1)
+
+        histogram = downsample_series(df['MACD_Histogram'], max_points)
+        fig.add_trace(
+            go.Bar(
+                x=histogram.index,
+                y=histogram.to_numpy(),
+                name='Histogram',
+                marker_color='gray',
+                opacity=0.7
+            ),
+            row=2, col=1
+        )
+
+    # RSI
+    if 'RSI' in df.columns:
+        fig.add_trace(_line(df['RSI'], 'RSI', 'purple', max_points), row=3, col=1)
+
+        # RSI levels
+        fig.add_hline(y=70, line_dash="dash", line_color="red", row=3, col=1)
+        fig.add_hline(y=30, line_dash="dash", line_color="green", row=3, col=1)
+
+    # MFI
+    if 'MFI' in df.columns:
+        fig.add_trace(_line(df['MFI'], 'MFI', 'orange', max_points), row=4, col=1)
+
+        # MFI levels
+        fig.add_hline(y=80, line_dash="dash", line_color="red", row=4, col=1)
+        fig.add_hline(y=20, line_dash="dash", line_color="green", row=4, col=1)
+
+    # Update layout
+    fig.update_layout(
+        height=800,
+        showlegend=True,
+        xaxis_rangeslider_visible=False
+    )
+
+    # Update y-axes
+    fig.update_yaxes(title_text="Price (₹)", row=1, col=1)
+    fig.update_yaxes(title_text="MACD", row=2, col=1)
+    fig.update_yaxes(title_text="RSI", row=3, col=1, range=[0, 100])
+    fig.update_yaxes(title_text="MFI", row=4, col=1, range=[0, 100])
+
+    return fig
+
+def apply_dashboard_theme(fig):
+    """Give a chart the dashboard's transparent background and font"""
+    fig.update_layout(
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(family="Arial, sans-serif", size=12),
+        margin=dict(l=20, r=20, t=40, b=20)
+    )
+    return fig
+
+def build_sparkline(symbol, df, max_points=SPARKLINE_POINTS):
+    """Create a compact close-price sparkline for grid views"""
+    if df.empty:
+        return None
+
+    close = downsample_series(df['Close'], max_points)
+    color = 'green' if close.iloc[-1] >= close.iloc[0] else 'red'
+
+    fig = go.Figure(
+        go.Scatter(
+            x=close.index,
+            y=close.to_numpy(),
+            mode='lines',
+            line=dict(color=color, width=1.5),
+            fill='tozeroy',
+            hoverinfo='skip'
+        )
+    )
+    fig.update_layout(
+        height=120,
+        margin=dict(l=0, r=0, t=0, b=0),
+        showlegend=False,
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        xaxis=dict(visible=False),
+        yaxis=dict(visible=False, range=[close.min() * 0.995, close.max() * 1.005])
+    )
+    return fig
+
+def build_universe_heatmap(values, columns=15):
+    """Create a tiled heatmap with one cell per symbol, coloured by values"""
+    rows = -(-len(values) // columns)
+    padding = rows * columns - len(values)
+    z = np.append(values.to_numpy(dtype=np.float64), [np.nan] * padding).reshape(rows, columns)
+    labels = np.append(
+        [f"{symbol}<br>{value:.1f}" for symbol, value in values.items()], [""] * padding
+    ).reshape(rows, columns)
+
+    colorscale = 'RdYlGn' if values.name in ('Change_Pct', 'Volume_Ratio') else 'RdYlGn_r'
+    zmid = {'Change_Pct': 0, 'RSI': 50, 'MFI': 50, 'Volume_Ratio': 1}.get(values.name)
+
+    fig = go.Figure(
+        go.Heatmap(
+            z=z,
+            text=labels,
+            texttemplate="%{text}",
+            hoverinfo='text',
+            colorscale=colorscale,
+            zmid=zmid,
+            xgap=2,
+            ygap=2
+        )
+    )
+    fig.update_layout(
+        height=max(300, rows * 40),
+        margin=dict(l=0, r=0, t=10, b=0),
+        xaxis=dict(visible=False),
+        yaxis=dict(visible=False, autorange='reversed')
+    )
+    return fig
+
+def build_correlation_heatmap(correlation):
+    """Create a symmetric heatmap of pairwise return correlations"""
+    labels = [symbol.replace('.NS', '') for symbol in correlation.index]
+    fig = go.Figure(
+        go.Heatmap(
+            z=correlation.to_numpy(),
+            x=labels,
+            y=labels,
+            colorscale='RdBu_r',
+            zmin=-1,
+            zmax=1,
+            hovertemplate="%{y} / %{x}: %{z:.2f}<extra></extra>"
+        )
+    )
+    fig.update_layout(
+        height=max(400, len(labels) * 14),
+        margin=dict(l=0, r=0, t=10, b=0),
+        yaxis=dict(autorange='reversed')
+    )
+    return fig
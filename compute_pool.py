@@ -0,0 +1,196 @@
+import os
+import atexit
+import threading
+import multiprocessing
+from multiprocessing import shared_memory
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from config import COMPUTE_WORKERS, COMPUTE_MIN_SYMBOLS
+from indicators import calculate_all_indicators, get_latest_signals
+from metrics import metrics
+
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+# Columns added by calculate_all_indicators, in the order it adds them
+INDICATOR_COLUMNS = [
+    'MACD', 'MACD_Signal', 'MACD_Histogram', 'MACD_Crossover',
+    'RSI', 'RSI_Oversold', 'RSI_Overbought',
+    'MFI', 'MFI_Oversold', 'MFI_Overbought',
+    'Volume_MA_Short', 'Volume_MA_Long', 'Volume_Ratio', 'Volume_Surge'
+]
+FLAG_COLUMNS = [
+    'MACD_Crossover', 'RSI_Oversold', 'RSI_Overbought', 'MFI_Oversold', 'MFI_Overbought', 'Volume_Surge'
+]
+
+def _compute_block(input_name, output_name, total_rows, offsets):
+    """Worker: compute indicators for every (start, end) row range of a shared block"""
+    source = shared_memory.SharedMemory(name=input_name)
+    target = shared_memory.SharedMemory(name=output_name)
+    ohlcv = result = None
+    try:
+        ohlcv = np.ndarray((total_rows, len(OHLCV_COLUMNS)), dtype=np.float64, buffer=source.buf)
+        result = np.ndarray((total_rows, len(INDICATOR_COLUMNS)), dtype=np.float64, buffer=target.buf)
+        for start, end in offsets:
+            df = pd.DataFrame(ohlcv[start:end], columns=OHLCV_COLUMNS, copy=True)
+            result[start:end] = calculate_all_indicators(df)[INDICATOR_COLUMNS].to_numpy(dtype=np.float64)
+        return len(offsets)
+    finally:
+        # Views must be released before the segments can be closed
+        ohlcv = result = None
+        source.close()
+        target.close()
+
+def _scan_block(symbols):
+    """Worker: load stored frames and evaluate the latest bar's signals"""
+    from utils import load_stock_data
+    results = {}
+    for symbol in symbols:
+        df = load_stock_data(symbol)
+        results[symbol] = get_latest_signals(symbol, df) if not df.empty else None
+    return results
+
+def split_balanced(items, weights, parts):
+    """Split items into at most `parts` contiguous groups of roughly equal total weight"""
+    total = sum(weights)
+    if not items or parts <= 1 or total == 0:
+        return [list(items)] if items else []
+    groups, current, filled = [], [], 0
+    target = total / parts
+    for item, weight in zip(items, weights):
+        current.append(item)
+        filled += weight
+        if filled >= target * (len(groups) + 1) and len(groups) < parts - 1:
+            groups.append(current)
+            current = []
+    if current:
+        groups.append(current)
+    return groups
+
+class ComputePool:
+    """Process pool for indicator computation and scans, off the Streamlit process's GIL.
+
+    OHLCV inputs and indicator outputs cross the process boundary through
+    shared memory blocks, so only names and row offsets are pickled. Small
+    jobs run in-process, where the hand-off would cost more than it saves.
+    """
+
+    def __init__(self, workers=None, min_symbols=COMPUTE_MIN_SYMBOLS):
+        self.workers = workers or COMPUTE_WORKERS or os.cpu_count() or 1
+        self.min_symbols = min_symbols
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                # spawn: forking a process with live server threads is unsafe
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context('spawn')
+                )
+            return self._executor
+
+    def should_offload(self, count):
+        """Check whether a job over count symbols is worth sending to worker processes"""
+        return self.workers > 1 and count >= self.min_symbols
+
+    def compute_indicators(self, frames):
+        """Calculate indicators for {symbol: OHLCV frame} and return {symbol: frame with indicators}"""
+        frames = {symbol: df for symbol, df in frames.items() if not df.empty}
+        if not self.should_offload(len(frames)):
+            return {symbol: calculate_all_indicators(df) for symbol, df in frames.items()}
+
+        symbols = list(frames)
+        groups = split_balanced(symbols, [len(frames[symbol]) for symbol in symbols], self.workers)
+        blocks = []
+        try:
+            with metrics.timed('compute_pool_seconds', job='indicators'):
+                for group in groups:
+                    blocks.append(self._submit_block(group, frames))
+                for block in blocks:
+                    block['future'].result()
+                return self._collect_blocks(blocks, frames)
+        finally:
+            for block in blocks:
+                for segment in (block['input'], block['output']):
+                    segment.close()
+                    segment.unlink()
+
+    def _submit_block(self, symbols, frames):
+        """Copy one group's OHLCV into shared memory and queue it for a worker"""
+        sizes = [len(frames[symbol]) for symbol in symbols]
+        total_rows = sum(sizes)
+        source = shared_memory.SharedMemory(create=True, size=max(1, total_rows * len(OHLCV_COLUMNS) * 8))
+        target = shared_memory.SharedMemory(create=True, size=max(1, total_rows * len(INDICATOR_COLUMNS) * 8))
+
+        ohlcv = np.ndarray((total_rows, len(OHLCV_COLUMNS)), dtype=np.float64, buffer=source.buf)
+        offsets = []
+        start = 0
+        for symbol, size in zip(symbols, sizes):
+            ohlcv[start:start + size] = frames[symbol][OHLCV_COLUMNS].to_numpy(dtype=np.float64)
+            offsets.append((start, start + size))
+            start += size
+        del ohlcv
+
+        future = self._get_executor().submit(_compute_block, source.name, target.name, total_rows, offsets)
+        return {
+            'symbols': symbols, 'offsets': offsets, 'rows': total_rows,
+            'input': source, 'output': target, 'future': future
+        }
+
+    def _collect_blocks(self, blocks, frames):
+        """Attach each block's indicator arrays to copies of the input frames"""
+        results = {}
+        for block in blocks:
+            values = np.ndarray(
+                (block['rows'], len(INDICATOR_COLUMNS)), dtype=np.float64, buffer=block['output'].buf
+            )
+            try:
+                for symbol, (start, end) in zip(block['symbols'], block['offsets']):
+                    df = frames[symbol].copy()
+                    indicators = pd.DataFrame(values[start:end], index=df.index, columns=INDICATOR_COLUMNS, copy=True)
+                    indicators[FLAG_COLUMNS] = indicators[FLAG_COLUMNS].astype(np.int64)
+                    df[INDICATOR_COLUMNS] = indicators
+                    results[symbol] = df
+            finally:
+                values = None
+        return results
+
+    def scan(self, symbols):
+        """Evaluate stored signals for symbols; returns {symbol: signals result or None}"""
+        return self.map_blocks(_scan_block, symbols, job='scan')
+
+    def map_blocks(self, function, items, weight=None, job='map'):
+        """Run function(group) -> dict over balanced groups of items and merge the results.
+
+        function must be defined at module level so spawned workers can
+        import it; weight(item) balances the groups (default: equal).
+        """
+        items = list(dict.fromkeys(items))
+        if not self.should_offload(len(items)):
+            return function(items)
+
+        results = {}
+        with metrics.timed('compute_pool_seconds', job=job):
+            weights = [weight(item) for item in items] if weight else [1] * len(items)
+            for partial in self._get_executor().map(function, split_balanced(items, weights, self.workers)):
+                results.update(partial)
+        return results
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(cancel_futures=True)
+                self._executor = None
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_compute_pool():
+    """Get the process-wide compute pool (worker processes start on first use)"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ComputePool()
+            atexit.register(_pool.shutdown)
+        return _pool
@@ -18,10 +18,13 @@ NIFTY_100_SYMBOLS = [
     "BANKBARODA.NS", "PNB.NS", "MOTHERSON.NS", "DMART.NS", "SIEMENS.NS",
     "TATAPOWER.NS", "JSWENERGY.NS", "ADANIGREEN.NS", "NAUKRI.NS", "ABB.NS",
     "TRENT.NS", "HAVELLS.NS", "IOC.NS", "SHREECEM.NS", "TVSMOTOR.NS",
-    "TECHM.NS", "AMBUJACEM.NS", "VEDL.NS", "BOSCHLTD.NS", "INDHOTEL.NS",
-    "GAIL.NS", "SBILIFE.NS", "GODREJCP.NS", "IRFC.NS", "ZYDUSLIFE.NS",
-    "CANBK.NS", "BEL.NS", "DABUR.NS", "HAL.NS", "CGPOWER.NS",
-    
+    "AMBUJACEM.NS", "VEDL.NS", "BOSCHLTD.NS", "INDHOTEL.NS",
+    "GAIL.NS", "GODREJCP.NS", "IRFC.NS", "ZYDUSLIFE.NS",
+    "CANBK.NS", "BEL.NS", "DABUR.NS", "HAL.NS", "CGPOWER.NS"
+]
+
+# ETFs in the universe (everything else in NIFTY_100_SYMBOLS is an equity)
+ETF_SYMBOLS = [
     "ABSLPSE.NS", "ALPHA.NS", "ALPHAETF.NS", "ALPL30IETF.NS", "AUTOIETF.NS",
     "BANKBEES.NS", "BANKIETF.NS", "BFSI.NS", "CPSEETF.NS", "EQUAL200.NS",
     "EVINDIA.NS", "FINIETF.NS", "FMCGIETF.NS", "GOLDBEES.NS", "HDFCSML250.NS",
@@ -34,6 +37,61 @@ NIFTY_100_SYMBOLS = [
     "PSUBNKBEES.NS", "PVTBANIETF.NS", "SETFNIF50.NS", "SILVERBEES.NS", "SMALLCAP.NS",
     "TOP100CASE.NS", "TOP10ADD.NS", "JUNIORBEES.NS"
 ]
+NIFTY_100_SYMBOLS += ETF_SYMBOLS
+
+# Sector metadata for the symbol universe (ETFs map to the sector they track)
+SYMBOL_SECTORS = {
+    "Financial Services": [
+        "AXISBANK.NS", "BAJAJFINSV.NS", "BAJFINANCE.NS", "HDFCBANK.NS", "HDFCLIFE.NS", "ICICIBANK.NS",
+        "ICICIGI.NS", "ICICIPRULI.NS", "INDUSINDBK.NS", "KOTAKBANK.NS", "SBILIFE.NS", "SBIN.NS",
+        "SHRIRAMFIN.NS", "CHOLAFIN.NS", "BAJAJHLDNG.NS", "RECLTD.NS", "PFC.NS", "JIOFIN.NS",
+        "BANKBARODA.NS", "PNB.NS", "IRFC.NS", "CANBK.NS",
+        "BANKBEES.NS", "BANKIETF.NS", "BFSI.NS", "FINIETF.NS", "PSUBNKBEES.NS", "PVTBANIETF.NS"
+    ],
+    "Information Technology": [
+        "HCLTECH.NS", "INFY.NS", "LTIM.NS", "TCS.NS", "TECHM.NS", "WIPRO.NS", "ITBEES.NS"
+    ],
+    "Automobile": [
+        "BAJAJ-AUTO.NS", "EICHERMOT.NS", "HEROMOTOCO.NS", "M&M.NS", "MARUTI.NS", "TATAMOTORS.NS",
+        "MOTHERSON.NS", "TVSMOTOR.NS", "BOSCHLTD.NS", "AUTOIETF.NS", "EVINDIA.NS"
+    ],
+    "Healthcare": [
+        "APOLLOHOSP.NS", "CIPLA.NS", "DIVISLAB.NS", "DRREDDY.NS", "SUNPHARMA.NS", "ZYDUSLIFE.NS",
+        "HEALTHY.NS", "PHARMABEES.NS"
+    ],
+    "FMCG": [
+        "BRITANNIA.NS", "HINDUNILVR.NS", "ITC.NS", "NESTLEIND.NS", "TATACONSUM.NS", "VBL.NS",
+        "GODREJCP.NS", "DABUR.NS", "FMCGIETF.NS"
+    ],
+    "Oil Gas & Consumable Fuels": [
+        "BPCL.NS", "COALINDIA.NS", "ONGC.NS", "RELIANCE.NS", "IOC.NS", "GAIL.NS", "OILIETF.NS"
+    ],
+    "Metals & Mining": [
+        "ADANIENT.NS", "HINDALCO.NS", "JSWSTEEL.NS", "TATASTEEL.NS", "JINDALSTEL.NS", "VEDL.NS",
+        "METAL.NS", "METALIETF.NS"
+    ],
+    "Power": [
+        "NTPC.NS", "POWERGRID.NS", "ADANIPOWER.NS", "TATAPOWER.NS", "JSWENERGY.NS", "ADANIGREEN.NS"
+    ],
+    "Construction Materials": ["GRASIM.NS", "ULTRACEMCO.NS", "SHREECEM.NS", "AMBUJACEM.NS"],
+    "Construction": ["LT.NS"],
+    "Realty": ["DLF.NS", "LODHA.NS"],
+    "Capital Goods": [
+        "SIEMENS.NS", "ABB.NS", "HAVELLS.NS", "CGPOWER.NS", "BEL.NS", "HAL.NS", "MODEFENCE.NS"
+    ],
+    "Consumer Durables": ["ASIANPAINT.NS", "TITAN.NS"],
+    "Consumer Services": [
+        "ETERNAL.NS", "SWIGGY.NS", "DMART.NS", "TRENT.NS", "INDHOTEL.NS", "NAUKRI.NS"
+    ],
+    "Services": ["ADANIPORTS.NS"],
+    "Telecommunication": ["BHARTIARTL.NS"],
+    "Chemicals": ["UPL.NS"],
+    "Commodities": ["GOLDBEES.NS", "SILVERBEES.NS"],
+    "International": [
+        "HNGSNGBEES.NS", "MAFANG.NS", "MAHKTECH.NS", "MASPTOP50.NS", "MON100.NS", "MONQ50.NS"
+    ]
+}
+DEFAULT_SECTOR = "Broad Market"  # index ETFs and symbols without sector metadata
 
 # Technical indicator parameters
 MACD_FAST = 12
@@ -44,24 +102,79 @@ MFI_PERIOD = 14
 VOLUME_MA_SHORT = 20
 VOLUME_MA_LONG = 50
 
+# Cross-sectional analytics
+CORRELATION_WINDOW = 120  # 4h bars in the rolling correlation window (about two months)
+RS_LOOKBACK = 30  # 4h bars of return compared for relative strength (about two weeks)
+RS_BENCHMARK = "NIFTYBEES.NS"
+SECTOR_BENCHMARKS = {  # sectors without an ETF here are compared against RS_BENCHMARK
+    "Financial Services": "BANKBEES.NS",
+    "Information Technology": "ITBEES.NS",
+    "Automobile": "AUTOIETF.NS",
+    "Healthcare": "PHARMABEES.NS",
+    "FMCG": "FMCGIETF.NS",
+    "Oil Gas & Consumable Fuels": "OILIETF.NS",
+    "Metals & Mining": "METALIETF.NS",
+    "Capital Goods": "MODEFENCE.NS"
+}
+
 # Data configuration
 DATA_FOLDER = "stock_data"
 TIMEFRAME = "4h"
+MARKET_TIMEZONE = "Asia/Kolkata"
+SESSION_CLOSE = "15:30"  # NSE close; the last bar of the day finalizes here
 HISTORICAL_PERIOD = "6mo"  # 6 months of historical data
+HOT_RETENTION_DAYS = 180  # rows older than this move from the hot CSV to cold partitions
+COLD_FOLDER = os.path.join(DATA_FOLDER, "cold")  # monthly gzip partitions per symbol
+PANEL_FOLDER = os.path.join(DATA_FOLDER, "panel")
+PANEL_PATH = os.path.join(PANEL_FOLDER, "universe.arrow")  # Arrow IPC panel for research jobs
+PANEL_EXPORT = True  # refresh the panel after each ingest cycle
+UNIVERSE_DB_PATH = os.path.join(DATA_FOLDER, "universe.db")
+STORAGE_SHARDS = 16  # historical and cold files are spread over this many hash shards
+HISTORY_MAX_BARS = int(os.getenv("HISTORY_MAX_BARS", "500"))  # bars read into memory per symbol (0 = all), plus indicator warm-up; older bars stay on disk
+ALERT_DB_PATH = os.path.join(DATA_FOLDER, "alerts", "alerts.db")
+ALERT_OUTBOX_PATH = os.path.join(DATA_FOLDER, "alerts", "outbox.db")
+SNAPSHOT_DB_PATH = os.path.join(DATA_FOLDER, "snapshot.db")
+CHANGE_FEED_PATH = os.path.join(DATA_FOLDER, "changes.db")
+CHANGE_FEED_RETENTION = 10000  # events kept for consumers that poll
+METRICS_PATH = os.path.join(DATA_FOLDER, "metrics.prom")  # Prometheus textfile export
+PROFILE_FOLDER = os.path.join(DATA_FOLDER, "profiles")
+REPORT_FOLDER = os.path.join(DATA_FOLDER, "reports")  # static per-symbol chart reports
+REPORT_FORMAT = "html"  # or "png" (needs kaleido)
 
 # Email configuration
 EMAIL_HOST = "smtp.gmail.com"
 EMAIL_PORT = 587
+EMAIL_USE_TLS = True
+
+# Alert delivery queue
+ALERT_WORKERS = 2  # background sender threads
+ALERT_MAX_RETRIES = 5
+ALERT_RETRY_BACKOFF = 30  # seconds, doubled after each failed attempt
+ALERT_CLAIM_TIMEOUT = 300  # seconds before a row stuck in 'sending' is handed to another worker
 
 # API rate limiting
 REQUEST_DELAY = 0.5  # seconds between requests
-BATCH_SIZE = 10  # number of stocks to process in each batch
+SCAN_SHARD_WORKERS = 4  # shards scanned in parallel
+COMPUTE_WORKERS = int(os.getenv("COMPUTE_WORKERS", "0"))  # indicator/scan worker processes (0 = one per core, 1 = in-process)
+COMPUTE_MIN_SYMBOLS = 32  # smaller jobs run in-process
 
 # Dashboard configuration
 REFRESH_INTERVAL = 60  # seconds
 MAX_CHARTS_PER_PAGE = 6
+CHART_MAX_POINTS = 800  # points per trace, roughly the chart's pixel width
+WEBGL_THRESHOLD = 1000  # line traces longer than this render with Scattergl
+FIGURE_CACHE_SIZE = 256  # built figures / card HTML kept per process
+SPARKLINE_POINTS = 60  # points per grid sparkline
+
+# Local read-only API (api_server.py)
+API_HOST = "127.0.0.1"
+API_PORT = 8765
+API_STREAM_ROWS = 2000  # history responses longer than this are streamed in chunks of this size
+API_FRAME_CACHE = 64  # parsed history frames kept in memory
 
 # Environment variables
 EMAIL_USER = os.getenv("EMAIL_USER", "")
 EMAIL_PASSWORD = os.getenv("EMAIL_PASSWORD", "")
 EMAIL_RECIPIENTS = os.getenv("EMAIL_RECIPIENTS", "").split(",") if os.getenv("EMAIL_RECIPIENTS") else []
+PROFILE_ENABLED = os.getenv("DASHBOARD_PROFILE", "").lower() in ("1", "true", "yes")  # profile every rerun and ingest
+ALERT_DIGEST = os.getenv("ALERT_DIGEST", "").lower() in ("1", "true", "yes")  # one email per scan instead of per symbol
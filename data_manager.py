@@ -1,102 +1,209 @@
 import yfinance as yf
-import pandas as pd
 import streamlit as st
-import time
+import os
 from datetime import datetime, timedelta
-from config import NIFTY_100_SYMBOLS, HISTORICAL_PERIOD, REQUEST_DELAY, BATCH_SIZE
-from utils import save_stock_data, load_stock_data, rate_limit_delay, create_data_folder
-from indicators import calculate_all_indicators
+from config import HISTORICAL_PERIOD, TIMEFRAME, HISTORY_MAX_BARS, HOT_RETENTION_DAYS, PANEL_EXPORT
+from utils import save_stock_data, load_stock_data, rate_limit_delay, create_data_folder, get_file_path, get_data_version
+from indicators import detect_crossover_signals
+from snapshot import update_snapshot, snapshot_row
+from change_feed import get_change_feed
+from metrics import metrics, export_metrics
+from profiling import profiled
+from memory import history_rows
+from retention import run_retention, archive_dropped_rows
+from universe import partition_by_shard
+from compute_pool import get_compute_pool, OHLCV_COLUMNS
+from panel_export import export_panel
+from pipeline import Pipeline, Stage, per_symbol
+
+def resample_ohlcv(df, rule=TIMEFRAME):
+    """Resample hourly OHLCV bars to the dashboard timeframe"""
+    return df.resample(rule).agg({
+        'Open': 'first',
+        'High': 'max',
+        'Low': 'min',
+        'Close': 'last',
+        'Volume': 'sum'
+    }).dropna()
 
 class DataManager:
-    def __init__(self):
+    def __init__(self, alert_system=None):
         create_data_folder()
         self.last_update = {}
+        self.alert_system = alert_system
+        self.change_feed = get_change_feed()
+        self.compute_pool = get_compute_pool()
+        self.pipeline = self._build_pipeline()
+        self.pending_alerts = {}  # symbol -> latest bar, collected across the run's shard batches
+        self.alerted = []  # symbols alerted since the last batch result was returned
+        self.last_retention = None
         
-    def download_historical_data(self, symbol, progress_callback=None):
-        """Download historical data for a single stock"""
-        try:
-            # Rate limiting
-            rate_limit_delay()
-            
-            # Download data
+    def _build_pipeline(self):
+        """Ingest DAG: fetch -> resample -> indicators -> save -> snapshot, indicators -> scan -> alert"""
+        return Pipeline([
+            Stage('fetch', per_symbol(self._fetch_stage), outputs=['raw']),
+            Stage('resample', per_symbol(lambda symbol, raw: {'bars': resample_ohlcv(raw)}),
+                  inputs=['raw'], outputs=['bars']),
+            Stage('indicators', self._indicator_stage, inputs=['bars'], outputs=['frame']),
+            Stage('save', per_symbol(self._save_stage), inputs=['frame'], outputs=['stored'],
+                  valid=lambda symbol, outputs: list(get_data_version(symbol) or []) == outputs['stored']),
+            Stage('snapshot', per_symbol(self._snapshot_stage), inputs=['frame', 'stored'], outputs=['snapshot']),
+            Stage('scan', per_symbol(lambda symbol, frame: {'signals': detect_crossover_signals(frame)}),
+                  inputs=['frame'], outputs=['signals']),
+            Stage('alert', self._alert_stage, inputs=['frame', 'signals'], outputs=['alerted'])
+        ], transient=('raw', 'bars', 'frame'))
+    
+    def _fetch_stage(self, symbol):
+        """Download 1h history for a stock"""
+        # Rate limiting
+        rate_limit_delay()
+        
+        # Download data
+        with metrics.timed('ingest_fetch_seconds', symbol=symbol):
             ticker = yf.Ticker(symbol)
             df = ticker.history(period=HISTORICAL_PERIOD, interval="1h")
-            
-            if df.empty:
-                st.warning(f"No data available for {symbol}")
-                return False
-            
-            # Resample to 4-hour data
-            df_4h = df.resample('4h').agg({
-                'Open': 'first',
-                'High': 'max',
-                'Low': 'min',
-                'Close': 'last',
-                'Volume': 'sum'
-            }).dropna()
-            
-            # Calculate indicators
-            df_4h = calculate_all_indicators(df_4h)
-            
-            # Save data
-            success = save_stock_data(symbol, df_4h)
-            
-            if success:
-                self.last_update[symbol] = datetime.now()
-                if progress_callback:
-                    progress_callback(symbol, True)
-                return True
-            else:
-                if progress_callback:
-                    progress_callback(symbol, False)
-                return False
-                
-        except Exception as e:
-            st.error(f"Error downloading {symbol}: {str(e)}")
-            if progress_callback:
-                progress_callback(symbol, False)
-            return False
+        metrics.set_gauge('ingest_rows_fetched', len(df), symbol=symbol)
+        
+        if df.empty:
+            raise ValueError(f"No data available for {symbol}")
+        self.last_update[symbol] = datetime.now()
+        return {'raw': df}
+    
+    def _indicator_stage(self, items):
+        """Calculate indicators for every due symbol in one compute pool job"""
+        computed = self.compute_pool.compute_indicators({symbol: inputs['bars'] for symbol, inputs in items.items()})
+        return {symbol: {'frame': df} for symbol, df in computed.items()}
+    
+    def _save_stage(self, symbol, frame):
+        """Save a symbol's computed 4h frame, keeping rows that fell out of the download window cold"""
+        # Archive under the same file lock as the save, so compaction can't interleave
+        if not save_stock_data(symbol, frame, snapshot=False,
+                               before_replace=lambda: archive_dropped_rows(symbol, frame)):
+            raise IOError(f"Could not save {symbol}")
+        metrics.inc('ingest_bytes_written_total', os.path.getsize(get_file_path(symbol)))
+        return {'stored': list(get_data_version(symbol))}
+    
+    def _snapshot_stage(self, symbol, frame, stored):
+        """Update the snapshot row, then publish the change (consumers read both)"""
+        update_snapshot(symbol, frame)
+        self.change_feed.publish(symbol)
+        return {'snapshot': snapshot_row(symbol, frame)}
+    
+    def _alert_stage(self, items):
+        """Collect the latest bars of symbols that have signals; sent once per run by _send_alerts"""
+        latest = {symbol: inputs['frame'].iloc[-1] for symbol, inputs in items.items() if inputs['signals']}
+        if self.alert_system:
+            self.pending_alerts.update(latest)
+        return {symbol: {'alerted': symbol in latest} for symbol in items}
+    
+    def _send_alerts(self):
+        """Hand every bar collected during the run to the alert system in one call (one digest per scan)"""
+        latest, self.pending_alerts = self.pending_alerts, {}
+        if not (self.alert_system and latest):
+            return
+        with metrics.timed('alert_stage_seconds'):
+            alerted = self.alert_system.send_bar_alerts(latest)
+        self.alerted.extend(alerted)
+        metrics.inc('alert_symbols_evaluated_total', len(latest))
+        metrics.inc('alert_symbols_alerted_total', len(alerted))
     
+    def download_historical_data(self, symbol, progress_callback=None):
+        """Download historical data for a single stock"""
+        report = self.pipeline.run([symbol])
+        self._send_alerts()
+        success = symbol not in report['failed']
+        if not success:
+            stage, error = report['failed'][symbol]
+            st.error(f"Error downloading {symbol} ({stage}): {error}")
+        
+        if progress_callback:
+            progress_callback(symbol, success)
+        return success
+    
+    @profiled("download_batch_data")
     def download_batch_data(self, symbols, progress_bar=None, status_text=None):
-        """Download data for multiple stocks in batches"""
-        total_symbols = len(symbols)
-        successful_downloads = 0
-        failed_downloads = []
+        """Download data for multiple stocks through the ingest pipeline"""
+        # One pipeline batch per storage shard: each pass stays within one folder and
+        # only that shard's frames are held at a time
+        total = len(dict.fromkeys(symbols))
+        with metrics.timed('ingest_cycle_seconds'):
+            report = self.pipeline.run(symbols, on_symbol=self._progress(total, progress_bar, status_text),
+                                       groups=lambda symbols: partition_by_shard(symbols).values())
+        return self._finish_run(report)
+    
+    def retry_failed(self, progress_bar=None, status_text=None):
+        """Re-run symbols that failed in the last pipeline run, from the stage where each failed"""
+        total = len(self.pipeline.failed)
+        with metrics.timed('ingest_cycle_seconds'):
+            report = self.pipeline.retry(on_symbol=self._progress(total, progress_bar, status_text),
+                                         groups=lambda symbols: partition_by_shard(symbols).values())
+        return self._finish_run(report)
+    
+    def _progress(self, total, progress_bar, status_text):
+        """Build an on_symbol callback that counts symbols as they complete every stage or fail"""
+        counts = {'done': 0, 'failed': 0}
         
-        def update_progress(symbol, success):
-            nonlocal successful_downloads
-            if success:
-                successful_downloads += 1
-            else:
-                failed_downloads.append(symbol)
-            
+        def update(symbol, ok):
+            counts['done' if ok else 'failed'] += 1
             if progress_bar:
-                progress_bar.progress(successful_downloads / total_symbols)
-            
+                progress_bar.progress(min(1.0, (counts['done'] + counts['failed']) / max(total, 1)))
             if status_text:
-                status_text.text(f"Downloaded: {successful_downloads}/{total_symbols} | Failed: {len(failed_downloads)}")
-        
-        # Process in batches
-        for i in range(0, len(symbols), BATCH_SIZE):
-            batch = symbols[i:i + BATCH_SIZE]
-            
-            for symbol in batch:
-                self.download_historical_data(symbol, update_progress)
-        
+                status_text.text(f"Downloaded: {counts['done']}/{total} | Failed: {counts['failed']}")
+        return update
+    
+    def _finish_run(self, report):
+        """Send the run's alerts, export the panel and metrics, and summarize the run for the UI"""
+        self._send_alerts()
+        self.export_panel()
+        export_metrics()
+        alerted, self.alerted = self.alerted, []
         return {
-            'successful': successful_downloads,
-            'failed': failed_downloads,
-            'total': total_symbols
+            'successful': report['symbols'] - len(report['failed']),
+            'failed': list(report['failed']),
+            'total': report['symbols'],
+            'alerted': alerted,
+            'stages': report['stages']
         }
     
-    def get_stock_data(self, symbol):
-        """Get stock data from cache or download if needed"""
-        df = load_stock_data(symbol)
+    def export_panel(self):
+        """Refresh the Arrow universe panel for symbols changed since the last export"""
+        if not PANEL_EXPORT:
+            return 0
+        try:
+            with metrics.timed('ingest_stage_seconds', stage='panel_export'):
+                return export_panel()
+        except Exception as e:
+            st.warning(f"Error exporting universe panel: {str(e)}")
+            return 0
+    
+    @profiled("recompute_indicators")
+    def recompute_indicators(self, symbols):
+        """Recompute indicators from stored OHLCV (e.g. after changing parameters) without downloading"""
+        recomputed = 0
+        with metrics.timed('recompute_seconds'):
+            for shard, shard_symbols in partition_by_shard(symbols).items():
+                frames = {}
+                for symbol in shard_symbols:
+                    df = load_stock_data(symbol)
+                    if not df.empty:
+                        frames[symbol] = df[OHLCV_COLUMNS].copy()
+                
+                for symbol, df in self.compute_pool.compute_indicators(frames).items():
+                    if save_stock_data(symbol, df):
+                        self.change_feed.publish(symbol)
+                        recomputed += 1
+        self.export_panel()
+        return recomputed
+    
+    def get_stock_data(self, symbol, max_bars=HISTORY_MAX_BARS):
+        """Get stock data from cache or download if needed, reading only the last max_bars bars from disk"""
+        rows = history_rows(max_bars)
+        df = load_stock_data(symbol, tail=rows)
         
         if df.empty:
             # Try to download data
             if self.download_historical_data(symbol):
-                df = load_stock_data(symbol)
+                df = load_stock_data(symbol, tail=rows)
         
         return df
     
@@ -149,22 +256,11 @@ class DataManager:
         
         return prices
     
-    def cleanup_old_data(self, days=30):
-        """Clean up data files older than specified days"""
-        import os
-        import glob
-        
-        cutoff_date = datetime.now() - timedelta(days=days)
-        data_files = glob.glob("stock_data/historical/*.csv")
-        
-        cleaned_files = 0
-        for file_path in data_files:
-            try:
-                file_time = datetime.fromtimestamp(os.path.getmtime(file_path))
-                if file_time < cutoff_date:
-                    os.remove(file_path)
-                    cleaned_files += 1
-            except Exception as e:
-                st.warning(f"Error cleaning file {file_path}: {str(e)}")
-        
-        return cleaned_files
\ No newline at end of file
+    def cleanup_old_data(self, days=HOT_RETENTION_DAYS, archive=True):
+        """Trim stored history to the last `days` days, moving older rows to cold partitions.
+
+        The result (rows moved and errors per symbol) is kept in last_retention
+        for the diagnostics panel, since compaction usually runs in a background thread.
+        """
+        self.last_retention = run_retention(retention_days=days, archive=archive)
+        return len(self.last_retention['moved'])
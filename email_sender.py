@@ -0,0 +1,76 @@
+import smtplib
+import threading
+from config import EMAIL_HOST, EMAIL_PORT, EMAIL_USER, EMAIL_PASSWORD, EMAIL_USE_TLS
+
+def format_email(sender, recipients, subject, message):
+    """Build a simple HTML email without MIME"""
+    return f"Subject: {subject}\nFrom: {sender}\nTo: {', '.join(recipients)}\nContent-Type: text/html\n\n{message}"
+
+class SMTPSender:
+    """SMTP sender that keeps one authenticated connection open for a batch of messages.
+
+    Use it as a context manager to reuse the connection across sends; outside a
+    ``with`` block every send opens and closes its own connection.
+    """
+
+    def __init__(self, host=EMAIL_HOST, port=EMAIL_PORT, user=EMAIL_USER,
+                 password=EMAIL_PASSWORD, use_tls=EMAIL_USE_TLS, timeout=30):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.use_tls = use_tls
+        self.timeout = timeout
+        self.server = None
+        self.connections_opened = 0
+        self._depth = 0
+        self._lock = threading.RLock()
+
+    def __enter__(self):
+        with self._lock:
+            self._depth += 1
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        with self._lock:
+            self._depth -= 1
+            if self._depth == 0:
+                self.close()
+
+    def _connect(self):
+        """Open and authenticate a new SMTP connection"""
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.use_tls:
+            server.starttls()
+        if self.user and self.password:
+            server.login(self.user, self.password)
+        self.server = server
+        self.connections_opened += 1
+
+    def close(self):
+        """Close the pooled connection if one is open"""
+        with self._lock:
+            if self.server is not None:
+                try:
+                    self.server.quit()
+                except OSError:
+                    pass  # Connection already gone
+                self.server = None
+
+    def send(self, recipients, email_message):
+        """Send a raw message, reconnecting once if the pooled connection has dropped"""
+        with self._lock:
+            try:
+                for attempt in range(2):
+                    if self.server is None:
+                        self._connect()
+                    try:
+                        self.server.sendmail(self.user, recipients, email_message)
+                        break
+                    except (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError):
+                        self.server = None
+                        if attempt == 1:
+                            raise
+            finally:
+                if self._depth == 0:
+                    self.close()
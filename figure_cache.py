@@ -0,0 +1,101 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from config import FIGURE_CACHE_SIZE
+from change_feed import get_change_feed
+from metrics import metrics
+
+class FigureCache:
+    """Bounded LRU cache for built figures and rendered HTML.
+
+    Keys start with the symbol and include the data version, so a new
+    download naturally misses and the stale entry ages out.
+    """
+
+    def __init__(self, max_entries=FIGURE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="figure-prefetch")
+        self._inflight = set()
+
+    def get_or_build(self, key, build):
+        """Return the cached value for key, building and storing it on a miss"""
+        with self._lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+            self.misses += 1
+
+        value = build()
+
+        with self._lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return value
+
+    def prefetch(self, key, build):
+        """Build and cache key in the background unless it is cached or already building"""
+        with self._lock:
+            if key in self.entries or key in self._inflight:
+                return
+            self._inflight.add(key)
+
+        def run():
+            try:
+                self.get_or_build(key, build)
+            except Exception:
+                pass  # a failed prefetch just means the page builds it on demand
+            finally:
+                with self._lock:
+                    self._inflight.discard(key)
+
+        self._executor.submit(run)
+
+    def invalidate(self, symbol):
+        """Drop every entry for symbol"""
+        with self._lock:
+            for key in [key for key in self.entries if key[0] == symbol]:
+                del self.entries[key]
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+
+    def stats(self):
+        """Get entry count and hit/miss counters"""
+        with self._lock:
+            return {
+                'entries': len(self.entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+def _collect_cache_metrics(registry):
+    stats = get_figure_cache().stats()
+    registry.set_gauge('figure_cache_entries', stats['entries'])
+    registry.set_gauge('figure_cache_hits', stats['hits'])
+    registry.set_gauge('figure_cache_misses', stats['misses'])
+    lookups = stats['hits'] + stats['misses']
+    registry.set_gauge('figure_cache_hit_ratio', stats['hits'] / lookups if lookups else 0.0)
+
+_figure_cache = None
+_figure_cache_lock = threading.Lock()
+
+def get_figure_cache():
+    """Get the cache shared by every session in this process, hooking it up on first use"""
+    global _figure_cache
+    with _figure_cache_lock:
+        if _figure_cache is None:
+            _figure_cache = FigureCache()
+            # Drop a symbol's figures as soon as ingestion in this process updates it;
+            # updates from other processes are caught by the data version in the key
+            get_change_feed().subscribe(lambda event: _figure_cache.invalidate(event['symbol']))
+            metrics.register_collector(_collect_cache_metrics)
+        return _figure_cache
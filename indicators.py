@@ -2,6 +2,9 @@ import pandas as pd
 import numpy as np
 from config import MACD_FAST, MACD_SLOW, MACD_SIGNAL, RSI_PERIOD, MFI_PERIOD, VOLUME_MA_SHORT, VOLUME_MA_LONG
 
+# Signal types emitted by detect_bar_signals
+SIGNAL_TYPES = ['MACD_Bullish', 'RSI_Oversold', 'RSI_Overbought', 'MFI_Oversold', 'Volume_Surge']
+
 def calculate_macd(df):
     """Calculate MACD indicator using pure pandas"""
     try:
@@ -125,12 +128,14 @@ def calculate_all_indicators(df):
 
 def detect_crossover_signals(df):
     """Detect all crossover signals"""
-    signals = []
-    
     if df.empty:
-        return signals
+        return []
     
-    latest = df.iloc[-1]
+    return detect_bar_signals(df.iloc[-1])
+
+def detect_bar_signals(latest):
+    """Detect signals from a single bar's precomputed indicator values"""
+    signals = []
     
     # MACD crossover
     if latest['MACD_Crossover'] == 1:
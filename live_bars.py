@@ -0,0 +1,267 @@
+import copy
+import math
+from collections import deque
+import pandas as pd
+from config import (
+    TIMEFRAME, MARKET_TIMEZONE, SESSION_CLOSE,
+    MACD_FAST, MACD_SLOW, MACD_SIGNAL, RSI_PERIOD, MFI_PERIOD, VOLUME_MA_SHORT, VOLUME_MA_LONG
+)
+
+BAR_NS = pd.Timedelta(TIMEFRAME).value
+DAY_NS = pd.Timedelta("1D").value
+# IST has no DST, so one offset aligns every bar with resample_ohlcv's local-midnight bins
+UTC_OFFSET_NS = pd.Timedelta(pd.Timestamp("2000-01-01", tz=MARKET_TIMEZONE).utcoffset()).value
+SESSION_CLOSE_NS = pd.Timedelta(f"{SESSION_CLOSE}:00").value
+
+def _ratio(numerator, denominator):
+    """Divide like pandas does: x/0 is inf, 0/0 is NaN"""
+    if denominator == 0:
+        return math.nan if numerator == 0 or math.isnan(numerator) else math.inf
+    return numerator / denominator
+
+def _oscillator(positive, negative):
+    """100 - 100 / (1 + positive / negative), as RSI and MFI compute it"""
+    ratio = _ratio(positive, negative)
+    return 100 - 100 / (1 + ratio) if not math.isinf(ratio) else 100.0
+
+class _Ema:
+    """Adjusted EMA (pandas ewm(span).mean()) kept as a running numerator and denominator"""
+
+    def __init__(self, span):
+        self.decay = 1 - 2 / (span + 1)
+        self.numerator = 0.0
+        self.denominator = 0.0
+
+    def peek(self, value):
+        return (value + self.decay * self.numerator) / (1 + self.decay * self.denominator)
+
+    def push(self, value):
+        self.numerator = value + self.decay * self.numerator
+        self.denominator = 1 + self.decay * self.denominator
+
+class _Window:
+    """Rolling sum over the last `size` values, where the newest value may be provisional"""
+
+    def __init__(self, size):
+        self.size = size
+        self.values = deque(maxlen=size - 1)
+        self.total = 0.0
+
+    def peek_mean(self, value):
+        if len(self.values) < self.size - 1:
+            return math.nan
+        return (self.total + value) / self.size
+
+    def peek_sum(self, value):
+        if len(self.values) < self.size - 1:
+            return math.nan
+        return self.total + value
+
+    def push(self, value):
+        if len(self.values) == self.values.maxlen:
+            self.total -= self.values[0]
+        self.values.append(value)
+        self.total += value
+
+class _SymbolState:
+    """Committed indicator state after the last finalized bar, plus the forming bar"""
+
+    def __init__(self):
+        self.forming = None  # [start_ns, open, high, low, close, volume]
+        self.last_bar = None  # OHLCV list of the last finalized bar
+        self.before_last = None  # state before the last bar was finalized, for reopening it
+        self.seeded_open = False  # last_bar came from seed() and may still have been forming
+        self.ema_fast = _Ema(MACD_FAST)
+        self.ema_slow = _Ema(MACD_SLOW)
+        self.ema_signal = _Ema(MACD_SIGNAL)
+        self.prev_macd = math.nan
+        self.prev_signal = math.nan
+        self.prev_close = math.nan
+        self.prev_typical = math.nan
+        self.gains = _Window(RSI_PERIOD)
+        self.losses = _Window(RSI_PERIOD)
+        self.positive_flow = _Window(MFI_PERIOD)
+        self.negative_flow = _Window(MFI_PERIOD)
+        self.volume_short = _Window(VOLUME_MA_SHORT)
+        self.volume_long = _Window(VOLUME_MA_LONG)
+
+    def indicators(self, bar):
+        """Indicator values for bar on top of the committed state (matches calculate_all_indicators)"""
+        _, open_, high, low, close, volume = bar
+        macd = self.ema_fast.peek(close) - self.ema_slow.peek(close)
+        signal = self.ema_signal.peek(macd)
+
+        delta = close - self.prev_close
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+        rsi = _oscillator(self.gains.peek_mean(gain), self.losses.peek_mean(loss))
+
+        typical = (high + low + close) / 3
+        flow = typical * volume
+        mfi = _oscillator(
+            self.positive_flow.peek_sum(flow if typical > self.prev_typical else 0.0),
+            self.negative_flow.peek_sum(flow if typical < self.prev_typical else 0.0)
+        )
+
+        volume_short = self.volume_short.peek_mean(volume)
+        volume_ratio = _ratio(volume, volume_short)
+        return {
+            'Open': open_, 'High': high, 'Low': low, 'Close': close, 'Volume': volume,
+            'MACD': macd,
+            'MACD_Signal': signal,
+            'MACD_Histogram': macd - signal,
+            'MACD_Crossover': int(macd > signal and self.prev_macd <= self.prev_signal),
+            'RSI': rsi,
+            'RSI_Oversold': int(rsi < 30),
+            'RSI_Overbought': int(rsi > 70),
+            'MFI': mfi,
+            'MFI_Oversold': int(mfi < 20),
+            'MFI_Overbought': int(mfi > 80),
+            'Volume_MA_Short': volume_short,
+            'Volume_MA_Long': self.volume_long.peek_mean(volume),
+            'Volume_Ratio': volume_ratio,
+            'Volume_Surge': int(volume_ratio > 2.0)
+        }
+
+    def commit(self, bar):
+        """Fold a finalized bar into the committed state and return its indicator row"""
+        row = self.indicators(bar)
+        self.before_last = copy.deepcopy(self)
+        _, _, high, low, close, volume = bar
+        typical = (high + low + close) / 3
+        flow = typical * volume
+        delta = close - self.prev_close
+
+        self.ema_fast.push(close)
+        self.ema_slow.push(close)
+        self.ema_signal.push(row['MACD'])
+        self.prev_macd, self.prev_signal = row['MACD'], row['MACD_Signal']
+        self.gains.push(delta if delta > 0 else 0.0)
+        self.losses.push(-delta if delta < 0 else 0.0)
+        self.positive_flow.push(flow if typical > self.prev_typical else 0.0)
+        self.negative_flow.push(flow if typical < self.prev_typical else 0.0)
+        self.volume_short.push(volume)
+        self.volume_long.push(volume)
+        self.prev_close, self.prev_typical = close, typical
+        self.last_bar = list(bar)
+        self.forming = None
+        self.seeded_open = False
+        return row
+
+    def __deepcopy__(self, memo):
+        # The reopen snapshot never needs its own snapshot or forming bar
+        state = copy.copy(self)
+        state.before_last = None
+        state.forming = None
+        state.seeded_open = False
+        for name in ('ema_fast', 'ema_slow', 'ema_signal', 'gains', 'losses',
+                     'positive_flow', 'negative_flow', 'volume_short', 'volume_long'):
+            original = getattr(self, name)
+            clone = copy.copy(original)
+            if isinstance(original, _Window):
+                clone.values = original.values.copy()
+            setattr(state, name, clone)
+        return state
+
+class LiveBarBuilder:
+    """Builds forming 4h bars from ticks or 1-minute bars for every symbol.
+
+    Bars use the same local-midnight bins as resample_ohlcv, so finalized bars
+    match the stored history. Indicator state is committed once per bar;
+    provisional values for the forming bar are O(1) on top of it.
+    """
+
+    def __init__(self):
+        self.states = {}
+        self.callbacks = []
+        self.late_ticks = 0
+
+    def subscribe(self, callback):
+        """Register callback(symbol, timestamp, row) for every finalized bar"""
+        self.callbacks.append(callback)
+
+    def seed(self, symbol, df):
+        """Load finalized history (an OHLCV frame) so indicators continue from it"""
+        state = _SymbolState()
+        for timestamp, row in zip(df.index, df[['Open', 'High', 'Low', 'Close', 'Volume']].itertuples(index=False)):
+            state.commit([pd.Timestamp(timestamp).value, *map(float, row)])
+        state.seeded_open = state.last_bar is not None
+        self.states[symbol] = state
+
+    def update_bar(self, symbol, ts_ns, open_, high, low, close, volume):
+        """Apply one 1-minute bar (ts_ns: UTC epoch nanoseconds of the minute's start)"""
+        start = (ts_ns + UTC_OFFSET_NS) // BAR_NS * BAR_NS - UTC_OFFSET_NS
+        state = self.states.get(symbol)
+        if state is None:
+            state = self.states[symbol] = _SymbolState()
+
+        forming = state.forming
+        if forming is not None and start == forming[0]:
+            if high > forming[2]:
+                forming[2] = high
+            if low < forming[3]:
+                forming[3] = low
+            forming[4] = close
+            forming[5] += volume
+            return
+
+        if forming is not None and start > forming[0]:
+            self._finalize(symbol, state)
+        elif forming is not None or (state.last_bar and start < state.last_bar[0]):
+            self.late_ticks += 1
+            return
+
+        if state.last_bar and start == state.last_bar[0]:
+            if not state.seeded_open:
+                # This bin was already finalized and emitted; subscribers never see it twice
+                self.late_ticks += 1
+                return
+            # The newest stored bar was still forming when history was loaded: reopen it
+            last_bar = state.last_bar
+            restored = state.before_last
+            state.__dict__.update(restored.__dict__)
+            state.forming = [start, last_bar[1], max(last_bar[2], high), min(last_bar[3], low),
+                             close, last_bar[5] + volume]
+            return
+
+        state.forming = [start, open_, high, low, close, volume]
+
+    def update_tick(self, symbol, ts_ns, price, size):
+        """Apply one trade"""
+        self.update_bar(symbol, ts_ns, price, price, price, price, size)
+
+    def _finalize(self, symbol, state):
+        bar = state.forming
+        row = state.commit(bar)
+        timestamp = pd.Timestamp(bar[0], tz="UTC").tz_convert(MARKET_TIMEZONE)
+        for callback in self.callbacks:
+            callback(symbol, timestamp, row)
+
+    def finalize_due(self, now_ns):
+        """Finalize forming bars whose 4h bin or trading session has ended; returns symbols finalized"""
+        finalized = []
+        for symbol, state in list(self.states.items()):
+            forming = state.forming
+            if forming is None:
+                continue
+            local_day = (forming[0] + UTC_OFFSET_NS) // DAY_NS * DAY_NS - UTC_OFFSET_NS
+            session_close = local_day + SESSION_CLOSE_NS
+            close_at = min(forming[0] + BAR_NS, session_close) if session_close > forming[0] else forming[0] + BAR_NS
+            if now_ns >= close_at:
+                self._finalize(symbol, state)
+                finalized.append(symbol)
+        return finalized
+
+    def get_forming(self, symbol):
+        """Get the forming bar with provisional indicator values, or None"""
+        state = self.states.get(symbol)
+        if state is None or state.forming is None:
+            return None
+        row = state.indicators(state.forming)
+        row['timestamp'] = pd.Timestamp(state.forming[0], tz="UTC").tz_convert(MARKET_TIMEZONE)
+        return row
+
+    def get_forming_frame(self):
+        """Get every symbol's forming bar as one DataFrame indexed by symbol"""
+        rows = {symbol: self.get_forming(symbol) for symbol in list(self.states)}
+        return pd.DataFrame.from_dict({s: r for s, r in rows.items() if r}, orient='index')
@@ -0,0 +1,96 @@
+import os
+import sys
+import types
+import threading
+import numpy as np
+import pandas as pd
+from config import (
+    HISTORY_MAX_BARS, MACD_SLOW, MACD_SIGNAL, RSI_PERIOD, MFI_PERIOD, VOLUME_MA_SHORT, VOLUME_MA_LONG
+)
+
+# Rolling indicators (Volume MAs, RSI, MFI) need their full window to be exact.
+# MACD uses EMAs, which never fully forget; four spans of slow+signal leave a
+# weight of about 2e-5 on truncated history.
+INDICATOR_WARMUP_BARS = max(
+    VOLUME_MA_LONG, VOLUME_MA_SHORT, RSI_PERIOD + 1, MFI_PERIOD + 1, 4 * (MACD_SLOW + MACD_SIGNAL)
+)
+
+def deep_sizeof(obj, seen=None):
+    """Approximate bytes held by obj, following containers, arrays, frames and figures"""
+    seen = seen if seen is not None else set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        usage = obj.memory_usage(deep=True)
+        return int(usage.sum() if isinstance(usage, pd.Series) else usage)
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if hasattr(obj, 'to_plotly_json'):
+        return deep_sizeof(obj.to_plotly_json(), seen)
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    elif isinstance(getattr(obj, '__dict__', None), dict) and not isinstance(obj, (type, types.ModuleType)):
+        # Plain objects (e.g. the session's DataManager) hold their data in attributes
+        size += deep_sizeof(obj.__dict__, seen)
+    return size
+
+def history_rows(max_bars=HISTORY_MAX_BARS):
+    """Rows to hold for a max_bars history: the bars plus the indicator warm-up margin (None = unbounded)"""
+    return max_bars + INDICATOR_WARMUP_BARS if max_bars else None
+
+# Bytes each Streamlit session reported holding on its last rerun
+_session_usage = {}
+_session_lock = threading.Lock()
+
+def report_session(session_id, nbytes):
+    """Record the bytes a session holds (called once per rerun)"""
+    with _session_lock:
+        _session_usage[session_id] = nbytes
+
+def _prune_sessions():
+    """Forget sessions the Streamlit runtime has closed (call with _session_lock held)"""
+    from streamlit import runtime
+    if not runtime.exists():
+        return
+    instance = runtime.get_instance()
+    for session_id in list(_session_usage):
+        if not instance.is_active_session(session_id):
+            del _session_usage[session_id]
+
+def process_rss_bytes():
+    """Current resident set size of this process, if the platform exposes it"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+def memory_report(frames=None):
+    """Bytes held per symbol (for the given frames), per process cache and per session"""
+    from figure_cache import get_figure_cache
+    from scanner import get_scanner
+
+    figure_cache = get_figure_cache()
+    with figure_cache._lock:
+        figure_entries = list(figure_cache.entries.values())
+    scanner = get_scanner()
+
+    with _session_lock:
+        _prune_sessions()
+        sessions = dict(_session_usage)
+
+    return {
+        'symbols': {symbol: deep_sizeof(df) for symbol, df in (frames or {}).items()},
+        'caches': {
+            'figure_cache': deep_sizeof(figure_entries),
+            'scanner_results': deep_sizeof(scanner.results)
+        },
+        'sessions': sessions,
+        'process_rss': process_rss_bytes()
+    }
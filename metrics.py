@@ -0,0 +1,135 @@
+import time
+import threading
+from contextlib import contextmanager
+from config import METRICS_PATH
+
+class MetricsRegistry:
+    """Process-wide counters, gauges and summaries with Prometheus text export.
+
+    Summaries keep count/sum/max per label set, which is enough to spot slow
+    stages and slow symbols without storing individual samples.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.gauges = {}
+        self.summaries = {}
+        self.collectors = []
+
+    @staticmethod
+    def _key(name, labels):
+        return (name, tuple(sorted(labels.items())))
+
+    def inc(self, name, value=1, **labels):
+        """Increase a counter"""
+        key = self._key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set_gauge(self, name, value, **labels):
+        """Set a gauge to the current value"""
+        with self._lock:
+            self.gauges[self._key(name, labels)] = value
+
+    def observe(self, name, value, **labels):
+        """Record one observation in a summary"""
+        key = self._key(name, labels)
+        with self._lock:
+            count, total, maximum = self.summaries.get(key, (0, 0.0, 0.0))
+            self.summaries[key] = (count + 1, total + value, max(maximum, value))
+
+    @contextmanager
+    def timed(self, name, **labels):
+        """Observe the wall time of the with-block in seconds"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def register_collector(self, collector):
+        """Register a callable run before each export to refresh gauges"""
+        with self._lock:
+            self.collectors.append(collector)
+
+    def collect(self):
+        """Run collectors so gauges reflect current state"""
+        for collector in list(self.collectors):
+            try:
+                collector(self)
+            except Exception as e:
+                print(f"Metrics collector failed: {str(e)}")
+
+    def get_summaries(self, name=None):
+        """Get summaries as a list of dicts, optionally for one metric name"""
+        with self._lock:
+            items = list(self.summaries.items())
+        rows = []
+        for (metric, labels), (count, total, maximum) in items:
+            if name and metric != name:
+                continue
+            rows.append({
+                'metric': metric,
+                **dict(labels),
+                'count': count,
+                'avg': total / count if count else 0.0,
+                'max': maximum,
+                'total': total
+            })
+        return rows
+
+    def render_prometheus(self):
+        """Render all metrics in the Prometheus text exposition format"""
+        self.collect()
+
+        def fmt(name, labels, suffix=""):
+            label_text = ",".join(f'{k}="{v}"' for k, v in labels)
+            return f"{name}{suffix}{{{label_text}}}" if label_text else f"{name}{suffix}"
+
+        lines = []
+        with self._lock:
+            for kind, values in (('counter', self.counters), ('gauge', self.gauges)):
+                seen = set()
+                for (name, labels), value in sorted(values.items()):
+                    if name not in seen:
+                        lines.append(f"# TYPE {name} {kind}")
+                        seen.add(name)
+                    lines.append(f"{fmt(name, labels)} {value}")
+
+            summaries = sorted(self.summaries.items())
+            seen = set()
+            for (name, labels), (count, total, maximum) in summaries:
+                if name not in seen:
+                    lines.append(f"# TYPE {name} summary")
+                    seen.add(name)
+                lines.append(f"{fmt(name, labels, '_count')} {count}")
+                lines.append(f"{fmt(name, labels, '_sum')} {total}")
+
+            # Max is not part of the summary type, so it is exported as a gauge
+            seen = set()
+            for (name, labels), (count, total, maximum) in summaries:
+                if name not in seen:
+                    lines.append(f"# TYPE {name}_max gauge")
+                    seen.add(name)
+                lines.append(f"{fmt(name, labels, '_max')} {maximum}")
+
+        return "\n".join(lines) + "\n"
+
+    def export(self, path=METRICS_PATH):
+        """Write the Prometheus text to path (atomically) for a node exporter textfile collector"""
+        from storage import atomic_write
+        text = self.render_prometheus()
+        atomic_write(path, lambda f: f.write(text))
+        return path
+
+# Shared by every module in this process
+metrics = MetricsRegistry()
+
+def export_metrics(path=METRICS_PATH):
+    """Export the shared registry, reporting rather than raising on failure"""
+    try:
+        return metrics.export(path)
+    except OSError as e:
+        print(f"Error exporting metrics: {str(e)}")
+        return None
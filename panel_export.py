@@ -0,0 +1,162 @@
+"""Arrow IPC export of the whole universe (OHLCV and indicators) for research jobs.
+
+The panel is one uncompressed Arrow IPC file with a record batch per
+symbol, so readers memory-map it and get zero-copy columns:
+
+    from panel_export import attach_panel, load_panel
+    table = attach_panel()                          # pyarrow.Table backed by the page cache
+    df = load_panel(["INFY.NS"], ["Close", "RSI"])  # pandas, only the requested batches
+
+Export is incremental: only symbols the change feed reports as updated are
+re-read from CSV; the others are copied from their cached Arrow batches.
+The symbol -> batch index travels in the panel file's own schema metadata,
+so a reader always pairs batches with the index of the file it opened.
+"""
+import os
+import json
+import pyarrow as pa
+import pandas as pd
+from config import PANEL_PATH, PANEL_FOLDER, MARKET_TIMEZONE
+from utils import load_stock_data, get_data_version, get_stored_symbols, get_shard, atomic_write, file_lock
+from change_feed import get_change_feed
+from compute_pool import OHLCV_COLUMNS, INDICATOR_COLUMNS
+from metrics import metrics
+
+PANEL_COLUMNS = OHLCV_COLUMNS + INDICATOR_COLUMNS
+MANIFEST_PATH = os.path.join(PANEL_FOLDER, "manifest.json")
+
+PANEL_SCHEMA = pa.schema(
+    [pa.field('symbol', pa.string()), pa.field('timestamp', pa.timestamp('ns', tz=MARKET_TIMEZONE))] +
+    [pa.field(column, pa.float64()) for column in PANEL_COLUMNS]
+)
+
+def get_batch_path(symbol):
+    """Get the cached single-symbol Arrow file used to assemble the panel"""
+    return os.path.join(PANEL_FOLDER, "symbols", get_shard(symbol), f"{symbol.replace('.NS', '')}.arrow")
+
+def frame_to_batch(symbol, df):
+    """Convert a stored frame into a record batch with the panel schema (missing columns are null)"""
+    index = pd.DatetimeIndex(df.index)
+    index = index.tz_localize(MARKET_TIMEZONE) if index.tz is None else index.tz_convert(MARKET_TIMEZONE)
+    arrays = [pa.array([symbol] * len(df), pa.string()), pa.array(index, PANEL_SCHEMA.field('timestamp').type)]
+    for column in PANEL_COLUMNS:
+        values = df[column].to_numpy(dtype='float64') if column in df.columns else [None] * len(df)
+        arrays.append(pa.array(values, pa.float64()))
+    return pa.RecordBatch.from_arrays(arrays, schema=PANEL_SCHEMA)
+
+def _write_ipc(path, batches, metadata=None):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    schema = PANEL_SCHEMA.with_metadata(metadata) if metadata else PANEL_SCHEMA
+
+    def write(f):
+        with pa.ipc.new_file(f, schema) as writer:
+            for batch in batches:
+                writer.write_batch(batch)
+
+    atomic_write(path, write, mode='wb')
+
+def _read_batches(path):
+    """Read every batch of an IPC file through a memory map (no copies)"""
+    with pa.memory_map(path, 'r') as source:
+        reader = pa.ipc.open_file(source)
+        return [reader.get_batch(i) for i in range(reader.num_record_batches)]
+
+def load_manifest():
+    """Export bookkeeping (feed cursor and per-symbol data versions); readers use the panel's own index"""
+    try:
+        with open(MANIFEST_PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'feed_seq': None, 'symbols': {}}
+
+def export_panel(symbols=None, full=False):
+    """Refresh per-symbol batches that changed and republish the universe panel.
+
+    Returns the number of symbols re-read from CSV. Readers holding the old
+    panel open keep a consistent view; the new file replaces it atomically.
+    Concurrent exports (one per dashboard session) are serialized by a lock.
+    """
+    feed = get_change_feed()
+    symbols = list(dict.fromkeys(symbols if symbols is not None else get_stored_symbols()))
+    os.makedirs(PANEL_FOLDER, exist_ok=True)
+
+    with file_lock(PANEL_PATH), metrics.timed('panel_export_seconds'):
+        manifest = load_manifest()
+        # Take the cursor before reading so updates during the export are picked up next time
+        cursor = feed.latest_seq()
+        changed = None
+        if not full and manifest['feed_seq'] is not None:
+            changed, _ = feed.changed_symbols(manifest['feed_seq'])
+
+        entries = {}
+        refreshed = 0
+        batches = []
+        for symbol in symbols:
+            previous = manifest['symbols'].get(symbol)
+            version = get_data_version(symbol)
+            if version is None:
+                continue
+            stale = (
+                changed is None or symbol in changed or previous is None
+                or previous['version'] != list(version) or not os.path.exists(get_batch_path(symbol))
+            )
+            if stale:
+                df = load_stock_data(symbol)
+                if df.empty:
+                    continue
+                batch = frame_to_batch(symbol, df)
+                _write_ipc(get_batch_path(symbol), [batch])
+                refreshed += 1
+            else:
+                batch = _read_batches(get_batch_path(symbol))[0]
+
+            entries[symbol] = {'batch': len(batches), 'rows': batch.num_rows, 'version': list(version)}
+            batches.append(batch)
+
+        _write_ipc(PANEL_PATH, batches, {
+            'feed_seq': str(cursor),
+            'symbols': json.dumps({symbol: entry['batch'] for symbol, entry in entries.items()})
+        })
+        atomic_write(MANIFEST_PATH, lambda f: json.dump({
+            'feed_seq': cursor, 'symbols': entries, 'columns': PANEL_COLUMNS
+        }, f))
+
+    metrics.set_gauge('panel_symbols_refreshed', refreshed)
+    return refreshed
+
+def attach_panel(path=PANEL_PATH):
+    """Memory-map the panel and return it as a pyarrow Table without copying"""
+    source = pa.memory_map(path, 'r')
+    return pa.ipc.open_file(source).read_all()
+
+def _read_index(reader):
+    metadata = reader.schema.metadata or {}
+    feed_seq = metadata.get(b'feed_seq')
+    return (int(feed_seq) if feed_seq else None), json.loads(metadata.get(b'symbols', b'{}'))
+
+def panel_index(path=PANEL_PATH):
+    """Get (change feed seq the panel was exported at, {symbol: batch}) from the panel itself"""
+    with pa.memory_map(path, 'r') as source:
+        return _read_index(pa.ipc.open_file(source))
+
+def load_panel(symbols=None, columns=None, path=PANEL_PATH):
+    """Load symbols (default all) as a pandas frame indexed by (symbol, timestamp)"""
+    source = pa.memory_map(path, 'r')
+    reader = pa.ipc.open_file(source)
+    if symbols is None:
+        batches = [reader.get_batch(i) for i in range(reader.num_record_batches)]
+    else:
+        _, index = _read_index(reader)
+        batches = [reader.get_batch(index[s]) for s in symbols if s in index]
+
+    table = pa.Table.from_batches(batches, schema=PANEL_SCHEMA)
+    if columns is not None:
+        table = table.select(['symbol', 'timestamp'] + list(columns))
+    return table.to_pandas().set_index(['symbol', 'timestamp'])
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Export the universe panel as Arrow IPC")
+    parser.add_argument("--full", action="store_true", help="re-read every symbol instead of only changed ones")
+    args = parser.parse_args()
+    print(f"Refreshed {export_panel(full=args.full)} symbols into {PANEL_PATH}")
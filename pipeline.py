@@ -0,0 +1,225 @@
+"""Per-symbol stage DAG with memoized outputs.
+
+Each Stage names the artifacts it reads and writes for a symbol, and the
+pipeline orders stages from those declarations. A stage is skipped for a
+symbol when the versions of its inputs match its last successful run, so
+a rerun only does the work whose inputs changed. A symbol that fails stops
+at that stage; retry() resumes failed symbols from there.
+
+Source stages (no inputs) are keyed by the run epoch: run(refresh=True)
+starts a new epoch and re-executes them, retry() does not.
+"""
+import hashlib
+import time
+import pandas as pd
+from metrics import metrics
+
+class Stage:
+    """A pipeline step: run({symbol: {input: value}}) -> {symbol: {output: value} or an Exception}.
+
+    valid(symbol, outputs), if given, can reject a memo hit whose outputs
+    went stale outside the pipeline (e.g. a stored file was replaced).
+    """
+
+    def __init__(self, name, run, inputs=(), outputs=(), valid=None):
+        self.name = name
+        self.run = run
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs)
+        self.valid = valid
+
+def per_symbol(function):
+    """Adapt function(symbol, **inputs) -> {output: value} into a Stage run, one symbol at a time"""
+    def run(items):
+        results = {}
+        for symbol, inputs in items.items():
+            try:
+                results[symbol] = function(symbol, **inputs)
+            except Exception as e:
+                results[symbol] = e
+        return results
+    return run
+
+def artifact_version(value):
+    """Content hash of an artifact value"""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        digest = hashlib.md5(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+        if isinstance(value, pd.DataFrame):
+            digest.update(repr(list(value.columns)).encode())
+        return digest.hexdigest()
+    return hashlib.md5(repr(value).encode()).hexdigest()
+
+def order_stages(stages):
+    """Sort stages so every artifact is produced before it is read"""
+    producers = {}
+    for stage in stages:
+        for output in stage.outputs:
+            if output in producers:
+                raise ValueError(f"Artifact '{output}' is produced by both {producers[output]} and {stage.name}")
+            producers[output] = stage.name
+    for stage in stages:
+        missing = [name for name in stage.inputs if name not in producers]
+        if missing:
+            raise ValueError(f"Stage {stage.name} reads {', '.join(missing)}, which no stage produces")
+
+    ordered, done, pending = [], set(), list(stages)
+    while pending:
+        ready = [stage for stage in pending if all(producers[name] in done for name in stage.inputs)]
+        if not ready:
+            raise ValueError(f"Stages {', '.join(stage.name for stage in pending)} form a cycle")
+        for stage in ready:
+            ordered.append(stage)
+            done.add(stage.name)
+            pending.remove(stage)
+    return ordered
+
+class Pipeline:
+    """Runs stages over symbols, memoizing each stage by the versions of its inputs.
+
+    Values of `transient` artifacts are released (their versions kept) as
+    soon as every stage that reads them has succeeded for a symbol, so large
+    frames are neither held between runs nor all alive at once.
+    """
+
+    def __init__(self, stages, transient=()):
+        self.stages = order_stages(stages)
+        self.transient = tuple(transient)
+        self.consumers = {name: [stage.name for stage in self.stages if name in stage.inputs] for name in self.transient}
+        self.epoch = 0
+        self.artifacts = {}  # symbol -> {artifact: (version, value)}
+        self.memo = {}  # (symbol, stage) -> input key of the last successful run
+        self.failed = {}  # symbol -> (stage, error message)
+        self.last_report = None
+
+    def _input_key(self, symbol, stage):
+        if not stage.inputs:
+            return ('epoch', self.epoch)
+        held = self.artifacts[symbol]
+        return tuple(held[name][0] for name in stage.inputs)
+
+    def run(self, symbols, refresh=True, on_result=None, on_symbol=None, groups=None):
+        """Run every stage for symbols and report per-stage runtime and failures.
+
+        groups(symbols), if given, splits the symbols into batches that each
+        go through every stage before the next batch starts, bounding how
+        many symbols' artifacts are held at once. on_result(stage, symbol, ok)
+        is called as each symbol finishes a stage that ran, and
+        on_symbol(symbol, ok) once a symbol's batch is done. Returns
+        {'stages': {stage: {seconds, ran, memoized, failed}},
+        'failed': {symbol: (stage, error)}, 'symbols': count}.
+        """
+        if refresh:
+            self.epoch += 1
+        symbols = list(dict.fromkeys(symbols))
+        for symbol in symbols:
+            self.failed.pop(symbol, None)
+            self.artifacts.setdefault(symbol, {})
+
+        seconds = {stage.name: 0.0 for stage in self.stages}
+        outcomes = {}  # (symbol, stage) -> 'ran', 'memoized' or 'failed'; work in a second pass overrides a memo hit
+        for group in (groups(symbols) if groups else [symbols]):
+            group = list(group)
+            rewound = self._run_pass(group, seconds, outcomes, on_result)
+            if rewound:
+                # A stage had to re-run but an input it needs was released: rebuild those
+                # inputs (their producers lose their memo) in a second pass
+                self._run_pass(rewound, seconds, outcomes, on_result)
+
+            for symbol in group:
+                if symbol not in self.failed:
+                    held = self.artifacts[symbol]
+                    for name in self.transient:
+                        if name in held:
+                            held[name] = (held[name][0], None)
+                if on_symbol:
+                    on_symbol(symbol, symbol not in self.failed)
+
+        report = {name: {'seconds': value, 'ran': 0, 'memoized': 0, 'failed': 0} for name, value in seconds.items()}
+        for (_, name), outcome in outcomes.items():
+            report[name][outcome] += 1
+
+        for name, stats in report.items():
+            metrics.inc('pipeline_stage_memoized_total', stats['memoized'], stage=name)
+            metrics.inc('pipeline_stage_failures_total', stats['failed'], stage=name)
+        self.last_report = {
+            'stages': report,
+            'failed': {symbol: self.failed[symbol] for symbol in symbols if symbol in self.failed},
+            'symbols': len(symbols)
+        }
+        return self.last_report
+
+    def _run_pass(self, symbols, seconds, outcomes, on_result):
+        """Run the stages once over symbols; returns symbols that need another pass"""
+        active, rewound = list(symbols), []
+        for stage in self.stages:
+            due, keys = {}, {}
+            for symbol in active:
+                key = self._input_key(symbol, stage)
+                held = self.artifacts[symbol]
+                if (self.memo.get((symbol, stage.name)) == key and all(name in held for name in stage.outputs)
+                        and (stage.valid is None or stage.valid(symbol, {name: held[name][1] for name in stage.outputs}))):
+                    outcomes.setdefault((symbol, stage.name), 'memoized')
+                    continue
+                if any(held[name][1] is None and name in self.transient for name in stage.inputs):
+                    self._rewind(symbol)
+                    rewound.append(symbol)
+                    continue
+                keys[symbol] = key
+                due[symbol] = {name: held[name][1] for name in stage.inputs}
+
+            start = time.perf_counter()
+            results = {}
+            if due:
+                with metrics.timed('pipeline_stage_seconds', stage=stage.name):
+                    try:
+                        results = stage.run(due)
+                    except Exception as e:
+                        results = {symbol: e for symbol in due}
+
+            for symbol in due:
+                outputs = results.get(symbol, LookupError(f"{stage.name} returned no result"))
+                if not isinstance(outputs, Exception) and set(stage.outputs) - set(outputs):
+                    outputs = LookupError(f"{stage.name} did not produce {', '.join(set(stage.outputs) - set(outputs))}")
+                if isinstance(outputs, Exception):
+                    self.failed[symbol] = (stage.name, str(outputs) or type(outputs).__name__)
+                    outcomes[(symbol, stage.name)] = 'failed'
+                else:
+                    held = self.artifacts[symbol]
+                    for name in stage.outputs:
+                        held[name] = (artifact_version(outputs[name]), outputs[name])
+                    self.memo[(symbol, stage.name)] = keys[symbol]
+                    outcomes[(symbol, stage.name)] = 'ran'
+                if on_result:
+                    on_result(stage.name, symbol, not isinstance(outputs, Exception))
+
+            seconds[stage.name] += time.perf_counter() - start
+            active = [symbol for symbol in active if symbol not in self.failed and symbol not in rewound]
+            for symbol in active:
+                self._release_consumed(symbol, stage, outcomes)
+        return rewound
+
+    def _release_consumed(self, symbol, stage, outcomes):
+        """Release the transient inputs of stage that no remaining stage still reads"""
+        held = self.artifacts[symbol]
+        for name in stage.inputs:
+            if name in self.transient and all(
+                    outcomes.get((symbol, consumer)) in ('ran', 'memoized') for consumer in self.consumers[name]):
+                held[name] = (held[name][0], None)
+
+    def _rewind(self, symbol):
+        """Drop the memo of stages whose released outputs are needed again"""
+        held = self.artifacts[symbol]
+        for stage in self.stages:
+            if any(name in self.transient and held.get(name, (None, None))[1] is None for name in stage.outputs):
+                self.memo.pop((symbol, stage.name), None)
+
+    def retry(self, on_result=None, on_symbol=None, groups=None):
+        """Re-run failed symbols from the stage that failed (earlier stages are memo hits)"""
+        return self.run(list(self.failed), refresh=False, on_result=on_result, on_symbol=on_symbol, groups=groups)
+
+    def forget(self, symbol):
+        """Drop a symbol's artifacts and memo so its next run executes every stage"""
+        self.artifacts.pop(symbol, None)
+        self.failed.pop(symbol, None)
+        for stage in self.stages:
+            self.memo.pop((symbol, stage.name), None)
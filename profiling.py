@@ -0,0 +1,67 @@
+import os
+import pstats
+import cProfile
+import threading
+import functools
+from collections import deque
+from datetime import datetime
+from config import PROFILE_ENABLED, PROFILE_FOLDER
+
+_local = threading.local()
+
+# Most recent profiles in this process: dicts with name, path, timestamp and top functions
+recent_profiles = deque(maxlen=20)
+
+def set_profiling(enabled):
+    """Turn profiling on or off for the current thread (one Streamlit script run)"""
+    _local.enabled = enabled
+
+def profiling_enabled():
+    """Check the env switch and the current thread's toggle"""
+    return PROFILE_ENABLED or getattr(_local, 'enabled', False)
+
+def top_functions(stats, limit=15):
+    """Get the hottest functions by cumulative time from a pstats.Stats"""
+    rows = []
+    for (filename, line, function), (_, ncalls, tottime, cumtime, _) in stats.stats.items():
+        rows.append({
+            'function': f"{os.path.basename(filename)}:{line}({function})",
+            'calls': ncalls,
+            'tottime': tottime,
+            'cumtime': cumtime
+        })
+    rows.sort(key=lambda row: row['cumtime'], reverse=True)
+    return rows[:limit]
+
+def _run_profiled(name, func, args, kwargs):
+    profiler = cProfile.Profile()
+    _local.active = True
+    try:
+        return profiler.runcall(func, *args, **kwargs)
+    finally:
+        _local.active = False
+        timestamp = datetime.now()
+        os.makedirs(PROFILE_FOLDER, exist_ok=True)
+        path = os.path.join(PROFILE_FOLDER, f"{name}-{timestamp.strftime('%Y%m%d-%H%M%S-%f')}.prof")
+        profiler.dump_stats(path)
+        recent_profiles.appendleft({
+            'name': name,
+            'path': path,
+            'timestamp': timestamp,
+            'top': top_functions(pstats.Stats(profiler))
+        })
+
+def profiled(name):
+    """Decorator: profile calls with cProfile when profiling is enabled.
+
+    When disabled the wrapper is a single flag check before calling through.
+    Nested profiled calls are folded into the outermost profile.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not profiling_enabled() or getattr(_local, 'active', False):
+                return func(*args, **kwargs)
+            return _run_profiled(name, func, args, kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,305 @@
+"""Static per-symbol chart reports: the dashboard chart and summary cards for the universe.
+
+    python reports.py                                   # every stored symbol, HTML
+    python reports.py --signals-only                    # screener: symbols with active signals
+    python reports.py --sector "Information Technology" --format png
+    python reports.py --symbols INFY.NS TCS.NS --full
+
+Symbols are rendered in parallel on the compute pool, and a symbol whose
+stored data is unchanged since its last report is not rendered again.
+PNG output needs the optional kaleido package; without it reports fall
+back to HTML.
+"""
+import os
+import json
+import html
+import importlib.util
+from functools import partial
+from datetime import datetime
+from config import REPORT_FOLDER, REPORT_FORMAT, CHART_MAX_POINTS
+from charts import build_stock_chart, apply_dashboard_theme
+from utils import load_stock_data, get_data_version, get_stored_symbols, get_shard, get_file_path, format_number, atomic_write
+from metrics import metrics
+
+MANIFEST_NAME = "manifest.json"
+PLOTLY_JS_NAME = "plotly.min.js"
+
+REPORT_CSS = """
+body { font-family: Arial, sans-serif; margin: 2rem; color: #343a40; }
+.cards { display: grid; grid-template-columns: repeat(4, 1fr); gap: 1rem; margin-bottom: 1.5rem; }
+.metric-card { padding: 1.5rem; border-radius: 12px; box-shadow: 0 4px 15px rgba(0,0,0,0.1); border-left: 4px solid #1f77b4; }
+.metric-card h3 { margin: 0 0 0.5rem; font-size: 1.1rem; }
+.metric-value { font-size: 2rem; font-weight: 700; color: #1f77b4; }
+.metric-delta.positive { color: #2ca02c; }
+.metric-delta.negative { color: #d62728; }
+.status-badge { padding: 0.35rem 0.8rem; border-radius: 20px; font-size: 0.8rem; font-weight: 600; }
+.status-badge.success { background: #d4edda; color: #155724; }
+.status-badge.danger { background: #f8d7da; color: #721c24; }
+.status-badge.info { background: #d1ecf1; color: #0c5460; }
+table { border-collapse: collapse; } th, td { padding: 0.4rem 0.8rem; border-bottom: 1px solid #e9ecef; text-align: right; }
+th:first-child, td:first-child { text-align: left; }
+"""
+
+def build_summary_cards(symbol, df):
+    """Build the HTML for the four stock summary metric cards"""
+    latest = df.iloc[-1]
+    previous = df.iloc[-2] if len(df) > 1 else latest
+    
+    # Price metrics
+    price_change = latest['Close'] - previous['Close']
+    price_change_pct = (price_change / previous['Close']) * 100 if previous['Close'] != 0 else 0
+    
+    cards = []
+    
+    # Price card
+    delta_class = "positive" if price_change >= 0 else "negative"
+    delta_icon = "📈" if price_change >= 0 else "📉"
+    cards.append(f"""
+    <div class="metric-card">
+        <h3>{symbol.replace('.NS', '')} Price</h3>
+        <div class="metric-value">₹{latest['Close']:.2f}</div>
+        <div class="metric-delta {delta_class}">
+            {delta_icon} {price_change:+.2f} ({price_change_pct:+.2f}%)
+        </div>
+    </div>
+    """)
+    
+    # Volume card
+    volume_ratio = latest.get('Volume_Ratio', 1)
+    volume_icon = "🔊" if volume_ratio > 1.5 else "🔉"
+    cards.append(f"""
+    <div class="metric-card">
+        <h3>Volume</h3>
+        <div class="metric-value">{format_number(latest['Volume'])}</div>
+        <div class="metric-delta">
+            {volume_icon} {volume_ratio:.2f}x average
+        </div>
+    </div>
+    """)
+    
+    # RSI card
+    rsi_value = latest.get('RSI', 50)
+    if rsi_value > 70:
+        rsi_status = "Overbought"
+        rsi_class = "danger"
+        rsi_icon = "⚠️"
+    elif rsi_value < 30:
+        rsi_status = "Oversold" 
+        rsi_class = "success"
+        rsi_icon = "✅"
+    else:
+        rsi_status = "Neutral"
+        rsi_class = "info"
+        rsi_icon = "ℹ️"
+    
+    cards.append(f"""
+    <div class="metric-card">
+        <h3>RSI</h3>
+        <div class="metric-value">{rsi_value:.1f}</div>
+        <div class="metric-delta">
+            <span class="status-badge {rsi_class}">{rsi_icon} {rsi_status}</span>
+        </div>
+    </div>
+    """)
+    
+    # MFI card
+    mfi_value = latest.get('MFI', 50)
+    if mfi_value > 80:
+        mfi_status = "Overbought"
+        mfi_class = "danger"
+        mfi_icon = "⚠️"
+    elif mfi_value < 20:
+        mfi_status = "Oversold"
+        mfi_class = "success"
+        mfi_icon = "✅"
+    else:
+        mfi_status = "Neutral"
+        mfi_class = "info"
+        mfi_icon = "ℹ️"
+        
+    cards.append(f"""
+    <div class="metric-card">
+        <h3>MFI</h3>
+        <div class="metric-value">{mfi_value:.1f}</div>
+        <div class="metric-delta">
+            <span class="status-badge {mfi_class}">{mfi_icon} {mfi_status}</span>
+        </div>
+    </div>
+    """)
+    
+    return cards
+
+def summary_metrics(df):
+    """Latest values shown in the report index"""
+    latest = df.iloc[-1]
+    previous = df.iloc[-2] if len(df) > 1 else latest
+    change_pct = (latest['Close'] / previous['Close'] - 1) * 100 if previous['Close'] != 0 else 0.0
+    metrics_row = {'timestamp': str(df.index[-1]), 'Close': float(latest['Close']), 'Change_Pct': float(change_pct)}
+    for column in ('Volume_Ratio', 'RSI', 'MFI'):
+        metrics_row[column] = float(latest[column]) if column in df.columns else None
+    return metrics_row
+
+def get_report_path(folder, symbol, fmt):
+    return os.path.join(folder, get_shard(symbol), f"{symbol.replace('.NS', '')}.{fmt}")
+
+def _render_symbol(symbol, folder, fmt):
+    df = load_stock_data(symbol)
+    if df.empty:
+        return None
+    chart = build_stock_chart(symbol, df, CHART_MAX_POINTS)
+    if chart is None:
+        return None
+    apply_dashboard_theme(chart)
+
+    path = get_report_path(folder, symbol, fmt)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if fmt == 'png':
+        chart.write_image(path, width=1400, height=1000)
+    else:
+        page = f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{html.escape(symbol)}</title>
+<script src="../{PLOTLY_JS_NAME}"></script><style>{REPORT_CSS}</style></head>
+<body><div class="cards">{"".join(build_summary_cards(symbol, df))}</div>
+{chart.to_html(full_html=False, include_plotlyjs=False)}
+</body></html>"""
+        atomic_write(path, lambda f: f.write(page.encode()), mode='wb')
+    return summary_metrics(df)
+
+def _render_block(symbols, folder, fmt):
+    """Worker: render reports for symbols; returns {symbol: metrics, or {'error': message}}"""
+    results = {}
+    for symbol in symbols:
+        try:
+            results[symbol] = _render_symbol(symbol, folder, fmt)
+        except Exception as e:
+            results[symbol] = {'error': str(e)}
+    return results
+
+def resolve_format(fmt):
+    """Get the output format to use, falling back to HTML when PNG export is unavailable"""
+    if fmt == 'png' and importlib.util.find_spec('kaleido') is None:
+        print("PNG export needs the kaleido package; writing HTML reports instead")
+        return 'html'
+    return fmt
+
+def load_report_manifest(folder=REPORT_FOLDER):
+    try:
+        with open(os.path.join(folder, MANIFEST_NAME)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'symbols': {}}
+
+def _write_index(folder, entries):
+    """Write index.html listing every manifest entry whose report file exists"""
+    entries = {
+        symbol: entry for symbol, entry in entries.items()
+        if os.path.exists(get_report_path(folder, symbol, entry['format']))
+    }
+    rows = []
+    for symbol, entry in sorted(entries.items()):
+        values = entry['metrics']
+        link = os.path.relpath(get_report_path(folder, symbol, entry['format']), folder)
+
+        def cell(column, pattern):
+            return pattern.format(values[column]) if values.get(column) is not None else "-"
+
+        rows.append(
+            f"<tr><td><a href=\"{html.escape(link)}\">{html.escape(symbol.replace('.NS', ''))}</a></td>"
+            f"<td>{cell('Close', '{:.2f}')}</td><td>{cell('Change_Pct', '{:+.2f}')}</td>"
+            f"<td>{cell('Volume_Ratio', '{:.2f}x')}</td><td>{cell('RSI', '{:.1f}')}</td>"
+            f"<td>{cell('MFI', '{:.1f}')}</td><td>{html.escape(values['timestamp'])}</td></tr>"
+        )
+    page = f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Stock reports</title><style>{REPORT_CSS}</style></head>
+<body><h2>Stock reports</h2><p>{len(entries)} symbols · generated {datetime.now():%Y-%m-%d %H:%M}</p>
+<table><tr><th>Stock</th><th>Price</th><th>Change %</th><th>Volume Ratio</th><th>RSI</th><th>MFI</th><th>Bar</th></tr>
+{"".join(rows)}
+</table></body></html>"""
+    atomic_write(os.path.join(folder, "index.html"), lambda f: f.write(page.encode()), mode='wb')
+
+def generate_reports(symbols=None, folder=REPORT_FOLDER, fmt=REPORT_FORMAT, full=False):
+    """Render reports for symbols (default every stored symbol) and write an index page.
+
+    Symbols whose data version matches their last report are reused unless
+    full is set. Returns {'rendered', 'reused', 'failed' (symbol -> error), 'format', 'index'}.
+    """
+    from compute_pool import get_compute_pool
+
+    fmt = resolve_format(fmt)
+    symbols = list(dict.fromkeys(symbols if symbols is not None else get_stored_symbols()))
+    manifest = load_report_manifest(folder)
+    os.makedirs(folder, exist_ok=True)
+
+    entries, stale = {}, []
+    versions = {symbol: get_data_version(symbol) for symbol in symbols}
+    for symbol, version in versions.items():
+        if version is None:
+            continue
+        previous = manifest['symbols'].get(symbol)
+        if (not full and previous and previous['version'] == list(version) and previous['format'] == fmt
+                and os.path.exists(get_report_path(folder, symbol, fmt))):
+            entries[symbol] = previous
+        else:
+            stale.append(symbol)
+
+    if fmt == 'html' and not os.path.exists(os.path.join(folder, PLOTLY_JS_NAME)):
+        from plotly.offline import get_plotlyjs
+        atomic_write(os.path.join(folder, PLOTLY_JS_NAME), lambda f: f.write(get_plotlyjs().encode()), mode='wb')
+
+    failed, rendered_count = {}, 0
+    with metrics.timed('report_seconds'):
+        rendered = get_compute_pool().map_blocks(
+            partial(_render_block, folder=folder, fmt=fmt), stale, weight=lambda symbol: os.path.getsize(get_file_path(symbol)), job='report'
+        )
+    for symbol, result in rendered.items():
+        if result is None:  # no data to chart
+            continue
+        if 'error' in result:
+            failed[symbol] = result['error']
+            continue
+        entries[symbol] = {'version': list(versions[symbol]), 'format': fmt, 'metrics': result}
+        rendered_count += 1
+
+    # Keep entries for symbols outside this run so a screener subset doesn't drop them from the
+    # manifest or the index
+    manifest['symbols'].update(entries)
+    atomic_write(os.path.join(folder, MANIFEST_NAME), lambda f: json.dump(manifest, f))
+    _write_index(folder, manifest['symbols'])
+
+    metrics.set_gauge('report_symbols_rendered', rendered_count)
+    return {
+        'rendered': rendered_count,
+        'reused': len(entries) - rendered_count,
+        'failed': failed,
+        'format': fmt,
+        'index': os.path.join(folder, "index.html")
+    }
+
+def select_symbols(sector=None, signals_only=False):
+    """Pick symbols like the Market Overview screener: by sector and/or active signals"""
+    from universe import get_universe
+    symbols = get_universe().symbols(sector=sector) if sector else get_universe().symbols()
+    if signals_only:
+        from snapshot import load_snapshot
+        snapshot = load_snapshot(symbols)
+        symbols = list(snapshot.index[snapshot['signals'].fillna('') != ''])
+    return symbols
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--symbols", nargs="+", help="symbols to report (default: every stored symbol)")
+    parser.add_argument("--sector", help="only symbols in this sector")
+    parser.add_argument("--signals-only", action="store_true", help="only symbols with active signals")
+    parser.add_argument("--format", choices=["html", "png"], default=REPORT_FORMAT)
+    parser.add_argument("--output", default=REPORT_FOLDER)
+    parser.add_argument("--full", action="store_true", help="re-render symbols whose data is unchanged")
+    args = parser.parse_args()
+
+    symbols = args.symbols
+    if symbols is None and (args.sector or args.signals_only):
+        symbols = select_symbols(args.sector, args.signals_only)
+    result = generate_reports(symbols, args.output, args.format, args.full)
+    print(f"{result['rendered']} rendered, {result['reused']} reused, {len(result['failed'])} failed -> {result['index']}")
+    for symbol, error in result['failed'].items():
+        print(f"  {symbol}: {error}")
@@ -0,0 +1,154 @@
+import os
+import glob
+import pandas as pd
+from datetime import datetime, timedelta
+from config import HOT_RETENTION_DAYS, COLD_FOLDER
+from utils import get_file_path, get_shard, get_stored_symbols, file_lock, atomic_write, load_stock_data
+from snapshot import remove_from_snapshot
+from change_feed import get_change_feed
+from metrics import metrics
+
+def get_cold_folder(symbol):
+    """Get the folder holding a symbol's compressed cold partitions"""
+    return os.path.join(COLD_FOLDER, get_shard(symbol), symbol.replace('.NS', ''))
+
+def get_partition_path(symbol, period):
+    """Get the cold partition path for one month (period like '2025-01')"""
+    return os.path.join(get_cold_folder(symbol), f"{period}.csv.gz")
+
+def _read_partition(path):
+    return pd.read_csv(path, index_col=0, parse_dates=True, compression='gzip')
+
+def _write_partition(path, df):
+    atomic_write(path, lambda f: df.to_csv(f, compression='gzip'), mode='wb')
+
+def archive_rows(symbol, df):
+    """Merge old rows into monthly cold partitions, one gzip file per month.
+
+    Rows archived by earlier runs are merged into the same partition, so
+    repeated compactions never leave a trail of small segments.
+    """
+    if df.empty:
+        return 0
+
+    index = pd.DatetimeIndex(df.index)
+    if index.tz is not None:
+        index = index.tz_convert(None)
+    written = 0
+    for period, rows in df.groupby(index.to_period('M')):
+        path = get_partition_path(symbol, str(period))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Saves and background compaction can both merge into the same month
+        with file_lock(path):
+            if os.path.exists(path):
+                rows = pd.concat([_read_partition(path), rows])
+                rows = rows[~rows.index.duplicated(keep='last')].sort_index()
+            _write_partition(path, rows)
+            written += os.path.getsize(path)
+    return written
+
+def _as_index_time(timestamp, index):
+    """Align a timestamp's timezone with a DatetimeIndex for comparisons"""
+    timestamp = pd.Timestamp(timestamp)
+    if index.tz is not None and timestamp.tz is None:
+        return timestamp.tz_localize(index.tz)
+    if index.tz is None and timestamp.tz is not None:
+        return timestamp.tz_convert(None)
+    return timestamp
+
+def archive_dropped_rows(symbol, new_df, chunk_rows=1000):
+    """Archive stored rows older than new_df's first bar before a re-download replaces the file.
+
+    Call it under the symbol's file lock. Only the leading chunks of the hot
+    file that reach back before new_df are parsed, not the whole file.
+    """
+    file_path = get_file_path(symbol)
+    if new_df.empty or not os.path.exists(file_path):
+        return 0
+
+    dropped = []
+    for chunk in pd.read_csv(file_path, index_col=0, parse_dates=True, chunksize=chunk_rows):
+        if chunk.empty:
+            break
+        cutoff = _as_index_time(new_df.index[0], pd.DatetimeIndex(chunk.index))
+        dropped.append(chunk[chunk.index < cutoff])
+        if chunk.index[-1] >= cutoff:
+            break
+    dropped = pd.concat(dropped) if dropped else pd.DataFrame()
+    if not dropped.empty:
+        metrics.inc('retention_bytes_archived_total', archive_rows(symbol, dropped))
+    return len(dropped)
+
+def compact_symbol(symbol, retention_days=HOT_RETENTION_DAYS, archive=True):
+    """Trim a symbol's hot file to the retention window, archiving older rows.
+
+    Writers take the file lock; readers are never blocked because the trimmed
+    file replaces the old one atomically. Returns the number of rows moved.
+    """
+    file_path = get_file_path(symbol)
+    if not os.path.exists(file_path):
+        return 0
+
+    with file_lock(file_path):
+        df = load_stock_data(symbol)
+        if df.empty:
+            return 0
+
+        cutoff = _as_index_time(datetime.now() - timedelta(days=retention_days), df.index)
+        old = df[df.index < cutoff]
+        if old.empty:
+            return 0
+
+        if archive:
+            metrics.inc('retention_bytes_archived_total', archive_rows(symbol, old))
+        hot = df[df.index >= cutoff]
+        if hot.empty:
+            os.remove(file_path)
+            remove_from_snapshot(symbol)
+        else:
+            atomic_write(file_path, hot.to_csv)
+
+    get_change_feed().publish(symbol, 'update' if not hot.empty else 'removed')
+    metrics.inc('retention_rows_moved_total', len(old))
+    return len(old)
+
+def run_retention(symbols=None, retention_days=HOT_RETENTION_DAYS, archive=True):
+    """Compact every stored symbol (or the given ones).
+
+    Returns {'moved': {symbol: rows moved}, 'failed': {symbol: error message}}.
+    """
+    if symbols is None:
+        symbols = get_stored_symbols()
+
+    moved, failed = {}, {}
+    with metrics.timed('retention_seconds'):
+        for symbol in symbols:
+            try:
+                rows = compact_symbol(symbol, retention_days, archive)
+                if rows:
+                    moved[symbol] = rows
+            except Exception as e:
+                failed[symbol] = str(e) or type(e).__name__
+                metrics.inc('retention_failures_total')
+    return {'moved': moved, 'failed': failed}
+
+def load_full_history(symbol, start=None):
+    """Load cold partitions (from start onward) followed by the hot file"""
+    frames = []
+    for path in sorted(glob.glob(os.path.join(get_cold_folder(symbol), "*.csv.gz"))):
+        period = os.path.basename(path).split('.')[0]
+        if start is not None and pd.Period(period, 'M').end_time < _as_index_time(start, pd.DatetimeIndex([])):
+            continue
+        frames.append(_read_partition(path))
+
+    hot = load_stock_data(symbol)
+    if not hot.empty:
+        frames.append(hot)
+    if not frames:
+        return pd.DataFrame()
+
+    df = pd.concat(frames)
+    df = df[~df.index.duplicated(keep='last')].sort_index()
+    if start is not None:
+        df = df[df.index >= _as_index_time(start, df.index)]
+    return df
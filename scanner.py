@@ -0,0 +1,77 @@
+import threading
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from config import SCAN_SHARD_WORKERS
+from change_feed import get_change_feed
+from metrics import metrics
+from indicators import get_latest_signals
+from utils import load_stock_data
+from universe import partition_by_shard
+from compute_pool import get_compute_pool
+
+class SignalScanner:
+    """Keeps per-symbol scan results and recomputes only symbols the change feed reports as updated"""
+
+    def __init__(self, feed=None):
+        self.feed = feed or get_change_feed()
+        self.results = {}  # symbol -> get_latest_signals() result, or None if no data
+        self.cursor = None
+        self.last_rescanned = 0
+        self.last_scan_time = None
+        self._lock = threading.Lock()
+
+    def _scan_symbol(self, symbol):
+        df = load_stock_data(symbol)
+        self.results[symbol] = get_latest_signals(symbol, df) if not df.empty else None
+
+    def _scan_shard(self, symbols):
+        for symbol in symbols:
+            self._scan_symbol(symbol)
+
+    def scan(self, symbols):
+        """Get signal results for symbols that currently have active signals"""
+        with self._lock, metrics.timed('scan_seconds'):
+            if self.cursor is None:
+                # First scan: take the cursor before reading so no update is missed
+                self.cursor = self.feed.latest_seq()
+                stale = set(symbols)
+            else:
+                changed, self.cursor = self.feed.changed_symbols(self.cursor)
+                if changed is None:
+                    stale = set(symbols)  # fell behind the feed's retention, resync
+                else:
+                    stale = changed | (set(symbols) - self.results.keys())
+
+            stale_symbols = [symbol for symbol in dict.fromkeys(symbols) if symbol in stale]
+            shards = partition_by_shard(stale_symbols)
+            compute_pool = get_compute_pool()
+            if compute_pool.should_offload(len(stale_symbols)):
+                # Large rescans (e.g. a full resync) go to worker processes
+                self.results.update(compute_pool.scan(stale_symbols))
+            elif SCAN_SHARD_WORKERS > 1 and len(shards) > 1:
+                # Each thread scans one shard at a time, so the working set stays per-shard
+                with ThreadPoolExecutor(max_workers=SCAN_SHARD_WORKERS) as pool:
+                    list(pool.map(self._scan_shard, shards.values()))
+            else:
+                for shard_symbols in shards.values():
+                    self._scan_shard(shard_symbols)
+
+            self.last_rescanned = len(stale & set(symbols))
+            metrics.set_gauge('scan_symbols_rescanned', self.last_rescanned)
+            self.last_scan_time = pd.Timestamp.now()
+
+            return [
+                self.results[symbol] for symbol in dict.fromkeys(symbols)
+                if self.results.get(symbol) and self.results[symbol]['signals']
+            ]
+
+_scanner = None
+_scanner_lock = threading.Lock()
+
+def get_scanner():
+    """Get the process-wide incremental scanner"""
+    global _scanner
+    with _scanner_lock:
+        if _scanner is None:
+            _scanner = SignalScanner()
+        return _scanner
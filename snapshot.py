@@ -0,0 +1,84 @@
+import os
+import sqlite3
+from contextlib import closing
+import pandas as pd
+from config import SNAPSHOT_DB_PATH
+from indicators import detect_bar_signals
+
+# Latest-bar columns kept per symbol for cross-sectional views
+SNAPSHOT_COLUMNS = [
+    'Open', 'High', 'Low', 'Close', 'Volume', 'Change_Pct',
+    'MACD', 'MACD_Signal', 'MACD_Histogram', 'RSI', 'MFI', 'Volume_Ratio'
+]
+
+def _connect():
+    """Open the snapshot database, creating the table on first use"""
+    os.makedirs(os.path.dirname(SNAPSHOT_DB_PATH), exist_ok=True)
+    conn = sqlite3.connect(SNAPSHOT_DB_PATH, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    columns = ", ".join(f'"{column}" REAL' for column in SNAPSHOT_COLUMNS)
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS latest (
+            symbol TEXT PRIMARY KEY,
+            timestamp TEXT,
+            {columns},
+            signals TEXT,
+            updated REAL
+        )
+    """)
+    return conn
+
+def snapshot_row(symbol, df):
+    """Build the snapshot row for a symbol from its latest two bars"""
+    latest = df.iloc[-1]
+    previous_close = df['Close'].iloc[-2] if len(df) > 1 else latest['Close']
+    values = {column: latest.get(column) for column in SNAPSHOT_COLUMNS}
+    values['Change_Pct'] = (latest['Close'] - previous_close) / previous_close * 100 if previous_close else 0.0
+
+    try:
+        signals = ", ".join(signal['type'] for signal in detect_bar_signals(latest))
+    except KeyError:
+        signals = ""  # indicators not calculated
+
+    return [symbol, str(df.index[-1])] + [
+        None if pd.isna(values[column]) else float(values[column]) for column in SNAPSHOT_COLUMNS
+    ] + [signals, pd.Timestamp.now().timestamp()]
+
+def update_snapshot(symbol, df):
+    """Upsert the latest values for one symbol"""
+    if df.empty:
+        return
+    row = snapshot_row(symbol, df)
+    placeholders = ", ".join("?" * len(row))
+    with closing(_connect()) as conn, conn:
+        conn.execute(f"INSERT OR REPLACE INTO latest VALUES ({placeholders})", row)
+
+def remove_from_snapshot(symbol):
+    """Drop a symbol from the snapshot"""
+    with closing(_connect()) as conn, conn:
+        conn.execute("DELETE FROM latest WHERE symbol = ?", (symbol,))
+
+def snapshot_version():
+    """Cheap token that changes whenever a snapshot row is written or removed"""
+    with closing(_connect()) as conn:
+        count, updated = conn.execute("SELECT COUNT(*), MAX(updated) FROM latest").fetchone()
+    return f"{count}-{updated or 0:.6f}"
+
+def load_snapshot(symbols=None):
+    """Load the latest values for every symbol in one read, indexed by symbol"""
+    with closing(_connect()) as conn:
+        snapshot = pd.read_sql_query("SELECT * FROM latest", conn, index_col='symbol')
+    if symbols is not None:
+        snapshot = snapshot[snapshot.index.isin(symbols)]
+    return snapshot
+
+def rebuild_snapshot(symbols):
+    """Backfill the snapshot from stored history files"""
+    from utils import load_stock_data
+    rebuilt = 0
+    for symbol in symbols:
+        df = load_stock_data(symbol)
+        if not df.empty:
+            update_snapshot(symbol, df)
+            rebuilt += 1
+    return rebuilt
@@ -0,0 +1,58 @@
+"""Storage layout and file primitives shared by the app, CLI tools and the API server.
+
+Kept free of Streamlit so standalone services can import it.
+"""
+import os
+import zlib
+import tempfile
+from contextlib import contextmanager
+from config import STORAGE_SHARDS
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to process-local writes only
+    fcntl = None
+
+def get_shard(symbol):
+    """Get a symbol's storage shard from a stable hash of its name"""
+    return f"{zlib.crc32(symbol.replace('.NS', '').encode()) % STORAGE_SHARDS:02x}"
+
+def get_file_path(symbol, data_type="historical"):
+    """Get file path for stock data"""
+    return f"stock_data/{data_type}/{get_shard(symbol)}/{symbol.replace('.NS', '')}.csv"
+
+@contextmanager
+def file_lock(file_path):
+    """Hold an exclusive advisory lock for writers of file_path"""
+    lock_file = open(f"{file_path}.lock", 'a')
+    try:
+        if fcntl:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        yield
+    finally:
+        if fcntl:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+        lock_file.close()
+
+def atomic_write(file_path, write_func, mode='w'):
+    """Write via a temp file in the same folder, then atomically rename it into place"""
+    folder = os.path.dirname(file_path) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=folder, prefix=".tmp-", suffix=os.path.basename(file_path))
+    try:
+        with os.fdopen(fd, mode) as f:
+            write_func(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, file_path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def get_data_version(symbol):
+    """Get a cheap version token for a symbol's stored data (None if missing)"""
+    try:
+        stat = os.stat(get_file_path(symbol))
+        return (stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        return None
@@ -0,0 +1,124 @@
+import os
+import sqlite3
+import threading
+from collections import defaultdict
+from config import ALERT_DB_PATH
+
+ALL_SIGNALS = '*'
+
+class SubscriptionRegistry:
+    """Per-user watchlists with an inverted (symbol, signal type) -> subscribers index.
+
+    Subscriptions persist in SQLite; the in-memory index is rebuilt only when
+    the subscriptions' version row moves, so routing a scan costs one dict
+    lookup per (symbol, signal) event. The database file is shared with the
+    alert log, so PRAGMA data_version would change on every recorded alert.
+    """
+
+    def __init__(self, db_path=ALERT_DB_PATH):
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        with self._lock, self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS subscriptions (
+                    email TEXT NOT NULL,
+                    symbol TEXT NOT NULL,
+                    signal_type TEXT NOT NULL,
+                    PRIMARY KEY (email, symbol, signal_type)
+                )
+            """)
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS subscriptions_version (
+                    id INTEGER PRIMARY KEY CHECK (id = 0),
+                    version INTEGER NOT NULL
+                )
+            """)
+            self.conn.execute("INSERT OR IGNORE INTO subscriptions_version (id, version) VALUES (0, 0)")
+        self.index = {}
+        self._version = None
+        self._refresh_index()
+
+    def _refresh_index(self):
+        """Rebuild the inverted index if the subscriptions changed since the last build"""
+        with self._lock:
+            version = self.conn.execute("SELECT version FROM subscriptions_version").fetchone()[0]
+            if version == self._version:
+                return
+            index = defaultdict(set)
+            for email, symbol, signal_type in self.conn.execute(
+                "SELECT email, symbol, signal_type FROM subscriptions"
+            ):
+                index[(symbol, signal_type)].add(email)
+            self.index = dict(index)
+            self._version = version
+
+    def _bump_version(self):
+        """Mark the subscriptions changed (call inside the writing transaction)"""
+        self.conn.execute("UPDATE subscriptions_version SET version = version + 1")
+
+    def subscribe(self, email, symbols, signal_types=None):
+        """Subscribe email to symbols, for the given signal types or all of them"""
+        signal_types = signal_types or [ALL_SIGNALS]
+        rows = [(email, symbol, signal_type) for symbol in symbols for signal_type in signal_types]
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO subscriptions (email, symbol, signal_type) VALUES (?, ?, ?)",
+                rows
+            )
+            self._bump_version()
+        self._refresh_index()
+
+    def unsubscribe(self, email, symbols=None):
+        """Remove email's subscriptions for symbols, or all of them"""
+        with self._lock, self.conn:
+            if symbols is None:
+                self.conn.execute("DELETE FROM subscriptions WHERE email = ?", (email,))
+            else:
+                self.conn.executemany(
+                    "DELETE FROM subscriptions WHERE email = ? AND symbol = ?",
+                    [(email, symbol) for symbol in symbols]
+                )
+            self._bump_version()
+        self._refresh_index()
+
+    def get_subscriptions(self, email):
+        """Get {symbol: [signal types]} for one subscriber"""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT symbol, signal_type FROM subscriptions WHERE email = ? ORDER BY symbol",
+                (email,)
+            ).fetchall()
+        subscriptions = defaultdict(list)
+        for symbol, signal_type in rows:
+            subscriptions[symbol].append(signal_type)
+        return dict(subscriptions)
+
+    def subscriber_count(self):
+        """Get number of distinct subscribers"""
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(DISTINCT email) FROM subscriptions").fetchone()[0]
+
+    def route(self, events):
+        """Group signal events by subscriber.
+
+        events is an iterable of (symbol, signals, latest) tuples; returns
+        {email: [(symbol, matching signals, latest), ...]}.
+        """
+        self._refresh_index()
+        index = self.index
+        routed = defaultdict(list)
+
+        for symbol, signals, latest in events:
+            matches = defaultdict(list)
+            for email in index.get((symbol, ALL_SIGNALS), ()):
+                matches[email] = list(signals)
+            for signal in signals:
+                for email in index.get((symbol, signal['type']), ()):
+                    if signal not in matches[email]:
+                        matches[email].append(signal)
+            for email, matched in matches.items():
+                routed[email].append((symbol, matched, latest))
+
+        return dict(routed)
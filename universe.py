@@ -0,0 +1,158 @@
+import os
+import csv
+import sqlite3
+import threading
+from config import (
+    UNIVERSE_DB_PATH, NIFTY_100_SYMBOLS, SYMBOL_SECTORS, DEFAULT_SECTOR, ETF_SYMBOLS
+)
+from storage import get_shard
+
+LISTING_STATUSES = ['active', 'suspended', 'delisted']
+SYMBOL_KINDS = ['equity', 'etf']
+
+SYMBOL_FIELDS = ['symbol', 'name', 'sector', 'kind', 'status']
+
+class SymbolUniverse:
+    """Registry of tradable symbols with sector, kind (equity/ETF) and listing status.
+
+    Seeded from config and extended by importing symbol lists (e.g. NSE's
+    EQUITY_L.csv). The symbol is the primary key, so duplicates in any
+    source collapse into one row.
+    """
+
+    def __init__(self, db_path=UNIVERSE_DB_PATH):
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        with self._lock, self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS symbols (
+                    symbol TEXT PRIMARY KEY,
+                    name TEXT,
+                    sector TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'active'
+                )
+            """)
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_symbols_sector ON symbols (sector)")
+        self._seed()
+
+    def _seed(self):
+        """Register the configured symbols (no-op for symbols already present)"""
+        sectors = {symbol: sector for sector, symbols in SYMBOL_SECTORS.items() for symbol in symbols}
+        etfs = set(ETF_SYMBOLS)
+        rows = [
+            (symbol, sectors.get(symbol, DEFAULT_SECTOR), 'etf' if symbol in etfs else 'equity')
+            for symbol in NIFTY_100_SYMBOLS
+        ]
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO symbols (symbol, sector, kind) VALUES (?, ?, ?)", rows
+            )
+
+    def symbols(self, kind=None, sector=None, status='active'):
+        """Get registered symbols in registration order, optionally filtered"""
+        query = "SELECT symbol FROM symbols WHERE 1 = 1"
+        params = []
+        for column, value in (('kind', kind), ('sector', sector), ('status', status)):
+            if value is not None:
+                query += f" AND {column} = ?"
+                params.append(value)
+        with self._lock:
+            return [row[0] for row in self.conn.execute(query + " ORDER BY rowid", params)]
+
+    def get(self, symbol):
+        """Get one symbol's metadata as a dict, or None if unknown"""
+        with self._lock:
+            row = self.conn.execute(
+                f"SELECT {', '.join(SYMBOL_FIELDS)} FROM symbols WHERE symbol = ?", (symbol,)
+            ).fetchone()
+        return dict(zip(SYMBOL_FIELDS, row)) if row else None
+
+    def get_metadata(self, symbols=None):
+        """Get {symbol: metadata dict} for the given symbols or the whole registry"""
+        with self._lock:
+            rows = self.conn.execute(f"SELECT {', '.join(SYMBOL_FIELDS)} FROM symbols").fetchall()
+        metadata = {row[0]: dict(zip(SYMBOL_FIELDS, row)) for row in rows}
+        if symbols is None:
+            return metadata
+        return {symbol: metadata[symbol] for symbol in symbols if symbol in metadata}
+
+    def sectors(self):
+        """Get the distinct sectors of active symbols"""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT DISTINCT sector FROM symbols WHERE status = 'active' ORDER BY sector"
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def upsert(self, symbol, name=None, sector=None, kind=None, status=None):
+        """Add a symbol or update the given metadata fields of an existing one"""
+        if kind is not None and kind not in SYMBOL_KINDS:
+            raise ValueError(f"Unknown symbol kind: {kind}")
+        if status is not None and status not in LISTING_STATUSES:
+            raise ValueError(f"Unknown listing status: {status}")
+
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT OR IGNORE INTO symbols (symbol, sector, kind) VALUES (?, ?, ?)",
+                (symbol, sector or DEFAULT_SECTOR, kind or 'equity')
+            )
+            for column, value in (('name', name), ('sector', sector), ('kind', kind), ('status', status)):
+                if value is not None:
+                    self.conn.execute(f"UPDATE symbols SET {column} = ? WHERE symbol = ?", (value, symbol))
+
+    def set_status(self, symbol, status):
+        """Mark a symbol active, suspended or delisted"""
+        self.upsert(symbol, status=status)
+
+    def import_csv(self, path, suffix=".NS"):
+        """Import symbols from a CSV and return how many rows were read.
+
+        Accepts NSE's EQUITY_L.csv (SYMBOL, NAME OF COMPANY, SERIES) or a file
+        with symbol,name,sector,kind,status columns. Bare NSE symbols get the
+        Yahoo Finance suffix.
+        """
+        count = 0
+        with open(path, newline='') as f:
+            for row in csv.DictReader(f):
+                row = {key.strip().lower(): (value or '').strip() for key, value in row.items() if key}
+                symbol = row.get('symbol')
+                if not symbol:
+                    continue
+                # NSE lists non-equity series (bonds, rights) in the same file
+                if row.get('series') and row['series'] not in ('EQ', 'BE'):
+                    continue
+                if not symbol.endswith(suffix):
+                    symbol += suffix
+                self.upsert(
+                    symbol,
+                    name=row.get('name') or row.get('name of company') or None,
+                    sector=row.get('sector') or None,
+                    kind=row.get('kind') or None,
+                    status=row.get('status') or None
+                )
+                count += 1
+        return count
+
+    def close(self):
+        self.conn.close()
+
+def partition_by_shard(symbols):
+    """Group symbols by storage shard, keeping their order within each shard"""
+    shards = {}
+    for symbol in dict.fromkeys(symbols):
+        shards.setdefault(get_shard(symbol), []).append(symbol)
+    return dict(sorted(shards.items()))
+
+_universe = None
+_universe_lock = threading.Lock()
+
+def get_universe():
+    """Get the process-wide symbol registry"""
+    global _universe
+    with _universe_lock:
+        if _universe is None:
+            _universe = SymbolUniverse()
+        return _universe
@@ -1,10 +1,15 @@
 import os
+import io
+import glob
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import json
 import time
 import streamlit as st
+from config import STORAGE_SHARDS, COLD_FOLDER
+from snapshot import update_snapshot
+from storage import get_shard, get_file_path, get_data_version, file_lock, atomic_write
 
 def create_data_folder():
     """Create data folder if it doesn't exist"""
@@ -14,28 +19,104 @@ def create_data_folder():
         os.makedirs("stock_data/historical")
     if not os.path.exists("stock_data/alerts"):
         os.makedirs("stock_data/alerts")
+    migrate_flat_storage()
 
-def get_file_path(symbol, data_type="historical"):
-    """Get file path for stock data"""
-    return f"stock_data/{data_type}/{symbol.replace('.NS', '')}.csv"
+def get_stored_symbols(data_type="historical"):
+    """List symbols that have a stored data file"""
+    return [
+        f"{os.path.splitext(os.path.basename(path))[0]}.NS"
+        for path in sorted(glob.glob(f"stock_data/{data_type}/*/*.csv"))
+    ]
 
-def load_stock_data(symbol):
-    """Load stock data from CSV file"""
+def _merge_into(source, target, compression=None):
+    """Fold source's rows into target (target wins on duplicate bars), then remove source"""
+    def read(path):
+        return pd.read_csv(path, index_col=0, parse_dates=True, compression=compression)
+    merged = pd.concat([read(source), read(target)])
+    merged = merged[~merged.index.duplicated(keep='last')].sort_index()
+    atomic_write(target, lambda f: merged.to_csv(f, compression=compression), mode='wb' if compression else 'w')
+    os.remove(source)
+
+def _move_or_merge(source, target, compression=None):
+    """Move source to target under target's lock, merging if target already exists"""
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    with file_lock(target):
+        if os.path.exists(target):
+            _merge_into(source, target, compression)
+        else:
+            os.replace(source, target)
+    if os.path.exists(f"{source}.lock"):
+        os.remove(f"{source}.lock")
+
+def migrate_flat_storage():
+    """Move files from the old flat layout into their hash shards.
+
+    Runs under one lock so concurrent sessions don't migrate at once. A file
+    that already exists in its shard was written after the layout change, so
+    old rows are merged into it instead of replacing it.
+    """
+    with file_lock("stock_data/historical/.migration"):
+        for path in glob.glob("stock_data/historical/*.csv"):
+            symbol = f"{os.path.splitext(os.path.basename(path))[0]}.NS"
+            _move_or_merge(path, get_file_path(symbol))
+
+        if os.path.isdir(COLD_FOLDER):
+            shards = {f"{shard:02x}" for shard in range(STORAGE_SHARDS)}
+            for name in os.listdir(COLD_FOLDER):
+                source = os.path.join(COLD_FOLDER, name)
+                if name in shards or not os.path.isdir(source):
+                    continue
+                target = os.path.join(COLD_FOLDER, get_shard(name), name)
+                for partition in glob.glob(os.path.join(source, "*.csv.gz")):
+                    _move_or_merge(partition, os.path.join(target, os.path.basename(partition)), compression='gzip')
+                for lock in glob.glob(os.path.join(source, "*.lock")):
+                    os.remove(lock)
+                os.rmdir(source)
+
+def _tail_csv(file_path, rows, block_size=1 << 16):
+    """Get the header and last rows lines of a CSV file, reading backwards from the end"""
+    with open(file_path, 'rb') as f:
+        header = f.readline()
+        start = f.tell()
+        end = f.seek(0, os.SEEK_END)
+        position, data = end, b""
+        while position > start and data.count(b"\n") <= rows:
+            position = max(start, position - block_size)
+            f.seek(position)
+            data = f.read(end - position)
+    lines = data.splitlines(keepends=True)
+    if position > start:
+        lines = lines[1:]  # the first line may be cut mid-row
+    return io.BytesIO(header + b"".join(lines[-rows:]))
+
+def load_stock_data(symbol, tail=None):
+    """Load stock data from CSV file (only its last `tail` rows if given, without parsing the rest)"""
     file_path = get_file_path(symbol)
     try:
         if os.path.exists(file_path):
-            df = pd.read_csv(file_path, index_col=0, parse_dates=True)
+            source = _tail_csv(file_path, tail) if tail else file_path
+            df = pd.read_csv(source, index_col=0, parse_dates=True)
             return df
         return pd.DataFrame()
     except Exception as e:
         st.error(f"Error loading data for {symbol}: {str(e)}")
         return pd.DataFrame()
 
-def save_stock_data(symbol, df):
-    """Save stock data to CSV file"""
+def save_stock_data(symbol, df, snapshot=True, before_replace=None):
+    """Save stock data to CSV file (and its snapshot row unless the caller updates it separately).
+
+    before_replace(), if given, runs under the file lock just before the
+    stored file is replaced.
+    """
     file_path = get_file_path(symbol)
     try:
-        df.to_csv(file_path)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        with file_lock(file_path):
+            if before_replace:
+                before_replace()
+            atomic_write(file_path, df.to_csv)
+        if snapshot:
+            update_snapshot(symbol, df)
         return True
     except Exception as e:
         st.error(f"Error saving data for {symbol}: {str(e)}")
@@ -53,17 +134,6 @@ def load_alert_log():
         st.error(f"Error loading alert log: {str(e)}")
         return {}
 
-def save_alert_log(alert_log):
-    """Save alert log to JSON file"""
-    log_file = "stock_data/alerts/alert_log.json"
-    try:
-        with open(log_file, 'w') as f:
-            json.dump(alert_log, f, indent=2, default=str)
-        return True
-    except Exception as e:
-        st.error(f"Error saving alert log: {str(e)}")
-        return False
-
 def rate_limit_delay():
     """Add delay for API rate limiting"""
     from config import REQUEST_DELAY
@@ -99,35 +169,25 @@ def get_stock_status_summary(symbols):
     """Get summary of stock statuses"""
     status_counts = {"loaded": 0, "missing": 0, "error": 0}
     
+    # A stat per file instead of parsing every CSV on each rerun
     for symbol in symbols:
         try:
-            df = load_stock_data(symbol)
-            if not df.empty:
+            if os.path.getsize(get_file_path(symbol)) > 0:
                 status_counts["loaded"] += 1
             else:
                 status_counts["missing"] += 1
-        except:
+        except FileNotFoundError:
+            status_counts["missing"] += 1
+        except OSError:
             status_counts["error"] += 1
     
     return status_counts
 
 def clean_old_alerts(days=7):
     """Clean alert log entries older than specified days"""
-    alert_log = load_alert_log()
-    cutoff_date = datetime.now() - timedelta(days=days)
-    
-    cleaned_log = {}
-    for symbol, alerts in alert_log.items():
-        cleaned_alerts = []
-        for alert in alerts:
-            try:
-                alert_date = datetime.fromisoformat(alert.get('timestamp', ''))
-                if alert_date >= cutoff_date:
-                    cleaned_alerts.append(alert)
-            except:
-                continue
-        if cleaned_alerts:
-            cleaned_log[symbol] = cleaned_alerts
-    
-    save_alert_log(cleaned_log)
-    return len(alert_log) - len(cleaned_log)
\ No newline at end of file
+    from alert_store import AlertStore
+    store = AlertStore()
+    try:
+        return store.purge_older_than(days)
+    finally:
+        store.close()